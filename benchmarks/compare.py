@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+###############################################################################
+# sgbackup - The SaveGame Backup tool                                         #
+#    Copyright (C) 2024,2025  Christian Moser                                 #
+#                                                                             #
+#    This program is free software: you can redistribute it and/or modify     #
+#    it under the terms of the GNU General Public License as published by     #
+#    the Free Software Foundation, either version 3 of the License, or        #
+#    (at your option) any later version.                                      #
+#                                                                             #
+#    This program is distributed in the hope that it will be useful,          #
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of           #
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the            #
+#    GNU General Public License for more details.                             #
+#                                                                             #
+#    You should have received a copy of the GNU General Public License        #
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.   #
+###############################################################################
+
+"""
+Compare two result files of `run.py`.
+
+The medians are compared. A benchmark is reported as a regression (or an
+improvement) if it changed by more than the threshold.
+"""
+
+import sys
+import json
+import argparse
+
+def load_results(filename:str)->dict:
+    with open(filename,'r',encoding="utf-8") as ifile:
+        return json.load(ifile)
+
+def compare(base:dict,head:dict,threshold:float)->list[tuple[str,float|None,float|None,float|None,str]]:
+    """
+    compare Compare the results of two runs.
+
+    :param base: The results of the base run.
+    :param head: The results of the new run.
+    :param threshold: The relative change that is reported, e.g. `0.1`.
+    :return: A list of `(name,base_median,head_median,change,status)` tuples.
+        *status* is one of `"regression"`, `"improvement"`, `"unchanged"`,
+        `"new"` and `"removed"`.
+    """
+    ret = []
+    base_results = base['results']
+    head_results = head['results']
+    for name in sorted(set(base_results.keys()) | set(head_results.keys())):
+        if name not in base_results:
+            ret.append((name,None,head_results[name]['median'],None,"new"))
+            continue
+        if name not in head_results:
+            ret.append((name,base_results[name]['median'],None,None,"removed"))
+            continue
+        base_median = base_results[name]['median']
+        head_median = head_results[name]['median']
+        change = (head_median - base_median) / base_median if base_median > 0.0 else 0.0
+        if change > threshold:
+            status = "regression"
+        elif change < -threshold:
+            status = "improvement"
+        else:
+            status = "unchanged"
+        ret.append((name,base_median,head_median,change,status))
+    return ret
+
+def main(argv:list[str]|None=None)->int:
+    parser = argparse.ArgumentParser(description="Compare two sgbackup benchmark results.")
+    parser.add_argument('base',help="The results of the base commit.")
+    parser.add_argument('head',help="The results of the commit to check.")
+    parser.add_argument('-t','--threshold',type=float,default=10.0,metavar='PERCENT',
+                        help="Report changes above PERCENT percent (default: 10).")
+    parser.add_argument('--fail',action='store_true',
+                        help="Exit with 1 if there are regressions.")
+    args = parser.parse_args(argv)
+
+    base = load_results(args.base)
+    head = load_results(args.head)
+    rows = compare(base,head,args.threshold / 100.0)
+
+    print("base: {}".format(base['meta'].get('commit',None)))
+    print("head: {}".format(head['meta'].get('commit',None)))
+    print()
+    print("{:<56} {:>10} {:>10} {:>9}".format("benchmark","base","head","change"))
+    for name,base_median,head_median,change,status in rows:
+        print("{:<56} {:>10} {:>10} {:>9}  {}".format(
+            name,
+            "{:.4f}s".format(base_median) if base_median is not None else "-",
+            "{:.4f}s".format(head_median) if head_median is not None else "-",
+            "{:+.1f}%".format(change * 100.0) if change is not None else "-",
+            status if status != "unchanged" else ""))
+
+    n_regressions = len([row for row in rows if row[4] == "regression"])
+    if n_regressions:
+        print()
+        print("{} regressions above {:.0f}%.".format(n_regressions,args.threshold))
+    return 1 if (n_regressions and args.fail) else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
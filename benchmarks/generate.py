@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+###############################################################################
+# sgbackup - The SaveGame Backup tool                                         #
+#    Copyright (C) 2024,2025  Christian Moser                                 #
+#                                                                             #
+#    This program is free software: you can redistribute it and/or modify     #
+#    it under the terms of the GNU General Public License as published by     #
+#    the Free Software Foundation, either version 3 of the License, or        #
+#    (at your option) any later version.                                      #
+#                                                                             #
+#    This program is distributed in the hope that it will be useful,          #
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of           #
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the            #
+#    GNU General Public License for more details.                             #
+#                                                                             #
+#    You should have received a copy of the GNU General Public License        #
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.   #
+###############################################################################
+
+"""
+Generator for synthetic sgbackup workloads.
+
+This module only uses the standard library and does not import sgbackup, so
+the workload can be generated before the settings of sgbackup are loaded.
+
+A workspace has the layout:
+
+    <workspace>/config/sgbackup/sgbackup.conf
+    <workspace>/config/sgbackup/steamlib.lst
+    <workspace>/config/sgbackup/games/*.gameconf
+    <workspace>/saves/<savegame_dir>/...
+    <workspace>/backups/
+    <workspace>/steam/steamapps/appmanifest_*.acf
+    <workspace>/epic/Manifests/*.item
+"""
+
+import os
+import sys
+import json
+import random
+import argparse
+
+# The savegame trees. The sizes are multiplied by the scale factor.
+#   name: (number of files, file size, directory depth, compressible)
+SAVEGAME_PROFILES = {
+    'tiny-files': (2000,2048,2,True),
+    'huge-files': (3,64 * 1048576,0,True),
+    'deep-tree': (600,8192,12,True),
+    'incompressible': (16,2 * 1048576,1,False),
+}
+
+WORKLOAD_GAMES = 'bench-{profile}'
+
+_BLOCK_SIZE = 65536
+
+def _write_data(filename:str,size:int,compressible:bool,rng:random.Random):
+    # Compressible data repeats a small random pattern, incompressible data
+    # is random.
+    with open(filename,'wb') as ofile:
+        pattern = rng.randbytes(512) * (_BLOCK_SIZE // 512)
+        while size > 0:
+            n = min(size,_BLOCK_SIZE)
+            if compressible:
+                ofile.write(pattern[:n])
+            else:
+                ofile.write(rng.randbytes(n))
+            size -= n
+
+def generate_savegame_tree(directory:str,profile:str,scale:float=1.0,seed:int=0)->tuple[int,int]:
+    """
+    generate_savegame_tree Create a savegame directory.
+
+    :param directory: The savegame directory to create.
+    :type directory: str
+    :param profile: A key of `SAVEGAME_PROFILES`.
+    :type profile: str
+    :param scale: Scales the file sizes.
+    :type scale: float
+    :param seed: The seed for the random data.
+    :type seed: int
+    :return: The number of files and the total size.
+    :rtype: tuple[int,int]
+    """
+    n_files,file_size,depth,compressible = SAVEGAME_PROFILES[profile]
+    file_size = max(int(file_size * scale),1)
+    rng = random.Random(seed)
+
+    total = 0
+    for i in range(n_files):
+        if depth > 0:
+            parts = ["d{:02d}".format((i >> level) % 4) for level in range(depth)]
+            dirname = os.path.join(directory,*parts)
+        else:
+            dirname = directory
+        os.makedirs(dirname,exist_ok=True)
+        _write_data(os.path.join(dirname,"save{:05d}.dat".format(i)),file_size,compressible,rng)
+        total += file_size
+    return n_files,total
+
+def write_gameconf(gameconf_dir:str,key:str,savegame_root:str,savegame_dir:str,binary:str|None=None):
+    data = {
+        'key': key,
+        'name': key.replace('-',' ').title(),
+        'savegame_name': key,
+        'savegame_type': 'linux',
+        'is_active': True,
+        'is_live': True,
+        'linux': {
+            'savegame_root': savegame_root,
+            'savegame_dir': savegame_dir,
+        },
+    }
+    if binary:
+        data['linux']['binary'] = binary
+    with open(os.path.join(gameconf_dir,key + ".gameconf"),'w',encoding="utf-8") as ofile:
+        ofile.write(json.dumps(data,ensure_ascii=False,indent=4))
+
+def generate_gameconfs(gameconf_dir:str,savegame_root:str,n_games:int):
+    """
+    generate_gameconfs Create gameconf files for *n_games* games without
+    savegame trees.
+
+    :param gameconf_dir: The gameconf directory.
+    :type gameconf_dir: str
+    :param savegame_root: The savegame root of the games.
+    :type savegame_root: str
+    :param n_games: The number of games.
+    :type n_games: int
+    """
+    os.makedirs(gameconf_dir,exist_ok=True)
+    for i in range(n_games):
+        key = "synthetic-game-{:05d}".format(i)
+        write_gameconf(gameconf_dir,key,savegame_root,key,"/opt/games/{key}/{key}".format(key=key))
+
+def generate_steam_library(library:str,n_apps:int,seed:int=0):
+    """
+    generate_steam_library Create a Steam library with *n_apps* appmanifest
+    files.
+
+    :param library: The library directory.
+    :type library: str
+    :param n_apps: The number of apps.
+    :type n_apps: int
+    """
+    steamapps = os.path.join(library,'steamapps')
+    os.makedirs(os.path.join(steamapps,'common'),exist_ok=True)
+    rng = random.Random(seed)
+    for i in range(n_apps):
+        appid = 100000 + i
+        with open(os.path.join(steamapps,"appmanifest_{}.acf".format(appid)),'w',encoding="utf-8") as ofile:
+            ofile.write('"AppState"\n{\n')
+            ofile.write('\t"appid"\t\t"{}"\n'.format(appid))
+            ofile.write('\t"universe"\t\t"1"\n')
+            ofile.write('\t"name"\t\t"Synthetic App {}"\n'.format(i))
+            ofile.write('\t"StateFlags"\t\t"4"\n')
+            ofile.write('\t"installdir"\t\t"Synthetic App {}"\n'.format(i))
+            ofile.write('\t"SizeOnDisk"\t\t"{}"\n'.format(rng.randrange(1 << 20,1 << 36)))
+            ofile.write('\t"buildid"\t\t"{}"\n'.format(rng.randrange(1,1 << 24)))
+            ofile.write('\t"InstalledDepots"\n\t{\n')
+            for depot in range(3):
+                ofile.write('\t\t"{}"\n\t\t{{\n'.format(appid + depot + 1))
+                ofile.write('\t\t\t"manifest"\t\t"{}"\n'.format(rng.randrange(1 << 60)))
+                ofile.write('\t\t\t"size"\t\t"{}"\n'.format(rng.randrange(1 << 32)))
+                ofile.write('\t\t}\n')
+            ofile.write('\t}\n')
+            ofile.write('\t"UserConfig"\n\t{\n\t\t"language"\t\t"english"\n\t}\n')
+            ofile.write('}\n')
+
+def generate_epic_manifests(datadir:str,n_apps:int,seed:int=0):
+    """
+    generate_epic_manifests Create *n_apps* Epic Games launcher manifests.
+
+    :param datadir: The Epic Games data directory.
+    :type datadir: str
+    :param n_apps: The number of apps.
+    :type n_apps: int
+    """
+    manifests = os.path.join(datadir,'Manifests')
+    os.makedirs(manifests,exist_ok=True)
+    rng = random.Random(seed)
+    for i in range(n_apps):
+        catalog_item_id = "{:032x}".format(rng.getrandbits(128))
+        data = {
+            'FormatVersion': 0,
+            'bIsIncompleteInstall': False,
+            'AppName': "SyntheticApp{}".format(i),
+            'DisplayName': "Synthetic Epic App {}".format(i),
+            'InstallLocation': "C:\\Program Files\\Epic Games\\SyntheticApp{}".format(i),
+            'InstallSize': rng.randrange(1 << 36),
+            'CatalogItemId': catalog_item_id,
+            'MainGameCatalogItemId': catalog_item_id,
+            'AppCategories': ["public","games","applications"],
+        }
+        with open(os.path.join(manifests,"{:032X}.item".format(rng.getrandbits(128))),'w',encoding="utf-8") as ofile:
+            ofile.write(json.dumps(data,indent=4))
+
+def write_settings(config_dir:str,backup_dir:str,steam_library:str,epic_datadir:str):
+    os.makedirs(config_dir,exist_ok=True)
+    with open(os.path.join(config_dir,'steamlib.lst'),'w',encoding="utf-8") as ofile:
+        ofile.write(steam_library + "\n")
+    with open(os.path.join(config_dir,'sgbackup.conf'),'w',encoding="utf-8") as ofile:
+        ofile.write("[sgbackup]\n")
+        ofile.write("backupDirectory={}\n".format(backup_dir))
+        ofile.write("backupVersions=0\n")
+        ofile.write("[epic]\n")
+        ofile.write("dataDir={}\n".format(epic_datadir))
+        ofile.write("[metrics]\n")
+        ofile.write("enabled=false\n")
+
+def generate_workspace(workspace:str,n_games:int=1000,n_steam_apps:int=500,n_epic_apps:int=500,
+                       profiles:list[str]|None=None,scale:float=1.0,seed:int=0)->dict:
+    """
+    generate_workspace Create a complete workspace.
+
+    The games of the savegame profiles are named `bench-<profile>`.
+
+    :param workspace: The directory of the workspace.
+    :type workspace: str
+    :return: A description of the workspace.
+    :rtype: dict
+    """
+    if profiles is None:
+        profiles = list(SAVEGAME_PROFILES.keys())
+
+    config_dir = os.path.join(workspace,'config','sgbackup')
+    gameconf_dir = os.path.join(config_dir,'games')
+    savegame_root = os.path.join(workspace,'saves')
+    backup_dir = os.path.join(workspace,'backups')
+    steam_library = os.path.join(workspace,'steam')
+    epic_datadir = os.path.join(workspace,'epic')
+
+    write_settings(config_dir,backup_dir,steam_library,epic_datadir)
+    os.makedirs(backup_dir,exist_ok=True)
+    generate_gameconfs(gameconf_dir,savegame_root,n_games)
+
+    trees = {}
+    for n,profile in enumerate(profiles):
+        key = WORKLOAD_GAMES.format(profile=profile)
+        write_gameconf(gameconf_dir,key,savegame_root,key)
+        n_files,size = generate_savegame_tree(os.path.join(savegame_root,key),profile,scale,seed + n)
+        trees[profile] = {'game':key,'files':n_files,'bytes':size}
+
+    generate_steam_library(steam_library,n_steam_apps,seed)
+    generate_epic_manifests(epic_datadir,n_epic_apps,seed)
+
+    return {
+        'workspace':workspace,
+        'config_home':os.path.join(workspace,'config'),
+        'games':n_games + len(profiles),
+        'steam_library':steam_library,
+        'steam_apps':n_steam_apps,
+        'epic_datadir':epic_datadir,
+        'epic_apps':n_epic_apps,
+        'savegames':trees,
+    }
+
+def main(argv:list[str]|None=None)->int:
+    parser = argparse.ArgumentParser(description="Generate a synthetic sgbackup workload.")
+    parser.add_argument('workspace',help="The directory to create the workload in.")
+    parser.add_argument('-g','--games',type=int,default=1000,
+                        help="The number of gameconf files (default: 1000).")
+    parser.add_argument('--steam-apps',type=int,default=500,
+                        help="The number of Steam appmanifests (default: 500).")
+    parser.add_argument('--epic-apps',type=int,default=500,
+                        help="The number of Epic manifests (default: 500).")
+    parser.add_argument('-p','--profile',action='append',dest='profiles',
+                        choices=sorted(SAVEGAME_PROFILES.keys()),
+                        help="The savegame trees to create (default: all).")
+    parser.add_argument('-s','--scale',type=float,default=1.0,
+                        help="Scales the sizes of the savegame files (default: 1.0).")
+    parser.add_argument('--seed',type=int,default=0)
+    args = parser.parse_args(argv)
+
+    if os.path.exists(args.workspace) and os.listdir(args.workspace):
+        print("\"{}\" is not empty!".format(args.workspace),file=sys.stderr)
+        return 1
+    info = generate_workspace(args.workspace,args.games,args.steam_apps,args.epic_apps,
+                              args.profiles,args.scale,args.seed)
+    print(json.dumps(info,indent=4))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+###############################################################################
+# sgbackup - The SaveGame Backup tool                                         #
+#    Copyright (C) 2024,2025  Christian Moser                                 #
+#                                                                             #
+#    This program is free software: you can redistribute it and/or modify     #
+#    it under the terms of the GNU General Public License as published by     #
+#    the Free Software Foundation, either version 3 of the License, or        #
+#    (at your option) any later version.                                      #
+#                                                                             #
+#    This program is distributed in the hope that it will be useful,          #
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of           #
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the            #
+#    GNU General Public License for more details.                             #
+#                                                                             #
+#    You should have received a copy of the GNU General Public License        #
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.   #
+###############################################################################
+
+"""
+Run the sgbackup benchmarks on a synthetic workload and write the results as
+JSON.
+
+The workload is generated with `generate.py` in a temporary workspace (or in
+`--workspace`) and sgbackup is imported with `XDG_CONFIG_HOME` pointing into
+the workspace, so the configuration and the backups of the user are never
+touched.
+
+Usage:
+
+    python benchmarks/run.py -o results.json
+    python benchmarks/compare.py base.json results.json
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import tempfile
+import argparse
+import statistics
+import subprocess
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(BENCHMARK_DIR)
+sys.path.insert(0,BENCHMARK_DIR)
+
+import generate
+
+# The number of fake backup files for ArchiverManager.get_backups().
+N_FAKE_BACKUPS = 500
+
+class BenchmarkRunner(object):
+    """
+    BenchmarkRunner Times callables and collects the results.
+    """
+    def __init__(self,repeat:int,only:list[str]|None=None):
+        self.repeat = repeat
+        self.only = only
+        self.results = {}
+
+    def is_selected(self,name:str)->bool:
+        if not self.only:
+            return True
+        for prefix in self.only:
+            if name.startswith(prefix):
+                return True
+        return False
+
+    def add(self,name:str,times:list[float],**extra):
+        result = {
+            'runs':len(times),
+            'min':min(times),
+            'median':statistics.median(times),
+            'mean':statistics.fmean(times),
+            'max':max(times),
+        }
+        result.update(extra)
+        self.results[name] = result
+        print("{name:<56} {median:10.4f}s (min {min:.4f}s, {runs} runs)".format(name=name,**result),
+              file=sys.stderr,flush=True)
+
+    def time(self,name:str,func,setup=None,teardown=None,repeat:int|None=None,**extra):
+        """
+        time Time *func*.
+
+        :param name: The name of the benchmark.
+        :param func: The callable to time.
+        :param setup: Called before each run, not timed.
+        :param teardown: Called with the result of *func* after each run,
+            not timed.
+        :param repeat: Overrides the number of runs.
+        """
+        if not self.is_selected(name):
+            return
+        times = []
+        for i in range(repeat if repeat is not None else self.repeat):
+            if setup is not None:
+                setup()
+            start = time.perf_counter()
+            result = func()
+            times.append(time.perf_counter() - start)
+            if teardown is not None:
+                teardown(result)
+        self.add(name,times,**extra)
+
+def get_commit()->str|None:
+    try:
+        return subprocess.run(['git','rev-parse','HEAD'],cwd=PROJECT_ROOT,
+                              capture_output=True,text=True,check=True).stdout.strip()
+    except (OSError,subprocess.CalledProcessError):
+        return None
+
+def run_benchmarks(runner:BenchmarkRunner,workload:dict):
+    # sgbackup reads XDG_CONFIG_HOME when its settings are imported.
+    os.environ['XDG_CONFIG_HOME'] = workload['config_home']
+    os.environ['SGBACKUP_NO_DAEMON'] = "1"
+    sys.path.insert(0,PROJECT_ROOT)
+
+    start = time.perf_counter()
+    import sgbackup
+    from sgbackup.game import GameManager
+    from sgbackup.archiver import ArchiverManager
+    from sgbackup.steam import AcfFileParser,SteamLibrary,SteamManifestCache
+    from sgbackup.epic import Epic,EpicManifestCache
+    runner.add('import.sgbackup',[time.perf_counter() - start])
+
+    gm = GameManager.get_global()
+    runner.time('gamemanager.load',gm.load,games=workload['games'])
+    games = gm.games
+
+    for profile,tree in workload['savegames'].items():
+        game = games[tree['game']]
+        runner.time('game.get_backup_files.{}'.format(profile),game.get_backup_files,
+                    files=tree['files'],bytes=tree['bytes'])
+
+    am = ArchiverManager.get_global()
+    for key,archiver in sorted(am.archivers.items()):
+        for profile,tree in workload['savegames'].items():
+            game = games[tree['game']]
+            backups = []
+            sizes = []
+
+            def backup():
+                # The backup filenames have a resolution of one second.
+                time.sleep(max(0.0,1.0 - (time.time() % 1.0)))
+                start = time.perf_counter()
+                if not archiver.backup(game):
+                    raise RuntimeError("Backup of {} with {} failed!".format(game.key,key))
+                return time.perf_counter() - start
+
+            def newest_backup()->str:
+                return max(am.get_backups(game),key=os.path.getmtime)
+
+            name = 'archiver.{}.backup.{}'.format(key,profile)
+            if runner.is_selected(name):
+                times = []
+                for i in range(runner.repeat):
+                    times.append(backup())
+                    filename = newest_backup()
+                    sizes.append(os.path.getsize(filename))
+                    backups.append(filename)
+                runner.add(name,times,files=tree['files'],bytes=tree['bytes'],
+                           archive_bytes=statistics.median(sizes))
+
+            name = 'archiver.{}.restore.{}'.format(key,profile)
+            if runner.is_selected(name):
+                if not backups:
+                    backup()
+                    backups.append(newest_backup())
+                runner.time(name,lambda: archiver.restore(backups[-1]),
+                            files=tree['files'],bytes=tree['bytes'])
+
+            for filename in backups:
+                os.unlink(filename)
+
+    steamapps = os.path.join(workload['steam_library'],'steamapps')
+    manifests = [os.path.join(steamapps,i) for i in os.listdir(steamapps) if i.endswith('.acf')]
+    parser = AcfFileParser()
+    runner.time('steam.acf_parser',lambda: [parser.parse_file(i) for i in manifests],
+                manifests=len(manifests))
+    library = SteamLibrary(workload['steam_library'])
+    runner.time('steam.library.get_steam_apps.cold',lambda: library.get_steam_apps(False),
+                setup=SteamManifestCache.get_global().clear,
+                manifests=len(manifests))
+    library.get_steam_apps(False)
+    runner.time('steam.library.get_steam_apps.warm',lambda: library.get_steam_apps(False),
+                manifests=len(manifests))
+
+    epic = Epic()
+    runner.time('epic.parse_all_manifests.cold',epic.parse_all_manifests,
+                setup=EpicManifestCache.get_global().clear,
+                manifests=workload['epic_apps'])
+    epic.parse_all_manifests()
+    runner.time('epic.parse_all_manifests.warm',epic.parse_all_manifests,
+                manifests=workload['epic_apps'])
+
+    if runner.is_selected('archivermanager.get_backups'):
+        # Copies of a small archive with distinct timestamps.
+        profile,tree = next(iter(workload['savegames'].items()))
+        game = games[tree['game']]
+        time.sleep(max(0.0,1.0 - (time.time() % 1.0)))
+        am.standard_archiver.backup(game)
+        template = max(am.get_backups(game),key=os.path.getmtime)
+        dirname = os.path.dirname(template)
+        stamp = os.path.basename(template).split('.')[1]
+        for i in range(N_FAKE_BACKUPS):
+            fake_stamp = "20000101-{:06d}".format(i)
+            shutil.copyfile(template,os.path.join(dirname,os.path.basename(template).replace(stamp,fake_stamp)))
+        runner.time('archivermanager.get_backups',lambda: am.get_backups(game),
+                    backups=N_FAKE_BACKUPS + 1)
+        runner.time('archivermanager.iter_backup_infos',lambda: list(am.iter_backup_infos(game,validate=False)),
+                    backups=N_FAKE_BACKUPS + 1)
+
+def main(argv:list[str]|None=None)->int:
+    parser = argparse.ArgumentParser(description="Run the sgbackup benchmarks.")
+    parser.add_argument('-o','--output',default=None,
+                        help="The JSON file to write the results to (default: stdout).")
+    parser.add_argument('-w','--workspace',default=None,
+                        help="Use this directory for the workload instead of a temporary directory. "
+                             "An existing workload is reused.")
+    parser.add_argument('-g','--games',type=int,default=1000,
+                        help="The number of gameconf files (default: 1000).")
+    parser.add_argument('--steam-apps',type=int,default=500,
+                        help="The number of Steam appmanifests (default: 500).")
+    parser.add_argument('--epic-apps',type=int,default=500,
+                        help="The number of Epic manifests (default: 500).")
+    parser.add_argument('-p','--profile',action='append',dest='profiles',
+                        choices=sorted(generate.SAVEGAME_PROFILES.keys()),
+                        help="The savegame trees to benchmark (default: all).")
+    parser.add_argument('-s','--scale',type=float,default=0.25,
+                        help="Scales the sizes of the savegame files (default: 0.25).")
+    parser.add_argument('-r','--repeat',type=int,default=3,
+                        help="The number of runs of each benchmark (default: 3).")
+    parser.add_argument('-k','--only',action='append',default=None,metavar='PREFIX',
+                        help="Only run the benchmarks starting with PREFIX.")
+    args = parser.parse_args(argv)
+
+    if args.workspace:
+        workspace = os.path.abspath(args.workspace)
+        cleanup = False
+    else:
+        workspace = tempfile.mkdtemp(prefix="sgbackup-bench-")
+        cleanup = True
+
+    try:
+        info_file = os.path.join(workspace,'workload.json')
+        if os.path.isfile(info_file):
+            with open(info_file,'r',encoding="utf-8") as ifile:
+                workload = json.load(ifile)
+        else:
+            start = time.perf_counter()
+            workload = generate.generate_workspace(workspace,args.games,args.steam_apps,args.epic_apps,
+                                                   args.profiles,args.scale)
+            print("Generated workload in {:.1f}s".format(time.perf_counter() - start),file=sys.stderr)
+            with open(info_file,'w',encoding="utf-8") as ofile:
+                json.dump(workload,ofile,indent=4)
+
+        runner = BenchmarkRunner(max(args.repeat,1),args.only)
+        run_benchmarks(runner,workload)
+    finally:
+        if cleanup:
+            shutil.rmtree(workspace,ignore_errors=True)
+
+    output = {
+        'meta': {
+            'commit':get_commit(),
+            'timestamp':time.time(),
+            'python':platform.python_version(),
+            'platform':platform.platform(),
+            'cpu_count':os.cpu_count(),
+            'repeat':runner.repeat,
+            'workload':{k:v for k,v in workload.items() if k not in ('workspace','config_home',
+                                                                     'steam_library','epic_datadir')},
+        },
+        'results':runner.results,
+    }
+    if args.output:
+        with open(args.output,'w',encoding="utf-8") as ofile:
+            json.dump(output,ofile,indent=4)
+    else:
+        print(json.dumps(output,indent=4))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,41 @@
+#!/bin/sh
+# Check that the CLI does not import the GUI.
+#
+# Runs CLI commands with "python -X importtime" and fails if Gtk, rapidfuzz
+# or the sgbackup.gui package are imported. The commands run with an empty
+# configuration in a temporary directory and without the daemon.
+#
+# Usage: check_importtime.sh [COMMAND ...]   (default: version help list)
+self="$( realpath "$0" )"
+project_root="$( dirname "$(dirname "$self" )" )"
+
+PYTHON="${PYTHON:-python}"
+FORBIDDEN="gi.repository.Gtk rapidfuzz sgbackup.gui"
+if [ $# -eq 0 ]; then
+    set -- version help list
+fi
+
+config_home="$( mktemp -d )"
+trap 'rm -rf "$config_home"' EXIT
+
+error=0
+for command in "$@"; do
+    importtime="$( cd "$project_root" && \
+        XDG_CONFIG_HOME="$config_home" SGBACKUP_NO_DAEMON=1 \
+        "$PYTHON" -X importtime -m sgbackup $command 2>&1 >/dev/null )"
+    if [ $? -ne 0 ]; then
+        echo "$importtime" >&2
+        echo "Running \"sgbackup ${command}\" failed!" >&2
+        exit 2
+    fi
+
+    for module in $FORBIDDEN; do
+        if echo "$importtime" | grep -q -E "\| +${module}\$"; then
+            echo "\"${module}\" is imported by \"sgbackup ${command}\"!" >&2
+            error=1
+        fi
+    done
+
+    echo "sgbackup ${command}: $( echo "$importtime" | grep -E "\| +sgbackup\$" )"
+done
+exit $error
@@ -25,7 +25,14 @@ from .main import cli_main,gui_main
 from . import game
 from .command import Command
 from . import commands
-from . import archiver
+
+def __getattr__(name):
+    # The archivers are only needed for backups and restores, so they are
+    # imported on first access.
+    if name == "archiver":
+        from . import archiver
+        return archiver
+    raise AttributeError("module {module!r} has no attribute {name!r}".format(module=__name__,name=name))
 
 __ALL__ = [
     "settings"
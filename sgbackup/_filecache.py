@@ -0,0 +1,161 @@
+###############################################################################
+# sgbackup - The SaveGame Backup tool                                         #
+#    Copyright (C) 2024,2025  Christian Moser                                 #
+#                                                                             #
+#    This program is free software: you can redistribute it and/or modify     #
+#    it under the terms of the GNU General Public License as published by     #
+#    the Free Software Foundation, either version 3 of the License, or        #
+#    (at your option) any later version.                                      #
+#                                                                             #
+#    This program is distributed in the hope that it will be useful,          #
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of           #
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the            #
+#    GNU General Public License for more details.                             #
+#                                                                             #
+#    You should have received a copy of the GNU General Public License        #
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.   #
+###############################################################################
+
+import os
+import json
+from threading import RLock
+
+from .utility import write_text_atomic
+
+import logging
+logger = logging.getLogger(__name__)
+
+class FileCache(object):
+    """
+    FileCache A persistent cache for data parsed from files.
+
+    Entries are keyed by filename and stay valid as long as the
+    `(st_mtime_ns,st_size)` pair of the file does not change. The cache is
+    thread safe and written to *cache_file* as JSON by `FileCache.save()`.
+    """
+    VERSION = 1
+
+    def __init__(self,cache_file:str):
+        self.__cache_file = cache_file
+        self.__mutex = RLock()
+        self.__entries = {}
+        self.__dirty = False
+        self.__load()
+
+    @property
+    def cache_file(self)->str:
+        """
+        cache_file The file the cache is stored in.
+
+        :type: str
+        """
+        return self.__cache_file
+
+    def __load(self):
+        if not os.path.isfile(self.cache_file):
+            return
+
+        try:
+            with open(self.cache_file,'r',encoding="utf-8") as ifile:
+                data = json.loads(ifile.read())
+        except Exception as ex:
+            logger.warning("Unable to load cache file \"{filename}\"! ({error})".format(
+                filename=self.cache_file,
+                error=str(ex)))
+            return
+
+        if not isinstance(data,dict) or data.get('version',None) != self.VERSION:
+            return
+
+        entries = data.get('entries',{})
+        if isinstance(entries,dict):
+            self.__entries = entries
+
+    def lookup(self,filename:str,stat:os.stat_result)->tuple[bool,object]:
+        """
+        lookup Look up the cached data for a file.
+
+        :param filename: The file to look up.
+        :type filename: str
+        :param stat: The current stat result of the file.
+        :type stat: os.stat_result
+        :return: A tuple `(hit,data)`. *hit* is `False` if the file is not cached
+            or the file changed since it was cached.
+        :rtype: tuple[bool,object]
+        """
+        with self.__mutex:
+            entry = self.__entries.get(filename,None)
+
+        if entry is not None and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+            return (True,entry[2])
+        return (False,None)
+
+    def store(self,filename:str,stat:os.stat_result,data):
+        """
+        store Store data for a file.
+
+        :param filename: The file the data were parsed from.
+        :type filename: str
+        :param stat: The stat result of the file at parse time.
+        :type stat: os.stat_result
+        :param data: JSON serializable data.
+        """
+        with self.__mutex:
+            self.__entries[filename] = [stat.st_mtime_ns,stat.st_size,data]
+            self.__dirty = True
+
+    def discard(self,filename:str):
+        """
+        discard Remove a file from the cache.
+
+        :param filename: The file to remove.
+        :type filename: str
+        """
+        with self.__mutex:
+            if filename in self.__entries:
+                del self.__entries[filename]
+                self.__dirty = True
+
+    def prune(self,directory:str,keep:set[str]):
+        """
+        prune Remove the entries of files in *directory* that are not in *keep*.
+
+        :param directory: The directory the files are located in.
+        :type directory: str
+        :param keep: The filenames to keep.
+        :type keep: set[str]
+        """
+        with self.__mutex:
+            for filename in [i for i in self.__entries.keys()
+                             if os.path.dirname(i) == directory and i not in keep]:
+                del self.__entries[filename]
+                self.__dirty = True
+
+    def clear(self):
+        """
+        clear Remove all entries from the cache.
+        """
+        with self.__mutex:
+            if self.__entries:
+                self.__entries = {}
+                self.__dirty = True
+
+    def save(self):
+        """
+        save Write the cache file if the cache was changed.
+        """
+        with self.__mutex:
+            if not self.__dirty:
+                return
+            data = json.dumps({'version':self.VERSION,'entries':self.__entries},ensure_ascii=False)
+            self.__dirty = False
+
+        try:
+            dirname = os.path.dirname(self.cache_file)
+            if not os.path.isdir(dirname):
+                os.makedirs(dirname)
+            write_text_atomic(self.cache_file,data)
+        except Exception as ex:
+            logger.warning("Unable to write cache file \"{filename}\"! ({error})".format(
+                filename=self.cache_file,
+                error=str(ex)))
@@ -16,7 +16,7 @@
 #    along with this program.  If not, see <https://www.gnu.org/licenses/>.   #
 ###############################################################################
 
-from ._archiver import Archiver,ArchiverManager
+from ._archiver import Archiver,ArchiverManager,BackupInfo
 #import importlib
 import os
 
@@ -37,5 +37,6 @@ if hasattr({module},"ARCHIVERS"):
 __ALL__ = [
     "Archiver",
     "AchiverManager",
+    "BackupInfo",
     "archiver",
 ]
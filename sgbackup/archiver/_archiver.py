@@ -33,10 +33,188 @@ from ..game import Game,SavegameType,VALID_SAVEGAME_TYPES,SAVEGAME_TYPE_ICONS
 from ..settings import settings
 from ..utility import sanitize_path,sanitize_windows_path
 from ..error import NotAnArchiveError
+from ..metrics import BackupMetrics,BatchMetrics,MetricsLog
+from ..profiling import profile
+from ..throttle import Throttle
 
 import logging
 logger = logging.getLogger(__name__)
 
+PROGRESS_EMIT_INTERVAL = 0.1
+THROUGHPUT_SMOOTHING = 0.3
+COPY_BUFFER_SIZE = 1048576
+
+class ThroughputTracker(object):
+    """
+    ThroughputTracker Tracks the progress of a byte stream.
+    
+    The throughput is smoothed with an exponentially weighted moving average
+    and updated at most every `PROGRESS_EMIT_INTERVAL` seconds.
+    """
+    def __init__(self,total_bytes:int,smoothing:float=THROUGHPUT_SMOOTHING):
+        self.__total_bytes = total_bytes
+        self.__done_bytes = 0
+        self.__smoothing = smoothing
+        self.__bytes_per_second = 0.0
+        self.__last_time = time.monotonic()
+        self.__last_bytes = 0
+        
+    @property
+    def total_bytes(self)->int:
+        return self.__total_bytes
+    @total_bytes.setter
+    def total_bytes(self,total:int):
+        self.__total_bytes = total
+        
+    @property
+    def done_bytes(self)->int:
+        return self.__done_bytes
+    
+    @property
+    def fraction(self)->float:
+        if self.__total_bytes <= 0:
+            return 1.0
+        return min(self.__done_bytes / self.__total_bytes,1.0)
+    
+    @property
+    def bytes_per_second(self)->float:
+        return self.__bytes_per_second
+    
+    @property
+    def eta(self)->float:
+        """
+        eta The estimated time left in seconds or `-1.0` if unknown.
+        
+        :type: float
+        """
+        if self.__bytes_per_second <= 0.0:
+            return -1.0
+        return max(self.__total_bytes - self.__done_bytes,0) / self.__bytes_per_second
+    
+    def update(self,done_bytes:int,force:bool=False)->bool:
+        """
+        update Set the number of processed bytes.
+
+        :param done_bytes: The number of bytes processed so far.
+        :type done_bytes: int
+        :param force: Report an update even if the interval has not passed yet.
+        :type force: bool
+        :return: `True` if the throughput was updated and the progress should be reported.
+        :rtype: bool
+        """
+        self.__done_bytes = done_bytes
+        now = time.monotonic()
+        dt = now - self.__last_time
+        if dt < PROGRESS_EMIT_INTERVAL:
+            return force
+        
+        rate = (done_bytes - self.__last_bytes) / dt
+        if self.__bytes_per_second <= 0.0:
+            self.__bytes_per_second = rate
+        else:
+            self.__bytes_per_second = (self.__smoothing * rate 
+                                       + (1.0 - self.__smoothing) * self.__bytes_per_second)
+        self.__last_time = now
+        self.__last_bytes = done_bytes
+        return True
+    
+
+class BackupProgress(ThroughputTracker):
+    """
+    BackupProgress Byte weighted progress of a single backup.
+    
+    The total is the size of all files to back up. Archivers add the bytes
+    they read with `BackupProgress.add()` (or read through
+    `BackupProgress.open()`), and the progress is reported by the archiver's
+    *backup-progress* signal.
+    """
+    def __init__(self,archiver:"Archiver",game:Game,files:dict[str:str]):
+        total = 0
+        for path in files.keys():
+            try:
+                total += os.stat(path).st_size
+            except OSError:
+                pass
+        ThroughputTracker.__init__(self,total)
+        self.__archiver = archiver
+        self.__game = game
+        self.__message = None
+        self.__metrics = archiver._get_backup_metrics()
+        if self.__metrics is not None:
+            self.__metrics.file_count = len(files)
+            self.__metrics.total_bytes = total
+        
+    def add(self,n_bytes:int):
+        if self.__metrics is not None:
+            self.__metrics.bytes_read += n_bytes
+        Throttle.get_global().throttle_read(n_bytes)
+        if self.update(self.done_bytes + n_bytes):
+            self.report()
+            
+    def set_message(self,message:str|None):
+        self.__message = message
+        if self.update(self.done_bytes):
+            self.report()
+            
+    def report(self):
+        self.__archiver._backup_progress(self.__game,
+                                         self.fraction,
+                                         self.__message,
+                                         self.done_bytes,
+                                         self.total_bytes,
+                                         self.bytes_per_second,
+                                         self.eta)
+        
+    def open(self,filename:str)->"ProgressReader":
+        """
+        open Open a file for reading and count the bytes read.
+
+        :param filename: The file to open.
+        :type filename: str
+        :rtype: ProgressReader
+        """
+        return ProgressReader(open(filename,'rb'),self)
+    
+    def copy(self,filename:str,fileobj):
+        """
+        copy Copy a file to *fileobj* in chunks of `COPY_BUFFER_SIZE` bytes.
+
+        :param filename: The file to copy.
+        :type filename: str
+        :param fileobj: The writable file object.
+        """
+        with open(filename,'rb') as ifile:
+            while True:
+                data = ifile.read(COPY_BUFFER_SIZE)
+                if not data:
+                    break
+                fileobj.write(data)
+                self.add(len(data))
+                
+
+class ProgressReader(object):
+    """
+    ProgressReader A file wrapper that reports the bytes read to a `BackupProgress`.
+    """
+    def __init__(self,fileobj,progress:BackupProgress):
+        self.__fileobj = fileobj
+        self.__progress = progress
+        
+    def read(self,size:int=-1)->bytes:
+        data = self.__fileobj.read(size)
+        self.__progress.add(len(data))
+        return data
+    
+    def close(self):
+        self.__fileobj.close()
+        
+    def __enter__(self):
+        return self
+    
+    def __exit__(self,exc_type,exc_value,traceback):
+        self.close()
+        
+
 class Archiver(GObject):
     def __init__(self,key:str,name:str,extensions:list[str],description:str|None=None):
         GObject.__init__(self)
@@ -49,6 +227,8 @@ class Archiver(GObject):
             self.__description = ""
             
         self.__extensions = list(extensions)
+        # The archivers are shared by the backup threads.
+        self.__thread_data = threading.local()
             
     @Property(type=str)
     def name(self)->str:
@@ -66,14 +246,45 @@ class Archiver(GObject):
     def extensions(self)->list[str]:
         return self.__extensions
     
-    def is_archive(self,filename):
+    def has_extension(self,filename:str)->bool:
+        """
+        has_extension Check if the filename has one of the extensions of this archiver.
+        
+        Unlike `Archiver.is_archive()` the file is never opened.
+
+        :param filename: The filename to check.
+        :type filename: str
+        :rtype: bool
+        """
         for ext in self.extensions:
             if filename.endswith(ext):
                 return True
         return False
+    
+    def is_archive(self,filename):
+        return self.has_extension(filename)
             
-    def backup(self,game:Game)->bool:
-        if not game.get_backup_files():
+    def backup(self,game:Game,metrics:BackupMetrics|None=None)->bool:
+        """
+        backup Write a new backup of a game.
+
+        The written archive is synced to disk.
+
+        :param game: The game to back up.
+        :type game: Game
+        :param metrics: If given, the timings and sizes of the backup are
+            recorded in it.
+        :type metrics: BackupMetrics|None
+        :return: `True` on success.
+        :rtype: bool
+        """
+        if metrics is None:
+            metrics = BackupMetrics(game.key,self.key)
+        
+        start = time.monotonic()
+        files = game.get_backup_files()
+        metrics.scan_time = time.monotonic() - start
+        if not files:
             self._logger.warning("[backup] No files SaveGame files for game {game}!".format(game=game.key))
             return False
         
@@ -84,10 +295,42 @@ class Archiver(GObject):
             
         self._logger.info("[backup] {game} -> {filename}".format(
             game=game.key,filename=filename))
-        return self.emit('backup',game,filename)
+        metrics.filename = filename
+        self.__thread_data.metrics = metrics
+        start = time.monotonic()
+        try:
+            with profile("archiver.backup"):
+                result = self.emit('backup',game,filename)
+        finally:
+            self.__thread_data.metrics = None
+        metrics.compress_time = time.monotonic() - start
+        
+        if result and os.path.isfile(filename):
+            start = time.monotonic()
+            self._sync_file(filename)
+            metrics.fsync_time = time.monotonic() - start
+            metrics.bytes_written = os.path.getsize(filename)
+        return result
     
-    def restore(self,filename:str):
-        self.emit('restore',filename)
+    def _get_backup_metrics(self)->BackupMetrics|None:
+        # The metrics of the backup running in the calling thread.
+        return getattr(self.__thread_data,'metrics',None)
+    
+    def _sync_file(self,filename:str):
+        try:
+            fd = os.open(filename,os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        except OSError as ex:
+            self._logger.warning("[backup] Unable to sync \"{filename}\" to disk! ({error})".format(
+                filename=filename,
+                error=str(ex)))
+    
+    def restore(self,filename:str)->bool:
+        with profile("archiver.restore"):
+            return self.emit('restore',filename)
         
     def generate_new_backup_filename(self,game:Game)->str:
         dt = datetime.datetime.now()
@@ -104,13 +347,16 @@ class Archiver(GObject):
                                           game.subdir,
                                           basename))
         
-    def _backup_progress(self,game:Game,fraction:float,message:str|None):
+    def _backup_progress(self,game:Game,fraction:float,message:str|None,
+                         done_bytes:float=0.0,total_bytes:float=0.0,
+                         bytes_per_second:float=0.0,eta:float=-1.0):
         if fraction > 1.0:
             fraction = 1.0
         elif fraction < 0.0:
             fraction = 0.0
             
-        self.emit("backup-progress",game,fraction,message)
+        self.emit("backup-progress",game,fraction,message,
+                  float(done_bytes),float(total_bytes),float(bytes_per_second),float(eta))
         
         
     @Signal(name="backup",flags=SignalFlags.RUN_FIRST,
@@ -126,12 +372,95 @@ class Archiver(GObject):
         raise NotImplementedError("{_class}.{function}() is not implemented!",_class=__class__,function="do_restore")
     
     @Signal(name="backup_progress",flags=SignalFlags.RUN_FIRST,
-            return_type=bool,arg_types=(Game,float,str))
-    def do_backup_progress(self,game:Game,fraction:float,message:str):
+            return_type=bool,arg_types=(Game,float,str,float,float,float,float))
+    def do_backup_progress(self,game:Game,fraction:float,message:str,
+                           done_bytes:float,total_bytes:float,bytes_per_second:float,eta:float):
         pass
     
     
     
+class BackupInfo(object):
+    """
+    BackupInfo Metadata of a savegame backup file.
+    
+    The fields encoded in the filename 
+    (`<savegame_name>.<YYYYmmdd-HHMMSS>.<savegame_type>.<live|finished>.sgbackup.<ext>`)
+    are parsed once and the size and mtime are taken from a single stat call,
+    so the metadata can be displayed without touching the file again.
+    """
+    def __init__(self,filename:str,size:int=0,mtime:float=0.0):
+        self.__filename = filename
+        self.__size = size
+        self.__mtime = mtime
+        
+        basename = os.path.basename(filename)
+        parts = basename.split('.')
+        try:
+            self.__savegame_name = parts[0]
+            self.__timestamp = datetime.datetime.strptime(parts[1],"%Y%m%d-%H%M%S")
+            self.__savegame_type = SavegameType.from_string(parts[2])
+            self.__is_live = parts[3] == 'live'
+        except:
+            self.__savegame_name = basename
+            self.__timestamp = None
+            self.__savegame_type = SavegameType.UNSET
+            self.__is_live = True
+        self.__extension = '.' + '.'.join(parts[5:])
+            
+    @staticmethod
+    def new_from_direntry(entry:os.DirEntry)->"BackupInfo":
+        st = entry.stat()
+        return BackupInfo(entry.path,st.st_size,st.st_mtime)
+    
+    @staticmethod
+    def new_from_file(filename:str)->"BackupInfo":
+        st = os.stat(filename)
+        return BackupInfo(filename,st.st_size,st.st_mtime)
+    
+    @property
+    def filename(self)->str:
+        return self.__filename
+    
+    @property
+    def size(self)->int:
+        return self.__size
+    
+    @property
+    def mtime(self)->float:
+        return self.__mtime
+    
+    @property
+    def savegame_name(self)->str:
+        return self.__savegame_name
+    
+    @property
+    def timestamp(self)->datetime.datetime:
+        """
+        timestamp The timestamp encoded in the filename. If the filename
+        can not be parsed, the mtime of the file is used.
+        
+        :type: datetime.datetime
+        """
+        if self.__timestamp is None:
+            return datetime.datetime.fromtimestamp(self.__mtime)
+        return self.__timestamp
+    
+    @property
+    def savegame_type(self)->SavegameType:
+        return self.__savegame_type
+    
+    @property
+    def is_live(self)->bool:
+        return self.__is_live
+    
+    @property
+    def extension(self)->str:
+        return self.__extension
+    
+    def __lt__(self,other):
+        return self.filename < other.filename
+    
+
 class ArchiverManager(GObject):
     __global_archiver_manager = None
     
@@ -139,6 +468,9 @@ class ArchiverManager(GObject):
         GObject.__init__(self)
         self.__archivers = {}
         self.__backup_in_progress = False
+        self.__backup_in_progress_mutex = threading.Lock()
+        self.__backup_bytes = {}
+        self.__backup_bytes_mutex = threading.Lock()
 
         
     @staticmethod
@@ -162,31 +494,47 @@ class ArchiverManager(GObject):
     def backup_in_progress(self,b:bool):
         self.__backup_in_progress = b
     
+    def __begin_backup(self):
+        # Checks and sets backup_in_progress atomically, so only one of
+        # several threads starting a backup at the same time wins.
+        with self.__backup_in_progress_mutex:
+            if self.__backup_in_progress:
+                raise RuntimeError("A backup is already in progress!!!")
+            self.__backup_in_progress = True
+        self.notify('backup-in-progress')
+
     @property
     def archivers(self):
         return self.__archivers
     
-    @Signal(name="backup-game-progress",return_type=None,arg_types=(Game,float,str),flags=SignalFlags.RUN_FIRST)
-    def do_backup_game_progress(self,game,fraction,message):
+    @Signal(name="backup-game-progress",return_type=None,arg_types=(Game,float,str,float,float),flags=SignalFlags.RUN_FIRST)
+    def do_backup_game_progress(self,game,fraction,message,bytes_per_second,eta):
         pass
     
     @Signal(name="backup-game-finished",return_type=None,arg_types=(Game,),flags=SignalFlags.RUN_FIRST)
     def do_backup_game_finished(self,game:Game):
-        if game.is_live and settings.backup_versions > 0:
-            directory = os.path.join(settings.backup_dir,
-                                     game.savegame_name,
-                                     game.savegame_type.value,
-                                     game.savegame_subdir)
-            if os.path.isdir(directory):
-                files=list(sorted(os.listdir(directory),reverse=True))
-                if len(files) > settings.backup_versions:
-                    for backup_file in files[settings.backup_versions:]:
-                        self.remove_backup(game,backup_file)
-    
-    @Signal(name="backup-progress",return_type=None,arg_types=(float,),flags=SignalFlags.RUN_FIRST)
-    def do_backup_progress(self,fraction):
         pass
     
+    @Signal(name="backup-game-skipped",return_type=None,arg_types=(Game,str),flags=SignalFlags.RUN_FIRST)
+    def do_backup_game_skipped(self,game:Game,reason:str):
+        logger.info("Skipping backup of {game}! ({reason})".format(
+            game=game.key,
+            reason=reason))
+    
+    @Signal(name="backup-progress",return_type=None,arg_types=(float,float,float),flags=SignalFlags.RUN_FIRST)
+    def do_backup_progress(self,fraction,bytes_per_second,eta):
+        pass
+    
+    @Signal(name="backup-metrics",return_type=None,arg_types=(Game,object),flags=SignalFlags.RUN_FIRST)
+    def do_backup_metrics(self,game:Game,metrics:BackupMetrics):
+        if settings.metrics_enabled:
+            MetricsLog.get_global().write(metrics.to_dict())
+    
+    @Signal(name="backup-batch-metrics",return_type=None,arg_types=(object,),flags=SignalFlags.RUN_FIRST)
+    def do_backup_batch_metrics(self,metrics:BatchMetrics):
+        if settings.metrics_enabled:
+            MetricsLog.get_global().write(metrics.to_dict())
+    
     @Signal(name="backup-finished",return_type=None,arg_types=(),flags=SignalFlags.RUN_FIRST)
     def do_backup_finished(self):
         pass
@@ -203,106 +551,247 @@ class ArchiverManager(GObject):
     def remove_backup(self,game,filename):
         self.emit("remove-backup",game,filename)
         
-    def backup(self,game:Game,multi_backups:bool=False):
-        def on_progress(archiver,game,fraction,message):
-            self.emit("backup-game-progress",game,fraction,message)
+    def backup(self,game:Game,multi_backups:bool=False,archiver:str|None=None)->bool:
+        """
+        backup Back up the savegames of a game.
+
+        :param game: The game to back up.
+        :type game: Game
+        :param multi_backups: `True` if the backup is a part of `backup_many()`.
+        :type multi_backups: bool
+        :param archiver: The key of the archiver to use. If `None`, the
+            `standard_archiver` is used.
+        :type archiver: str|None
+        :return: `True` if the backup was written.
+        :rtype: bool
+        """
+        archiver = self.get_archiver(archiver)
+        if multi_backups:
+            return self.__backup_game(game,archiver,True)
+
+        self.__begin_backup()
+        try:
+            return self.__backup_game(game,archiver,False)
+        finally:
+            try:
+                self.emit("backup-finished")
+            finally:
+                self.backup_in_progress = False
+
+    def __backup_game(self,game:Game,archiver:Archiver,multi_backups:bool)->bool:
+        def on_progress(archiver,progress_game,fraction,message,done_bytes,total_bytes,bytes_per_second,eta):
+            # the archiver is shared by all backup threads
+            if progress_game.key != game.key:
+                return
+            with self.__backup_bytes_mutex:
+                self.__backup_bytes[game.key] = (done_bytes,total_bytes)
+            self.emit("backup-game-progress",game,fraction,message,bytes_per_second,eta)
             if not multi_backups:
-                self.emit("backup-progress",fraction)
-            
-        if not multi_backups and self.backup_in_progress:
-            raise RuntimeError("A backup is already in progress!!!")
+                self.emit("backup-progress",fraction,bytes_per_second,eta)
+
+        Throttle.get_global().on_backup_started()
+        start = time.monotonic()
+        # Each backup runs in its own thread, so the thread time is the CPU
+        # time of the backup.
+        cpu_start = time.thread_time()
+        metrics = BackupMetrics(game.key,archiver.key)
         
-        self.backup_in_progress = True
+        if not self.is_backup_eligible(game):
+            self.emit("backup-game-skipped",game,"Savegame directory not found")
+            metrics.skipped = True
+            metrics.cpu_time = time.thread_time() - cpu_start
+            metrics.total_time = time.monotonic() - start
+            self.emit("backup-metrics",game,metrics)
+            return False
             
-        archiver = self.standard_archiver
         backup_sc = archiver.connect('backup-progress',on_progress)
-        archiver.backup(game)
-        archiver.disconnect(backup_sc)
-        if game.is_live and settings.backup_versions > 0:
-            backups = sorted(self.get_live_backups_for_type(game,game.savegame_type),reverse=True)
-            if backups and len(backups) > settings.backup_versions:
-                for filename in backups[settings.backup_versions:]:
-                    self.remove_backup(game,filename)
+        try:
+            result = bool(archiver.backup(game,metrics))
+        except Exception as ex:
+            logger.error("Backup of {game} failed! ({error})".format(
+                game=game.key,
+                error=str(ex)))
+            result = False
+        finally:
+            archiver.disconnect(backup_sc)
+        if result and game.is_live:
+            # The expired backups are deleted by the background pruning job.
+            # The retention module imports the archivers.
+            from ..retention import RetentionManager
+            try:
+                RetentionManager.get_global().backup_added(game,metrics.filename)
+            except Exception as ex:
+                logger.error("Unable to add the backup of {game} to the retention index! ({error})".format(
+                    game=game.key,
+                    error=str(ex)))
                     
+        metrics.success = result
+        metrics.cpu_time = time.thread_time() - cpu_start
+        metrics.total_time = time.monotonic() - start
+        self.emit("backup-metrics",game,metrics)
         self.emit("backup-game-finished",game)
-        if not multi_backups:
-            self.emit("backup-finished")
-        self.backup_in_progress = False
+        return result
+    
+    def is_backup_eligible(self,game:Game)->bool:
+        """
+        is_backup_eligible Check if the savegame directory of a game exists.
+        
+        This is the first stage of each backup job and runs in the backup
+        thread, so slow or unmounted drives do not block the caller.
+
+        :param game: The game to check.
+        :type game: Game
+        :rtype: bool
+        """
+        sgroot = game.savegame_root
+        sgdir = game.savegame_dir
+        if not sgroot or not sgdir:
+            return False
+        return os.path.exists(os.path.join(sgroot,sgdir))
         
-    def backup_many(self,games:list[Game]):
-        def on_game_progress(archiver,game,fraction,message,game_progress,mutex):
+    def get_archiver(self,key:str|None=None)->Archiver:
+        """
+        get_archiver Get an archiver by its key.
+
+        :param key: The key of the archiver. If `None`, the `standard_archiver`
+            is returned.
+        :type key: str|None
+        :raises KeyError: If there is no archiver for *key*.
+        :rtype: Archiver
+        """
+        if key is None:
+            return self.standard_archiver
+        return self.__archivers[key]
+    
+    def backup_many(self,games:list[Game],max_threads:int|None=None,archiver:str|None=None)->dict[str:bool]:
+        """
+        backup_many Back up multiple games in parallel.
+
+        :param games: The games to back up.
+        :type games: list[Game]
+        :param max_threads: The number of backup threads. If `None`, 
+            `settings.backup_threads` is used.
+        :type max_threads: int|None
+        :param archiver: The key of the archiver to use. If `None`, the
+            `standard_archiver` is used.
+        :type archiver: str|None
+        :return: A dict mapping the game keys to the result of `backup()`.
+        :rtype: dict[str:bool]
+        """
+        def on_game_progress(am,game,fraction,message,bytes_per_second,eta,tracker,mutex):
+            # The total is extrapolated from the games already started until
+            # all games reported their size.
+            with self.__backup_bytes_mutex:
+                done_bytes = sum(i[0] for i in self.__backup_bytes.values())
+                total_bytes = sum(i[1] for i in self.__backup_bytes.values())
+                n_started = len(self.__backup_bytes)
+            
             with mutex:
-                game_progress[game.key] = fraction
-                sum_fractions = 0.0
-                for f in game_progress.values():
-                    sum_fractions += f
-                n = len(game_progress)
+                n_pending = n_games - n_skipped - n_started
+                if n_pending > 0 and n_started > 0:
+                    total_bytes += (total_bytes / n_started) * n_pending
+                tracker.total_bytes = total_bytes
+                if not tracker.update(done_bytes):
+                    return
+                progress = tracker.fraction
+                overall_bytes_per_second = tracker.bytes_per_second
+                overall_eta = tracker.eta
+            self.emit('backup-progress',progress,overall_bytes_per_second,overall_eta)
             
-            progress = ((sum_fractions / n) if n > 0 else 1.0)
-            if progress < 0.0:
-                progress = 0.0
-            elif progress > 1.0:
-                progress = 1.0
-                
-            self.emit('backup-progress',progress)
+        def on_game_skipped(am,game,reason,mutex):
+            nonlocal n_skipped
+            with mutex:
+                n_skipped += 1
+            
+        def on_game_metrics(am,game,metrics,mutex):
+            with mutex:
+                batch_metrics.add(metrics)
             
         def thread_function(game):
-            self.backup(game,True)
+            # The workers of a background batch are background threads too.
+            with throttle.background(in_background):
+                try:
+                    results[game.key] = self.backup(game,True,archiver)
+                except Exception as ex:
+                    logger.error("Backup of {game} failed! ({error})".format(
+                        game=game.key,
+                        error=str(ex)))
+                    results[game.key] = False
 
         
-        if self.backup_in_progress:
-            raise RuntimeError("A backup is already in progress!!!")
-        self.backup_in_progress = True
+        archiver = self.get_archiver(archiver).key
+        throttle = Throttle.get_global()
+        in_background = throttle.is_background_thread
         game_list = list(games)
         
-        game_progress = dict([(game.key,0.0) for game in game_list])
+        n_games = len(game_list)
+        n_skipped = 0
+        results = {}
+        tracker = ThroughputTracker(0)
         mutex = threading.RLock()
-        
-        self.__backup_many_game_progress_connection = self.connect('backup-game-progress',on_game_progress,game_progress,mutex)
         threadpool = {}
         
-        if settings.backup_threads == 0:
+        if max_threads is None:
+            max_threads = settings.backup_threads
+        if max_threads < 1:
             backup_threads = 1
         else:
-            backup_threads = settings.backup_threads
+            backup_threads = max_threads
+        batch_metrics = BatchMetrics(archiver,backup_threads)
         if len(game_list) > backup_threads:
             n = backup_threads
         else:
             n = len(games)
             
-        for i in range(n):
-            game=game_list[0]
-            del game_list[0]
+        self.__begin_backup()
+        batch_start = time.monotonic()
+        with self.__backup_bytes_mutex:
+            self.__backup_bytes = {}
+        self.__backup_many_game_progress_connection = self.connect('backup-game-progress',on_game_progress,tracker,mutex)
+        skipped_connection = self.connect('backup-game-skipped',on_game_skipped,mutex)
+        metrics_connection = self.connect('backup-metrics',on_game_metrics,mutex)
+        try:
+            for i in range(n):
+                game=game_list[0]
+                del game_list[0]
             
             
-            thread = threading.Thread(target=thread_function,args=(game,),daemon=True)
-            threadpool[i]=thread
-            thread.start()
-        
-        while threadpool:
-            rm_thread=[]
-            for i in threadpool.keys():
-                thread = threadpool[i]
-                if thread.is_alive():
-                    continue
+                thread = threading.Thread(target=thread_function,args=(game,),daemon=True)
+                threadpool[i]=thread
+                thread.start()
+        
+            while threadpool:
+                rm_thread=[]
+                for i in threadpool.keys():
+                    thread = threadpool[i]
+                    if thread.is_alive():
+                        continue
                 
-                if game_list:
-                    game = game_list[0]
-                    del game_list[0]
-                    thread = threading.Thread(target=thread_function,args=(game,),daemon=True)
-                    threadpool[i] = thread
-                    thread.start()
-                else:
-                    rm_thread.append(i)
+                    if game_list:
+                        game = game_list[0]
+                        del game_list[0]
+                        thread = threading.Thread(target=thread_function,args=(game,),daemon=True)
+                        threadpool[i] = thread
+                        thread.start()
+                    else:
+                        rm_thread.append(i)
                     
-            for i in rm_thread:
-                del threadpool[i]
+                for i in rm_thread:
+                    del threadpool[i]
                     
-            time.sleep(0.02)
+                time.sleep(0.02)
                     
-        self.disconnect(self.__backup_many_game_progress_connection)
-        self.emit("backup-finished")
-        self.backup_in_progress = False
+            batch_metrics.total_time = time.monotonic() - batch_start
+            self.emit("backup-batch-metrics",batch_metrics)
+        finally:
+            self.disconnect(self.__backup_many_game_progress_connection)
+            self.disconnect(skipped_connection)
+            self.disconnect(metrics_connection)
+            try:
+                self.emit("backup-finished")
+            finally:
+                self.backup_in_progress = False
+        return results
         
     def _on_archiver_backup(self,archiver:Archiver,game:Game,filename:str)->bool:
         return self.emit('backup',archiver,game,filename)
@@ -319,8 +808,7 @@ class ArchiverManager(GObject):
     @Signal(name="restore",return_type=bool,arg_types=(Archiver,str),
             flags=SignalFlags.RUN_LAST)
     def do_restore(self,archiver:Archiver,filename:str):
-        archiver.restore(filename)
-        return True
+        return bool(archiver.restore(filename))
        
     def is_archive(self,filename:str)->bool:
         if self.standard_archiver.is_archive(filename):
@@ -330,6 +818,12 @@ class ArchiverManager(GObject):
                 return True
         return False
     
+    def has_extension(self,filename:str)->bool:
+        for i in self.archivers.values():
+            if i.has_extension(filename):
+                return True
+        return False
+    
     def get_archiver_for_file(self,filename:str)->Archiver:
         if self.standard_archiver.is_archive(filename):
             return self.standard_archiver
@@ -387,3 +881,43 @@ class ArchiverManager(GObject):
                         if (self.is_archive(filename)):
                             ret.append(filename)
         return ret
+    
+    def iter_backup_infos(self,game:Game,validate:bool=True):
+        """
+        iter_backup_infos Iterate over the backups of a game.
+        
+        Each backup directory is read with a single `os.scandir()` pass.
+
+        :param game: The game to get the backups for.
+        :type game: Game
+        :param validate: If `True` the archives are checked with `is_archive()`
+            which opens the files; otherwise only the extension is checked.
+        :type validate: bool
+        :return: A generator yielding `BackupInfo` instances.
+        """
+        check = self.is_archive if validate else self.has_extension
+        for sgtype in VALID_SAVEGAME_TYPES:
+            for backupdir in [os.path.join(settings.backup_dir,game.savegame_name,sgtype.value,i) for i in ('live','finished')]:
+                try:
+                    entries = list(os.scandir(backupdir))
+                except OSError:
+                    continue
+                for entry in entries:
+                    try:
+                        if not entry.is_file() or not check(entry.path):
+                            continue
+                        yield BackupInfo.new_from_direntry(entry)
+                    except OSError:
+                        continue
+                    
+    def get_backup_infos(self,game:Game,validate:bool=True)->list[BackupInfo]:
+        """
+        get_backup_infos Get the `BackupInfo` of all backups of a game.
+
+        :param game: The game to get the backups for.
+        :type game: Game
+        :param validate: Open the archives to validate them.
+        :type validate: bool
+        :rtype: list[BackupInfo]
+        """
+        return list(self.iter_backup_infos(game,validate))
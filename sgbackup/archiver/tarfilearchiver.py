@@ -19,12 +19,13 @@
 from gi.repository.GObject import Property
 from gi.repository import GLib
 
-from ._archiver import Archiver
+from ._archiver import Archiver,BackupProgress
 from tarfile import open as tf_open, is_tarfile
 from tempfile import mkdtemp,NamedTemporaryFile
 import json
 import os
 from ..game import Game
+from ..throttle import Throttle
 import logging
 logger = logging.getLogger(__name__)
 
@@ -56,17 +57,15 @@ class TarfileArchiver(Archiver):
             return False
             
     def do_backup(self, game, filename):
-        _calc_fraction = lambda n,cnt: ((1.0 / n) * cnt)
-        
         self._backup_progress(game,0.0,"Starting {game} ...".format(game=game.name))
         files = game.get_backup_files()
+        progress = BackupProgress(self,game,files)
         
-        n = len(files) + 2
-        cnt=1
         data=json.dumps(game.serialize(),ensure_ascii=False,indent=4)
         
-        with tf_open(filename,'x:{}'.format(self.compression)) as tf:
-            self._backup_progress(game,_calc_fraction(n,cnt),"gameconf.json")
+        with Throttle.get_global().open_for_writing(filename) as backup_file, \
+                tf_open(fileobj=backup_file,mode='w:{}'.format(self.compression)) as tf:
+            progress.set_message("gameconf.json")
             gcf = os.path.join(GLib.get_tmp_dir(),"sgbackup-" + GLib.get_user_name() + "." + "backup." + game.key + ".gameconf.tmp")
             with open(gcf,"wt",encoding="utf-8") as gcfile:
                 gcfile.write(data)
@@ -74,17 +73,22 @@ class TarfileArchiver(Archiver):
             tf.add(gcf,"gameconf.json")
             
             for path,arcname in files.items():
-                cnt += 1
-                self._backup_progress(game,_calc_fraction(n,cnt),"arcname")
-                tf.add(path,arcname)
+                progress.set_message(arcname)
+                tarinfo = tf.gettarinfo(path,arcname)
+                if tarinfo.isreg():
+                    with progress.open(path) as ifile:
+                        tf.addfile(tarinfo,ifile)
+                else:
+                    tf.addfile(tarinfo)
                 
-        self._backup_progress(game,1.0,message="Finished ...")
+        self._backup_progress(game,1.0,"Finished ...",
+                              progress.total_bytes,progress.total_bytes,progress.bytes_per_second,0.0)
         return True
     
     def do_restore(self,filename):
         def rmdir_recursive(dir):
             for dirent in os.listdir(dir):
-                fname = os.path.join(dirent)
+                fname = os.path.join(dir,dirent)
                 
                 if os.path.islink(fname):
                     os.unlink(fname)
@@ -16,38 +16,43 @@
 #    along with this program.  If not, see <https://www.gnu.org/licenses/>.   #
 ###############################################################################
 
-from ._archiver import Archiver
+from ._archiver import Archiver,BackupProgress
 import zipfile
 import json
 import os
 from ..game import Game,GameManager
 from ..settings import settings
+from ..throttle import Throttle
 
 class ZipfileArchiver(Archiver):
     def __init__(self):
         Archiver.__init__(self,"zipfile","ZipFile",[".zip"],"Archiver for .zip files.")
         
     def do_backup(self, game:Game, filename:str):
-        _calc_fraction = lambda n,cnt: ((1.0 / n) * cnt)
-        
         self._backup_progress(game,0.0,"Starting {game} ...".format(game=game.name))
         
         files = game.get_backup_files()
-        div = len(files) + 2
-        cnt=1
+        progress = BackupProgress(self,game,files)
+        compression = settings.zipfile_compression
+        compresslevel = settings.zipfile_compresslevel
         game_data = json.dumps(game.serialize(),ensure_ascii=False,indent=4)
-        with zipfile.ZipFile(filename,mode="w",
-                             compression=settings.zipfile_compression,
-                             compresslevel=settings.zipfile_compresslevel) as zf:
-            self._backup_progress(game,_calc_fraction(div,cnt),"{} -> {}".format(game.name,"gameconf.json"))
+        with Throttle.get_global().open_for_writing(filename) as backup_file, \
+                zipfile.ZipFile(backup_file,mode="w",
+                                compression=compression,
+                                compresslevel=compresslevel) as zf:
+            progress.set_message("{} -> {}".format(game.name,"gameconf.json"))
             zf.writestr("gameconf.json",game_data)
             for path,arcname in files.items():
-                cnt+=1
-                self._backup_progress(game,_calc_fraction(div,cnt),"{} -> {}".format(game.name,arcname))
-                zf.write(path,arcname)
+                progress.set_message("{} -> {}".format(game.name,arcname))
+                zinfo = zipfile.ZipInfo.from_file(path,arcname)
+                zinfo.compress_type = compression
+                zinfo._compresslevel = compresslevel
+                with zf.open(zinfo,'w',force_zip64=(zinfo.file_size > zipfile.ZIP64_LIMIT)) as ofile:
+                    progress.copy(path,ofile)
                 
-        self._backup_progress(game,1.0,"{game} ... FINISHED".format(game=game.name))
-        
+        self._backup_progress(game,1.0,"{game} ... FINISHED".format(game=game.name),
+                              progress.total_bytes,progress.total_bytes,progress.bytes_per_second,0.0)
+        return True
                 
     def is_archive(self,filename:str)->bool:
         if zipfile.is_zipfile(filename):
@@ -72,7 +77,6 @@ class ZipfileArchiver(Archiver):
             if not os.path.isdir(game.savegame_root):
                 os.makedirs(game.savegame_root)
                
-            print("\n".join([i.filename for i in zf.filelist])) 
             extract_files = [i for i in zf.filelist if i.filename.startswith(zip_game.savegame_dir + "/")]
             for file in extract_files:
                 zf.extract(file,game.savegame_root)
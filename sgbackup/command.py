@@ -39,6 +39,15 @@ class Command:
     def get_synopsis(self):
         raise NotImplementedError("Command.get_synopsis() is not implemented!")
     
+    def is_forwardable(self)->bool:
+        """
+        is_forwardable Whether the command may be run by a running daemon
+        instead of the CLI process.
+
+        :rtype: bool
+        """
+        return False
+    
     def execute(self,argv:list):
         raise NotImplementedError("Command.execute is not implemented!")
 
@@ -16,30 +16,63 @@
 #    along with this program.  If not, see <https://www.gnu.org/licenses/>.   #
 ###############################################################################
 
-import os
+from collections.abc import Mapping
+from importlib import import_module
 
-COMMANDS = {}
+# Maps the command names to the modules defining them. The modules are only
+# imported when a command is looked up, so the CLI does not import every
+# command (and its dependencies) on startup. Add new commands here.
+COMMAND_MODULES = {
+    'version': 'help',
+    'synopsis': 'help',
+    'usage': 'help',
+    'help': 'help',
+    'backup': 'backup',
+    'list': 'list',
+    'restore': 'restore',
+    'watch': 'watch',
+    'schedule': 'schedule',
+    'daemon': 'daemon',
+    'steam': 'steam',
+}
 
-_mods = []
-
-for _f in os.listdir(os.path.dirname(__file__)):
-    if _f.startswith('_'):
-        continue
+class CommandRegistry(Mapping):
+    """
+    CommandRegistry A lazy mapping of the command names to `Command` instances.
+    
+    Looking up a command imports the module listed in *modules* and reads the
+    command from the `COMMANDS` dict of that module.
+    """
+    def __init__(self,modules:dict[str:str]):
+        self.__modules = dict(modules)
+        self.__commands = {}
+        
+    def __getitem__(self,name:str):
+        if name not in self.__commands:
+            module = import_module("." + self.__modules[name],__name__)
+            self.__commands.update(module.COMMANDS)
+        return self.__commands[name]
+    
+    def __iter__(self):
+        return iter(self.__modules)
     
-    if _f.endswith('.py') or _f.endswith('.pyc'):
-        if (_f.endswith('py')):
-            _m = _f[0:-3]
-        else:
-            _m = _f[0:-4]
+    def __len__(self):
+        return len(self.__modules)
+    
+    def __contains__(self,name):
+        return name in self.__modules
+    
+    def register(self,name:str,module:str):
+        """
+        register Register a command module.
+
+        :param name: The name of the command.
+        :type name: str
+        :param module: The name of the module in `sgbackup.commands`.
+        :type module: str
+        """
+        self.__modules[name] = module
+        if name in self.__commands:
+            del self.__commands[name]
 
-        if _m not in _mods:
-            exec("\n".join([
-                "from . import " + _m,
-                "_mods.append(_m)",
-                "_mod = " + _m]))
-            if hasattr(_mod,"COMMANDS"): #and _mod.COMMANDS:
-                COMMANDS.update(_mod.COMMANDS)
-                    
-del _mods
-del _f
-del _m
+COMMANDS = CommandRegistry(COMMAND_MODULES)
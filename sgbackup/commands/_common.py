@@ -0,0 +1,93 @@
+###############################################################################
+# sgbackup - The SaveGame Backup tool                                         #
+#    Copyright (C) 2024,2025  Christian Moser                                 #
+#                                                                             #
+#    This program is free software: you can redistribute it and/or modify     #
+#    it under the terms of the GNU General Public License as published by     #
+#    the Free Software Foundation, either version 3 of the License, or        #
+#    (at your option) any later version.                                      #
+#                                                                             #
+#    This program is distributed in the hope that it will be useful,          #
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of           #
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the            #
+#    GNU General Public License for more details.                             #
+#                                                                             #
+#    You should have received a copy of the GNU General Public License        #
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.   #
+###############################################################################
+
+import fnmatch
+import signal
+import argparse
+from gi.repository import GLib
+
+from ..game import GameManager,Game
+
+def add_game_selection_arguments(parser:argparse.ArgumentParser,verb:str):
+    """
+    add_game_selection_arguments Add the game selection arguments to a parser.
+
+    The arguments are read by `select_games()`.
+
+    :param parser: The parser to add the arguments to.
+    :type parser: argparse.ArgumentParser
+    :param verb: The verb used in the help texts, like "back up".
+    :type verb: str
+    """
+    parser.add_argument('games',metavar='GAME',nargs='*',
+                        help="Glob patterns matching the keys of the games to {verb}.".format(verb=verb))
+    parser.add_argument('-a','--all',dest='all_games',action='store_true',
+                        help="{verb} all games.".format(verb=verb.capitalize()))
+    parser.add_argument('--active',action='store_true',
+                        help="Only {verb} active games.".format(verb=verb))
+    parser.add_argument('--live',action='store_true',
+                        help="Only {verb} live games.".format(verb=verb))
+
+def select_games(patterns:list[str],all_games:bool=False,active:bool=False,live:bool=False)->list[Game]:
+    """
+    select_games Select games for a CLI command.
+
+    The games are matched by their keys against the glob *patterns*. If no
+    patterns are given, all games are selected when *all_games*, *active* or
+    *live* is set. *active* and *live* further restrict the selection.
+
+    :param patterns: Glob patterns matching the game keys.
+    :type patterns: list[str]
+    :param all_games: Select all games.
+    :type all_games: bool
+    :param active: Only select active games.
+    :type active: bool
+    :param live: Only select live games.
+    :type live: bool
+    :return: The selected games sorted by their key.
+    :rtype: list[Game]
+    """
+    games = GameManager.get_global().games
+    if patterns:
+        keys = set()
+        for pattern in patterns:
+            keys.update(fnmatch.filter(games.keys(),pattern))
+        selected = [games[key] for key in keys]
+    elif all_games or active or live:
+        selected = list(games.values())
+    else:
+        return []
+
+    if active:
+        selected = [game for game in selected if game.is_active]
+    if live:
+        selected = [game for game in selected if game.is_live]
+    return sorted(selected,key=lambda game: game.key)
+
+def run_main_loop():
+    """
+    run_main_loop Run a GLib main loop until SIGINT or SIGTERM is received.
+    """
+    loop = GLib.MainLoop()
+    if hasattr(GLib,'unix_signal_add'):
+        for signum in (signal.SIGINT,signal.SIGTERM):
+            GLib.unix_signal_add(GLib.PRIORITY_DEFAULT,signum,loop.quit)
+    try:
+        loop.run()
+    except KeyboardInterrupt:
+        pass
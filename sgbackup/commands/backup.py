@@ -0,0 +1,194 @@
+###############################################################################
+# sgbackup - The SaveGame Backup tool                                         #
+#    Copyright (C) 2024,2025  Christian Moser                                 #
+#                                                                             #
+#    This program is free software: you can redistribute it and/or modify     #
+#    it under the terms of the GNU General Public License as published by     #
+#    the Free Software Foundation, either version 3 of the License, or        #
+#    (at your option) any later version.                                      #
+#                                                                             #
+#    This program is distributed in the hope that it will be useful,          #
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of           #
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the            #
+#    GNU General Public License for more details.                             #
+#                                                                             #
+#    You should have received a copy of the GNU General Public License        #
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.   #
+###############################################################################
+
+import sys
+import json
+import argparse
+from threading import Lock
+
+from ..command import Command
+from ..settings import settings
+from ..archiver import ArchiverManager
+from ..throttle import Throttle
+from ..utility import format_throughput,format_eta
+from ._common import select_games,add_game_selection_arguments
+
+import logging
+logger = logging.getLogger(__name__)
+
+class BackupCommand(Command):
+    def __init__(self):
+        super().__init__('backup','Backup','Back up savegames.')
+        self.logger = logger.getChild('BackupCommand')
+        self.__mutex = Lock()
+        self.__json = False
+        self.__show_progress = False
+        self.__n_games = 0
+        self.__n_done = 0
+        self.__skipped = set()
+
+    def _create_parser(self)->argparse.ArgumentParser:
+        parser = argparse.ArgumentParser(prog="sgbackup backup",
+                                         description=self.get_description())
+        add_game_selection_arguments(parser,"back up")
+        parser.add_argument('-j','--jobs',type=int,default=None,metavar='N',
+                            help="The number of parallel backups (default: {jobs}).".format(
+                                jobs=settings.backup_threads))
+        parser.add_argument('--archiver',default=None,metavar='ARCHIVER',
+                            choices=sorted(ArchiverManager.get_global().archivers.keys()),
+                            help="The archiver to use (default: {archiver}).".format(
+                                archiver=settings.archiver))
+        parser.add_argument('--background',action='store_true',
+                            help="Throttle the backups and lower their CPU and I/O priority "
+                                 "(see the [throttle] settings).")
+        parser.add_argument('--json',action='store_true',
+                            help="Print progress events as JSON lines.")
+        return parser
+
+    def get_synopsis(self):
+        return "sgbackup backup [-a|--all] [--active] [--live] [-j N] [--archiver ARCHIVER] [--background] [--json] [GAME ...]"
+
+    def get_help(self):
+        return self._create_parser().format_help()
+
+    def is_forwardable(self):
+        return True
+
+    def __print_event(self,event:str,**kwargs):
+        kwargs['event'] = event
+        with self.__mutex:
+            print(json.dumps(kwargs),flush=True)
+
+    def __print_line(self,text:str):
+        with self.__mutex:
+            if self.__show_progress:
+                sys.stderr.write("\r\x1b[K")
+            print(text,flush=True)
+
+    def _on_backup_game_progress(self,am,game,fraction,message,bytes_per_second,eta):
+        if self.__json:
+            self.__print_event('game-progress',game=game.key,fraction=fraction,
+                               bytes_per_second=bytes_per_second,eta=eta)
+
+    def _on_backup_progress(self,am,fraction,bytes_per_second,eta):
+        if self.__json:
+            self.__print_event('progress',fraction=fraction,
+                               bytes_per_second=bytes_per_second,eta=eta)
+        elif self.__show_progress:
+            with self.__mutex:
+                sys.stderr.write("\r\x1b[K[{done}/{total}] {percent:3.0f}% {throughput} ETA {eta}".format(
+                    done=self.__n_done,
+                    total=self.__n_games,
+                    percent=fraction * 100.0,
+                    throughput=format_throughput(bytes_per_second),
+                    eta=format_eta(eta)))
+                sys.stderr.flush()
+
+    def _on_backup_game_skipped(self,am,game,reason):
+        with self.__mutex:
+            self.__n_done += 1
+            self.__skipped.add(game.key)
+        if self.__json:
+            self.__print_event('game-skipped',game=game.key,reason=reason)
+        else:
+            self.__print_line("SKIPPED {game} ({reason})".format(game=game.key,reason=reason))
+
+    def _on_backup_game_finished(self,am,game):
+        with self.__mutex:
+            self.__n_done += 1
+        if self.__json:
+            self.__print_event('game-finished',game=game.key)
+
+    def _on_backup_metrics(self,am,game,metrics):
+        if self.__json:
+            self.__print_event('game-metrics',**metrics.to_dict())
+
+    def _on_backup_batch_metrics(self,am,metrics):
+        if self.__json:
+            self.__print_event('batch-metrics',**metrics.to_dict())
+
+    def execute(self,argv):
+        parser = self._create_parser()
+        try:
+            args = parser.parse_args(argv)
+        except SystemExit as ex:
+            return ex.code
+
+        games = select_games(args.games,args.all_games,args.active,args.live)
+        if not games:
+            self.logger.error("No games selected!")
+            return 3
+
+        self.__json = args.json
+        self.__show_progress = not args.json and sys.stderr.isatty()
+        self.__n_games = len(games)
+        self.__n_done = 0
+        self.__skipped = set()
+
+        am = ArchiverManager.get_global()
+        signals = [
+            am.connect('backup-game-progress',self._on_backup_game_progress),
+            am.connect('backup-progress',self._on_backup_progress),
+            am.connect('backup-game-skipped',self._on_backup_game_skipped),
+            am.connect('backup-game-finished',self._on_backup_game_finished),
+            am.connect('backup-metrics',self._on_backup_metrics),
+            am.connect('backup-batch-metrics',self._on_backup_batch_metrics),
+        ]
+        try:
+            if args.background:
+                with Throttle.get_global().background():
+                    results = am.backup_many(games,args.jobs,args.archiver)
+            else:
+                results = am.backup_many(games,args.jobs,args.archiver)
+        finally:
+            for signal_id in signals:
+                am.disconnect(signal_id)
+
+        n_failed = 0
+        n_skipped = 0
+        for game in games:
+            if results.get(game.key,False):
+                status = "ok"
+            elif game.key in self.__skipped:
+                status = "skipped"
+                n_skipped += 1
+            else:
+                status = "failed"
+                n_failed += 1
+
+            if self.__json:
+                self.__print_event('game-result',game=game.key,status=status)
+            elif status != "skipped":
+                self.__print_line("{status} {game}".format(status=status.upper(),game=game.key))
+
+        if self.__json:
+            self.__print_event('finished',
+                               games=len(games),
+                               failed=n_failed,
+                               skipped=n_skipped)
+        else:
+            self.__print_line("{n} games backed up, {failed} failed, {skipped} skipped.".format(
+                n=len(games) - n_failed - n_skipped,
+                failed=n_failed,
+                skipped=n_skipped))
+
+        return 1 if n_failed else 0
+
+COMMANDS = {
+    'backup': BackupCommand(),
+}
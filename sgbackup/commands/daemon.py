@@ -0,0 +1,98 @@
+###############################################################################
+# sgbackup - The SaveGame Backup tool                                         #
+#    Copyright (C) 2024,2025  Christian Moser                                 #
+#                                                                             #
+#    This program is free software: you can redistribute it and/or modify     #
+#    it under the terms of the GNU General Public License as published by     #
+#    the Free Software Foundation, either version 3 of the License, or        #
+#    (at your option) any later version.                                      #
+#                                                                             #
+#    This program is distributed in the hope that it will be useful,          #
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of           #
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the            #
+#    GNU General Public License for more details.                             #
+#                                                                             #
+#    You should have received a copy of the GNU General Public License        #
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.   #
+###############################################################################
+
+import json
+import argparse
+
+from ..command import Command
+from ..daemon import Daemon,DaemonClient,DaemonError,get_socket_path,is_supported
+
+import logging
+logger = logging.getLogger(__name__)
+
+class DaemonCommand(Command):
+    def __init__(self):
+        super().__init__('daemon','Daemon','Run or control the sgbackup daemon.')
+        self.logger = logger.getChild('DaemonCommand')
+
+    def _create_parser(self)->argparse.ArgumentParser:
+        parser = argparse.ArgumentParser(prog="sgbackup daemon",
+                                         description=self.get_description(),
+                                         epilog="While the daemon is running, the backup, list and restore "
+                                                "commands are run by the daemon. Set SGBACKUP_NO_DAEMON to "
+                                                "run them in the CLI process.")
+        parser.add_argument('action',choices=('run','status','stop','reload'),
+                            help="run: run the daemon in the foreground; "
+                                 "status: show if the daemon is running; "
+                                 "stop: stop the daemon; "
+                                 "reload: reload the games.")
+        parser.add_argument('-s','--socket',default=None,metavar='PATH',
+                            help="The socket of the daemon (default: {path}).".format(path=get_socket_path()))
+        parser.add_argument('--json',action='store_true',
+                            help="Print the status as JSON.")
+        return parser
+
+    def get_synopsis(self):
+        return "sgbackup daemon [-s PATH] [--json] run|status|stop|reload"
+
+    def get_help(self):
+        return self._create_parser().format_help()
+
+    def execute(self,argv):
+        parser = self._create_parser()
+        try:
+            args = parser.parse_args(argv)
+        except SystemExit as ex:
+            return ex.code
+
+        if not is_supported():
+            self.logger.error("The daemon needs Unix domain sockets!")
+            return 5
+
+        if args.action == 'run':
+            try:
+                return Daemon(args.socket).run()
+            except (RuntimeError,OSError) as ex:
+                self.logger.error("Unable to start the daemon! ({error})".format(error=str(ex)))
+                return 1
+
+        try:
+            with DaemonClient(args.socket,5.0) as client:
+                if args.action == 'status':
+                    result = client.call('ping')
+                    if args.json:
+                        result['socket'] = client.path
+                        result['running'] = True
+                        print(json.dumps(result))
+                    else:
+                        print("sgbackup daemon {version} is running (pid {pid}).".format(**result))
+                elif args.action == 'stop':
+                    client.call('shutdown')
+                elif args.action == 'reload':
+                    client.call('reload')
+        except (OSError,DaemonError) as ex:
+            if args.action == 'status' and args.json:
+                print(json.dumps({'socket':args.socket if args.socket else get_socket_path(),'running':False}))
+            else:
+                self.logger.error("The daemon is not running! ({error})".format(error=str(ex)))
+            return 1
+        return 0
+
+COMMANDS = {
+    'daemon': DaemonCommand(),
+}
@@ -0,0 +1,134 @@
+###############################################################################
+# sgbackup - The SaveGame Backup tool                                         #
+#    Copyright (C) 2024,2025  Christian Moser                                 #
+#                                                                             #
+#    This program is free software: you can redistribute it and/or modify     #
+#    it under the terms of the GNU General Public License as published by     #
+#    the Free Software Foundation, either version 3 of the License, or        #
+#    (at your option) any later version.                                      #
+#                                                                             #
+#    This program is distributed in the hope that it will be useful,          #
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of           #
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the            #
+#    GNU General Public License for more details.                             #
+#                                                                             #
+#    You should have received a copy of the GNU General Public License        #
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.   #
+###############################################################################
+
+import json
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from ..command import Command
+from ..game import Game
+from ..archiver import ArchiverManager,BackupInfo
+from ..utility import format_size
+from ._common import select_games,add_game_selection_arguments
+
+import logging
+logger = logging.getLogger(__name__)
+
+# The backup directories are often located on network shares, so the
+# directories of the games are read in parallel.
+MAX_LIST_THREADS = 8
+
+def list_backups(games:list[Game])->list[tuple[Game,list[BackupInfo]]]:
+    """
+    list_backups Get the backups of multiple games.
+
+    The archives are not opened, the metadata are parsed from the filenames.
+
+    :param games: The games to list the backups for.
+    :type games: list[Game]
+    :return: A list of `(game,backups)` tuples in the order of *games*. The
+        backups are sorted by their timestamp.
+    :rtype: list[tuple[Game,list[BackupInfo]]]
+    """
+    def get_backups(game):
+        return sorted(am.iter_backup_infos(game,validate=False),key=lambda info: info.timestamp)
+
+    am = ArchiverManager.get_global()
+    if len(games) < 2:
+        return [(game,get_backups(game)) for game in games]
+
+    with ThreadPoolExecutor(max_workers=min(MAX_LIST_THREADS,len(games))) as executor:
+        return list(zip(games,executor.map(get_backups,games)))
+
+def backup_info_to_dict(game:Game,info:BackupInfo)->dict:
+    """
+    backup_info_to_dict Convert a `BackupInfo` to a dict for JSON output.
+
+    :param game: The game the backup belongs to.
+    :type game: Game
+    :param info: The backup.
+    :type info: BackupInfo
+    :rtype: dict
+    """
+    return {
+        'game': game.key,
+        'filename': info.filename,
+        'size': info.size,
+        'timestamp': info.timestamp.isoformat(),
+        'savegame_type': info.savegame_type.value,
+        'live': info.is_live,
+    }
+
+class ListCommand(Command):
+    def __init__(self):
+        super().__init__('list','List','List the backups of games.')
+        self.logger = logger.getChild('ListCommand')
+
+    def _create_parser(self)->argparse.ArgumentParser:
+        parser = argparse.ArgumentParser(prog="sgbackup list",
+                                         description=self.get_description())
+        add_game_selection_arguments(parser,"list")
+        parser.add_argument('--json',action='store_true',
+                            help="Print the backups as JSON lines.")
+        return parser
+
+    def get_synopsis(self):
+        return "sgbackup list [-a|--all] [--active] [--live] [--json] [GAME ...]"
+
+    def get_help(self):
+        return self._create_parser().format_help()
+
+    def is_forwardable(self):
+        return True
+
+    def execute(self,argv):
+        parser = self._create_parser()
+        try:
+            args = parser.parse_args(argv)
+        except SystemExit as ex:
+            return ex.code
+
+        if not args.games and not (args.all_games or args.active or args.live):
+            games = select_games([],all_games=True)
+        else:
+            games = select_games(args.games,args.all_games,args.active,args.live)
+        if not games:
+            self.logger.error("No games selected!")
+            return 3
+
+        for game,backups in list_backups(games):
+            if args.json:
+                for info in backups:
+                    print(json.dumps(backup_info_to_dict(game,info)))
+                continue
+
+            if not backups:
+                continue
+            print("{game} ({name})".format(game=game.key,name=game.name))
+            for info in backups:
+                print("  {timestamp}  {sgtype:<8} {state:<8} {size:>10}  {filename}".format(
+                    timestamp=info.timestamp.strftime("%Y-%m-%d %H:%M:%S"),
+                    sgtype=info.savegame_type.value,
+                    state="live" if info.is_live else "finished",
+                    size=format_size(info.size),
+                    filename=info.filename))
+        return 0
+
+COMMANDS = {
+    'list': ListCommand(),
+}
@@ -0,0 +1,131 @@
+###############################################################################
+# sgbackup - The SaveGame Backup tool                                         #
+#    Copyright (C) 2024,2025  Christian Moser                                 #
+#                                                                             #
+#    This program is free software: you can redistribute it and/or modify     #
+#    it under the terms of the GNU General Public License as published by     #
+#    the Free Software Foundation, either version 3 of the License, or        #
+#    (at your option) any later version.                                      #
+#                                                                             #
+#    This program is distributed in the hope that it will be useful,          #
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of           #
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the            #
+#    GNU General Public License for more details.                             #
+#                                                                             #
+#    You should have received a copy of the GNU General Public License        #
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.   #
+###############################################################################
+
+import os
+import json
+import argparse
+from threading import Lock
+from concurrent.futures import ThreadPoolExecutor
+
+from ..command import Command
+from ..settings import settings
+from ..archiver import ArchiverManager
+from ._common import select_games,add_game_selection_arguments
+from .list import list_backups
+
+import logging
+logger = logging.getLogger(__name__)
+
+class RestoreCommand(Command):
+    def __init__(self):
+        super().__init__('restore','Restore','Restore savegame backups.')
+        self.logger = logger.getChild('RestoreCommand')
+        self.__mutex = Lock()
+
+    def _create_parser(self)->argparse.ArgumentParser:
+        parser = argparse.ArgumentParser(prog="sgbackup restore",
+                                         description=self.get_description())
+        add_game_selection_arguments(parser,"restore")
+        parser.add_argument('-f','--file',dest='files',action='append',default=[],metavar='FILE',
+                            help="Restore the backup FILE instead of the latest backup of a game. Can be given multiple times. "
+                                 "The latest backup is the newest backup of the savegame type and the live "
+                                 "state of the game.")
+        parser.add_argument('-j','--jobs',type=int,default=None,metavar='N',
+                            help="The number of parallel restores (default: {jobs}).".format(
+                                jobs=settings.backup_threads))
+        parser.add_argument('--json',action='store_true',
+                            help="Print the results as JSON lines.")
+        return parser
+
+    def get_synopsis(self):
+        return "sgbackup restore [-a|--all] [--active] [--live] [-f FILE ...] [-j N] [--json] [GAME ...]"
+
+    def get_help(self):
+        return self._create_parser().format_help()
+
+    def is_forwardable(self):
+        return True
+
+    def __print_result(self,as_json:bool,game:str|None,filename:str|None,status:str):
+        with self.__mutex:
+            if as_json:
+                print(json.dumps({'event':'restore','game':game,'filename':filename,'status':status}),flush=True)
+            elif filename:
+                print("{status} {filename}".format(status=status.upper(),filename=filename),flush=True)
+            else:
+                print("{status} {game} (no backups)".format(status=status.upper(),game=game),flush=True)
+
+    def execute(self,argv):
+        def restore(job):
+            game_key,filename = job
+            try:
+                result = am.restore(filename)
+            except Exception as ex:
+                self.logger.error("Restoring \"{filename}\" failed! ({error})".format(
+                    filename=filename,
+                    error=str(ex)))
+                result = False
+            self.__print_result(args.json,game_key,filename,"ok" if result else "failed")
+            return result
+
+        parser = self._create_parser()
+        try:
+            args = parser.parse_args(argv)
+        except SystemExit as ex:
+            return ex.code
+
+        jobs = [(None,os.path.abspath(filename)) for filename in args.files]
+        n_skipped = 0
+        if args.games or args.all_games or args.active or args.live:
+            for game,backups in list_backups(select_games(args.games,args.all_games,args.active,args.live)):
+                # Only restore backups of the savegame type and the live state
+                # of the game, never another platform's savegames.
+                backups = [info for info in backups
+                           if info.savegame_type == game.savegame_type and info.is_live == game.is_live]
+                if backups:
+                    jobs.append((game.key,backups[-1].filename))
+                else:
+                    n_skipped += 1
+                    self.__print_result(args.json,game.key,None,"skipped")
+
+        if not jobs:
+            self.logger.error("No backups selected!")
+            return 3
+
+        am = ArchiverManager.get_global()
+        max_threads = args.jobs if args.jobs is not None else settings.backup_threads
+        with ThreadPoolExecutor(max_workers=max(1,min(max_threads,len(jobs)))) as executor:
+            results = list(executor.map(restore,jobs))
+
+        n_failed = results.count(False)
+        if args.json:
+            print(json.dumps({'event':'finished',
+                              'restored':len(results) - n_failed,
+                              'failed':n_failed,
+                              'skipped':n_skipped}),flush=True)
+        else:
+            print("{n} backups restored, {failed} failed, {skipped} games skipped.".format(
+                n=len(results) - n_failed,
+                failed=n_failed,
+                skipped=n_skipped))
+
+        return 1 if n_failed else 0
+
+COMMANDS = {
+    'restore': RestoreCommand(),
+}
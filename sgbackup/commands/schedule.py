@@ -0,0 +1,107 @@
+###############################################################################
+# sgbackup - The SaveGame Backup tool                                         #
+#    Copyright (C) 2024,2025  Christian Moser                                 #
+#                                                                             #
+#    This program is free software: you can redistribute it and/or modify     #
+#    it under the terms of the GNU General Public License as published by     #
+#    the Free Software Foundation, either version 3 of the License, or        #
+#    (at your option) any later version.                                      #
+#                                                                             #
+#    This program is distributed in the hope that it will be useful,          #
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of           #
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the            #
+#    GNU General Public License for more details.                             #
+#                                                                             #
+#    You should have received a copy of the GNU General Public License        #
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.   #
+###############################################################################
+
+import json
+import argparse
+import datetime
+
+from ..command import Command
+from ..game import GameManager
+from ..scheduler import BackupScheduler
+from ._common import run_main_loop
+
+import logging
+logger = logging.getLogger(__name__)
+
+class ScheduleCommand(Command):
+    def __init__(self):
+        super().__init__('schedule','Schedule','Run scheduled backups of the active live games.')
+        self.logger = logger.getChild('ScheduleCommand')
+
+    def _create_parser(self)->argparse.ArgumentParser:
+        parser = argparse.ArgumentParser(prog="sgbackup schedule",
+                                         description=self.get_description())
+        parser.add_argument('-l','--list',action='store_true',
+                            help="Show when the games are due and exit.")
+        parser.add_argument('--json',action='store_true',
+                            help="Print events as JSON lines.")
+        return parser
+
+    def get_synopsis(self):
+        return "sgbackup schedule [-l|--list] [--json]"
+
+    def get_help(self):
+        return self._create_parser().format_help()
+
+    def list_due_times(self,as_json:bool):
+        scheduler = BackupScheduler.get_global()
+        games = [game for game in GameManager.get_global().games.values() if game.is_active and game.is_live]
+        due_times = [(scheduler.get_next_due_time(game),game) for game in games]
+        for due,game in sorted(due_times,key=lambda i: (i[0],i[1].key)):
+            if as_json:
+                print(json.dumps({'game':game.key,
+                                  'due':due,
+                                  'interval':scheduler.get_interval(game)}))
+            elif due > 0.0:
+                print("{due}  {game}".format(
+                    due=datetime.datetime.fromtimestamp(due).strftime("%Y-%m-%d %H:%M:%S"),
+                    game=game.key))
+            else:
+                print("{due:<19}  {game}".format(due="now",game=game.key))
+
+    def _on_batch_started(self,scheduler,keys,as_json):
+        if as_json:
+            print(json.dumps({'event':'batch-started','games':keys}),flush=True)
+        else:
+            print("BACKUP {games}".format(games=" ".join(keys)),flush=True)
+
+    def _on_batch_finished(self,scheduler,results,as_json):
+        if as_json:
+            print(json.dumps({'event':'batch-finished','results':results}),flush=True)
+            return
+        for key,result in results.items():
+            print("{status} {game}".format(status="OK" if result else "FAILED",game=key),flush=True)
+
+    def execute(self,argv):
+        parser = self._create_parser()
+        try:
+            args = parser.parse_args(argv)
+        except SystemExit as ex:
+            return ex.code
+
+        if args.list:
+            self.list_due_times(args.json)
+            return 0
+
+        scheduler = BackupScheduler.get_global()
+        signals = [
+            scheduler.connect('batch-started',self._on_batch_started,args.json),
+            scheduler.connect('batch-finished',self._on_batch_finished,args.json),
+        ]
+        scheduler.start()
+        try:
+            run_main_loop()
+        finally:
+            scheduler.stop()
+            for signal_id in signals:
+                scheduler.disconnect(signal_id)
+        return 0
+
+COMMANDS = {
+    'schedule': ScheduleCommand(),
+}
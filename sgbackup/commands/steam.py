@@ -0,0 +1,78 @@
+###############################################################################
+# sgbackup - The SaveGame Backup tool                                         #
+#    Copyright (C) 2024,2025  Christian Moser                                 #
+#                                                                             #
+#    This program is free software: you can redistribute it and/or modify     #
+#    it under the terms of the GNU General Public License as published by     #
+#    the Free Software Foundation, either version 3 of the License, or        #
+#    (at your option) any later version.                                      #
+#                                                                             #
+#    This program is distributed in the hope that it will be useful,          #
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of           #
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the            #
+#    GNU General Public License for more details.                             #
+#                                                                             #
+#    You should have received a copy of the GNU General Public License        #
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.   #
+###############################################################################
+
+import json
+import argparse
+
+from ..command import Command
+from ..steam import Steam
+
+import logging
+logger = logging.getLogger(__name__)
+
+class SteamCommand(Command):
+    def __init__(self):
+        super().__init__('steam','Steam','Manage the Steam games.')
+        self.logger = logger.getChild('SteamCommand')
+
+    def _create_parser(self)->argparse.ArgumentParser:
+        parser = argparse.ArgumentParser(prog="sgbackup steam",
+                                         description=self.get_description())
+        subparsers = parser.add_subparsers(dest='action',metavar='ACTION',required=True)
+        update_parser = subparsers.add_parser('update',
+                                              help="Update the installdir and the library of the Steam games "
+                                                   "from the installed apps, for example after moving a library.")
+        update_parser.add_argument('--json',action='store_true',
+                                   help="Print the changed games as JSON lines.")
+        return parser
+
+    def get_synopsis(self):
+        return "sgbackup steam update [--json]"
+
+    def get_help(self):
+        return self._create_parser().format_help()
+
+    def is_forwardable(self):
+        # a running daemon needs to see the new directories
+        return True
+
+    def execute(self,argv):
+        parser = self._create_parser()
+        try:
+            args = parser.parse_args(argv)
+        except SystemExit as ex:
+            return ex.code
+
+        if args.action == 'update':
+            return self.__update(args.json)
+        return 1
+
+    def __update(self,as_json:bool)->int:
+        changed = Steam().update_steam_apps()
+        for game in changed:
+            if as_json:
+                print(json.dumps({'game':game.key,'name':game.name}),flush=True)
+            else:
+                print("UPDATED {game} ({name})".format(game=game.key,name=game.name),flush=True)
+        if not as_json:
+            print("{n} games updated.".format(n=len(changed)))
+        return 0
+
+COMMANDS = {
+    'steam': SteamCommand(),
+}
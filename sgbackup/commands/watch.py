@@ -0,0 +1,164 @@
+###############################################################################
+# sgbackup - The SaveGame Backup tool                                         #
+#    Copyright (C) 2024,2025  Christian Moser                                 #
+#                                                                             #
+#    This program is free software: you can redistribute it and/or modify     #
+#    it under the terms of the GNU General Public License as published by     #
+#    the Free Software Foundation, either version 3 of the License, or        #
+#    (at your option) any later version.                                      #
+#                                                                             #
+#    This program is distributed in the hope that it will be useful,          #
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of           #
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the            #
+#    GNU General Public License for more details.                             #
+#                                                                             #
+#    You should have received a copy of the GNU General Public License        #
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.   #
+###############################################################################
+
+import json
+import argparse
+
+from ..command import Command
+from ..settings import settings
+from ..watcher import SavegameWatcher,BackupQueue
+from ..procwatch import GameProcessWatcher
+from ._common import select_games,run_main_loop
+
+import logging
+logger = logging.getLogger(__name__)
+
+class WatchCommand(Command):
+    def __init__(self):
+        super().__init__('watch','Watch','Back up games when their savegames change.')
+        self.logger = logger.getChild('WatchCommand')
+
+    def _create_parser(self)->argparse.ArgumentParser:
+        parser = argparse.ArgumentParser(prog="sgbackup watch",
+                                         description=self.get_description())
+        parser.add_argument('games',metavar='GAME',nargs='*',
+                            help="Glob patterns matching the keys of the games to watch. "
+                                 "If no games are given, all active live games are watched.")
+        parser.add_argument('-q','--quiet-period',type=float,default=None,metavar='SECONDS',
+                            help="The seconds a savegame directory has to be unchanged before it is backed up (default: {seconds}).".format(
+                                seconds=settings.watch_quiet_period))
+        parser.add_argument('--on-exit',action='store_true',
+                            help="Back up a game when its processes exit instead of when its savegames change. "
+                                 "If no games are given, all active games are watched.")
+        parser.add_argument('--json',action='store_true',
+                            help="Print events as JSON lines.")
+        return parser
+
+    def get_synopsis(self):
+        return "sgbackup watch [-q SECONDS] [--on-exit] [--json] [GAME ...]"
+
+    def get_help(self):
+        return self._create_parser().format_help()
+
+    def _print_event(self,as_json:bool,event:str,game:str,text:str,**kwargs):
+        if as_json:
+            kwargs['event'] = event
+            kwargs['game'] = game
+            print(json.dumps(kwargs),flush=True)
+        else:
+            print(text,flush=True)
+
+    def create_watcher(self,args)->SavegameWatcher|None:
+        """
+        create_watcher Create the `SavegameWatcher` for the parsed arguments.
+
+        :param args: The parsed arguments.
+        :return: The watcher or `None` if no games were selected.
+        :rtype: SavegameWatcher|None
+        """
+        if args.games:
+            games = select_games(args.games)
+            if not games:
+                return None
+        else:
+            games = None
+
+        watcher = SavegameWatcher(games,args.quiet_period)
+        watcher.connect('game-changed',lambda w,game: self._print_event(
+            args.json,'game-changed',game.key,
+            "CHANGED {game}".format(game=game.key)))
+        watcher.connect('backup-finished',lambda w,game,result: self._print_event(
+            args.json,'backup-finished',game.key,
+            "{status} {game}".format(status="OK" if result else "FAILED",game=game.key),
+            success=result))
+        return watcher
+
+    def watch_processes(self,args)->int:
+        """
+        watch_processes Back up games when their processes exit.
+
+        :param args: The parsed arguments.
+        :return: The exit code.
+        :rtype: int
+        """
+        if args.games:
+            games = select_games(args.games)
+            if not games:
+                self.logger.error("No games selected!")
+                return 3
+        else:
+            games = None
+
+        if not GameProcessWatcher.is_supported():
+            self.logger.error("Watching game processes is not supported on this platform!")
+            return 5
+
+        queue = BackupQueue()
+        procwatcher = GameProcessWatcher(games)
+        procwatcher.connect('game-started',lambda w,game: self._print_event(
+            args.json,'game-started',game.key,
+            "STARTED {game}".format(game=game.key)))
+        procwatcher.connect('game-exited',lambda w,game: self._print_event(
+            args.json,'game-exited',game.key,
+            "EXITED {game}".format(game=game.key)))
+        procwatcher.connect('game-exited',lambda w,game: queue.queue(game))
+        queue.connect('backup-finished',lambda q,game,result: self._print_event(
+            args.json,'backup-finished',game.key,
+            "{status} {game}".format(status="OK" if result else "FAILED",game=game.key),
+            success=result))
+
+        queue.start()
+        procwatcher.start()
+        self.logger.info("Watching game processes{netlink}.".format(
+            netlink=" (netlink)" if procwatcher.uses_netlink else ""))
+        run_main_loop()
+        procwatcher.stop()
+        queue.stop()
+        return 0
+
+    def execute(self,argv):
+        parser = self._create_parser()
+        try:
+            args = parser.parse_args(argv)
+        except SystemExit as ex:
+            return ex.code
+
+        if args.on_exit:
+            return self.watch_processes(args)
+
+        watcher = self.create_watcher(args)
+        if watcher is None:
+            self.logger.error("No games selected!")
+            return 3
+
+        watcher.start()
+        if not watcher.games and not watcher.pending_games and args.games:
+            self.logger.error("None of the selected savegame directories can be watched!")
+            watcher.stop()
+            return 3
+
+        self.logger.info("Watching {n} games ({pending} waiting for their savegame directory).".format(
+            n=len(watcher.games),
+            pending=len(watcher.pending_games)))
+        run_main_loop()
+        watcher.stop()
+        return 0
+
+COMMANDS = {
+    'watch': WatchCommand(),
+}
@@ -0,0 +1,792 @@
+###############################################################################
+# sgbackup - The SaveGame Backup tool                                         #
+#    Copyright (C) 2024,2025  Christian Moser                                 #
+#                                                                             #
+#    This program is free software: you can redistribute it and/or modify     #
+#    it under the terms of the GNU General Public License as published by     #
+#    the Free Software Foundation, either version 3 of the License, or        #
+#    (at your option) any later version.                                      #
+#                                                                             #
+#    This program is distributed in the hope that it will be useful,          #
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of           #
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the            #
+#    GNU General Public License for more details.                             #
+#                                                                             #
+#    You should have received a copy of the GNU General Public License        #
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.   #
+###############################################################################
+
+"""
+A long running sgbackup process that serves CLI commands over a Unix domain
+socket.
+
+The protocol is JSON-RPC 2.0 with one JSON object per line. Besides the
+response the daemon sends notifications to the client:
+
++ **output** - `{"stream":"stdout"|"stderr","text":str}` output of a command.
++ **backup-game-progress**, **backup-game-skipped**, **backup-game-finished**,
+  **backup-progress**, **backup-finished** - `ArchiverManager` events for
+  clients that called `subscribe`.
++ **backups-pruned** - `{"game":str,"files":list[str]}` the expired backups
+  deleted by the `RetentionManager`, for clients that called `subscribe`.
+
+Methods:
+
++ **ping** - Returns `{"version":str,"pid":int}`.
++ **execute** - `{"command":str,"argv":list[str],"isatty":bool,"cwd":str,"env":dict}`.
+  Runs a command in the working directory *cwd* of the client and returns
+  `{"exit_code":int}`. Commands are run one at a time. If the variables in
+  *env* that select the configuration differ from the daemon's, the call
+  fails with `ERROR_ENVIRONMENT` and the client runs the command itself.
++ **reload** - Reloads the games.
++ **subscribe** - Streams the backup events until the client disconnects.
+  This is used by the GUI to follow the backups run by the daemon (see
+  `DaemonAttachment`).
++ **shutdown** - Stops the daemon.
+"""
+
+from gi.repository import GLib,Gio
+
+import os
+import sys
+import json
+import signal
+import socket
+import threading
+
+from .version import VERSION
+
+import logging
+logger = logging.getLogger(__name__)
+
+# Setting this environment variable disables forwarding commands to the daemon.
+NO_DAEMON_ENV = "SGBACKUP_NO_DAEMON"
+# Overrides the socket path.
+SOCKET_ENV = "SGBACKUP_DAEMON_SOCKET"
+
+# The delay before the games are reloaded after a gameconf file changed.
+RELOAD_DELAY = 1000
+
+# The environment variables that select the configuration. Commands of
+# clients with other values are not run by the daemon.
+CONFIG_ENV = ('HOME','XDG_CONFIG_HOME')
+
+# The error code of `execute` if the daemon can not run the command in the
+# environment of the client.
+ERROR_ENVIRONMENT = -32001
+
+class DaemonError(Exception):
+    """
+    DaemonError An error response of the daemon.
+    """
+    def __init__(self,message:str,code:int=-32000):
+        Exception.__init__(self,message)
+        self.code = code
+
+def is_supported()->bool:
+    return hasattr(socket,'AF_UNIX')
+
+def get_socket_path()->str:
+    """
+    get_socket_path Get the path of the daemon socket.
+
+    :return: `$SGBACKUP_DAEMON_SOCKET` or `sgbackup/daemon.sock` in the
+        user runtime directory.
+    :rtype: str
+    """
+    path = os.environ.get(SOCKET_ENV,None)
+    if path:
+        return path
+    return os.path.join(GLib.get_user_runtime_dir(),'sgbackup','daemon.sock')
+
+class DaemonClient(object):
+    """
+    DaemonClient A client of the sgbackup daemon.
+
+    It is used by the CLI to forward commands and can be used by the GUI to
+    attach to a running daemon.
+    """
+    def __init__(self,path:str|None=None,timeout:float|None=None):
+        self.__path = path if path else get_socket_path()
+        self.__timeout = timeout
+        self.__socket = None
+        self.__rfile = None
+        self.__next_id = 1
+
+    @property
+    def path(self)->str:
+        return self.__path
+
+    def connect(self):
+        """
+        connect Connect to the daemon.
+
+        :raises OSError: If the daemon is not running.
+        """
+        if self.__socket is not None:
+            return
+        sock = socket.socket(socket.AF_UNIX,socket.SOCK_STREAM)
+        try:
+            sock.settimeout(self.__timeout)
+            sock.connect(self.__path)
+        except:
+            sock.close()
+            raise
+        self.__socket = sock
+        self.__rfile = sock.makefile('r',encoding="utf-8")
+
+    def close(self):
+        if self.__socket is None:
+            return
+        try:
+            # wakes up a thread blocked in subscribe()
+            self.__socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.__rfile.close()
+        self.__socket.close()
+        self.__socket = None
+        self.__rfile = None
+
+    def __enter__(self):
+        self.connect()
+        return self
+
+    def __exit__(self,exc_type,exc_value,traceback):
+        self.close()
+
+    def call(self,method:str,params:dict|None=None,on_notification=None):
+        """
+        call Call a method of the daemon.
+
+        :param method: The name of the method.
+        :type method: str
+        :param params: The parameters.
+        :type params: dict|None
+        :param on_notification: Called with `(method,params)` for every
+            notification received before the response.
+        :raises DaemonError: If the daemon returned an error.
+        :raises OSError: If the connection failed.
+        :return: The result of the call.
+        """
+        self.connect()
+        request_id = self.__next_id
+        self.__next_id += 1
+        request = {'jsonrpc':"2.0",'id':request_id,'method':method,'params':params if params else {}}
+        self.__socket.sendall((json.dumps(request) + "\n").encode("utf-8"))
+
+        for line in self.__rfile:
+            message = json.loads(line)
+            if 'id' not in message:
+                if on_notification is not None:
+                    on_notification(message.get('method',None),message.get('params',{}))
+                continue
+            if message['id'] != request_id:
+                continue
+            if 'error' in message:
+                raise DaemonError(message['error'].get('message',"Unknown error"),
+                                  message['error'].get('code',-32000))
+            return message.get('result',None)
+        raise ConnectionError("The daemon closed the connection!")
+
+    def subscribe(self,on_notification):
+        """
+        subscribe Receive the backup events of the daemon until the
+        connection is closed.
+
+        This call blocks, so it should be run in its own thread.
+
+        :param on_notification: Called with `(method,params)` for every event.
+        """
+        self.call('subscribe')
+        rfile = self.__rfile
+        try:
+            for line in rfile:
+                message = json.loads(line)
+                if 'id' not in message:
+                    on_notification(message.get('method',None),message.get('params',{}))
+        except (OSError,ValueError):
+            # closed by close()
+            pass
+
+def forward_command(command:str,argv:list[str])->int|None:
+    """
+    forward_command Run a command in the daemon if it is running.
+
+    The command runs in the current working directory. The output of the
+    command is written to `sys.stdout` and `sys.stderr`.
+
+    :param command: The name of the command.
+    :type command: str
+    :param argv: The arguments of the command.
+    :type argv: list[str]
+    :return: The exit code of the command or `None` if the daemon is not
+        running or can not run the command in this environment.
+    :rtype: int|None
+    """
+    if os.environ.get(NO_DAEMON_ENV,None) or not is_supported():
+        return None
+    path = get_socket_path()
+    if not os.path.exists(path):
+        return None
+
+    def on_notification(method,params):
+        if method != 'output':
+            return
+        stream = sys.stderr if params.get('stream',None) == 'stderr' else sys.stdout
+        stream.write(params.get('text',""))
+        stream.flush()
+
+    client = DaemonClient(path)
+    try:
+        client.connect()
+    except OSError:
+        # stale socket
+        return None
+
+    try:
+        result = client.call('execute',
+                             {'command':command,
+                              'argv':list(argv),
+                              'isatty':sys.stderr.isatty(),
+                              'cwd':os.getcwd(),
+                              'env':{key:os.environ.get(key,None) for key in CONFIG_ENV}},
+                             on_notification)
+    except DaemonError as ex:
+        if ex.code == ERROR_ENVIRONMENT:
+            logger.debug("Not forwarding \"{command}\" to the daemon! ({error})".format(
+                command=command,
+                error=str(ex)))
+            return None
+        logger.error("The daemon failed to run \"{command}\"! ({error})".format(
+            command=command,
+            error=str(ex)))
+        return 1
+    finally:
+        client.close()
+    return int(result.get('exit_code',1))
+
+class DaemonAttachment(object):
+    """
+    DaemonAttachment Attaches a process with a GLib main loop (the GUI) to a
+    running daemon.
+
+    While attached, the backup events of the daemon are emitted on the local
+    `ArchiverManager` (and *backups-pruned* on the local `RetentionManager`)
+    in the main loop, so the progress of backups run by
+    the daemon is shown like local backups, and `backup()` lets the daemon
+    run the backups. The daemon runs the scheduler, so an attached process
+    should not start its own.
+    """
+    __global_attachment = None
+
+    @staticmethod
+    def get_global()->"DaemonAttachment":
+        if DaemonAttachment.__global_attachment is None:
+            DaemonAttachment.__global_attachment = DaemonAttachment()
+        return DaemonAttachment.__global_attachment
+
+    def __init__(self):
+        self.__client = None
+        self.__thread = None
+
+    @property
+    def path(self)->str|None:
+        return self.__client.path if self.__client is not None else None
+
+    @property
+    def is_attached(self)->bool:
+        return self.__client is not None
+
+    def attach(self,path:str|None=None)->bool:
+        """
+        attach Subscribe to the backup events of the daemon.
+
+        :param path: The socket path. If `None`, `get_socket_path()` is used.
+        :type path: str|None
+        :return: `False` if the daemon is not running.
+        :rtype: bool
+        """
+        if self.__client is not None:
+            return True
+        if os.environ.get(NO_DAEMON_ENV,None) or not is_supported():
+            return False
+        path = path if path else get_socket_path()
+        if not os.path.exists(path):
+            return False
+        try:
+            # A hanging daemon must not block the caller.
+            with DaemonClient(path,1.0) as client:
+                client.call('ping')
+        except (OSError,DaemonError):
+            return False
+
+        client = DaemonClient(path)
+        self.__client = client
+        self.__thread = threading.Thread(target=self.__thread_func,args=(client,),daemon=True)
+        self.__thread.start()
+        logger.info("Attached to the sgbackup daemon on \"{path}\".".format(path=path))
+        return True
+
+    def detach(self):
+        client = self.__client
+        self.__client = None
+        self.__thread = None
+        if client is not None:
+            client.close()
+
+    def backup(self,games:list)->int|None:
+        """
+        backup Let the daemon back up games.
+
+        This call blocks until the backups are finished, so it should be run
+        in its own thread. The progress is reported by the signals of the
+        local `ArchiverManager`.
+
+        :param games: The games to back up.
+        :type games: list[Game]
+        :raises DaemonError: If the daemon could not run the backups, e.g.
+            because another backup is in progress.
+        :return: The exit code of the backup command or `None` if the
+            daemon is not available.
+        :rtype: int|None
+        """
+        path = self.path
+        if path is None:
+            return None
+        client = DaemonClient(path)
+        try:
+            result = client.call('execute',
+                                 {'command':'backup',
+                                  'argv':[game.key for game in games],
+                                  'isatty':False,
+                                  'cwd':os.getcwd(),
+                                  'env':{key:os.environ.get(key,None) for key in CONFIG_ENV}})
+        except OSError:
+            return None
+        except DaemonError as ex:
+            if ex.code == ERROR_ENVIRONMENT:
+                return None
+            raise
+        finally:
+            client.close()
+        return int(result.get('exit_code',1))
+
+    def __thread_func(self,client:DaemonClient):
+        try:
+            client.subscribe(self.__on_notification)
+        except (OSError,DaemonError) as ex:
+            logger.warning("Lost the connection to the sgbackup daemon! ({error})".format(error=str(ex)))
+        GLib.idle_add(self.__on_detached,client)
+
+    def __on_detached(self,client:DaemonClient):
+        if self.__client is client:
+            logger.info("Detached from the sgbackup daemon.")
+            self.__client = None
+            self.__thread = None
+            client.close()
+        return False
+
+    def __on_notification(self,method:str,params:dict):
+        GLib.idle_add(self.__emit_event,method,params)
+
+    def __emit_event(self,method:str,params:dict):
+        from .game import GameManager
+        from .archiver import ArchiverManager
+
+        am = ArchiverManager.get_global()
+        if method == 'backup-progress':
+            am.emit('backup-progress',params['fraction'],params['bytes_per_second'],params['eta'])
+            return False
+        if method == 'backup-finished':
+            am.emit('backup-finished')
+            return False
+
+        game = GameManager.get_global().games.get(params.get('game',None),None)
+        if game is None:
+            return False
+        if method == 'backup-game-progress':
+            am.emit('backup-game-progress',game,params['fraction'],params['message'],
+                    params['bytes_per_second'],params['eta'])
+        elif method == 'backup-game-skipped':
+            am.emit('backup-game-skipped',game,params['reason'])
+        elif method == 'backup-game-finished':
+            am.emit('backup-game-finished',game)
+        elif method == 'backups-pruned':
+            from .retention import RetentionManager
+            RetentionManager.get_global().emit('backups-pruned',game,params['files'])
+        return False
+
+class _RedirectStream(object):
+    # Replaces sys.stdout and sys.stderr in the daemon, so the output of the
+    # running command (including its worker threads) goes to its client.
+    # Commands are run one at a time, so a single target is sufficient.
+    def __init__(self,default):
+        self.__default = default
+        self.__stream = None
+
+    def set_target(self,stream):
+        self.__stream = stream
+
+    @property
+    def target(self):
+        stream = self.__stream
+        return stream if stream is not None else self.__default
+
+    def write(self,text):
+        return self.target.write(text)
+
+    def flush(self):
+        return self.target.flush()
+
+    def isatty(self):
+        return self.target.isatty()
+
+    def __getattr__(self,name):
+        return getattr(self.__default,name)
+
+class _Connection(object):
+    def __init__(self,sock:socket.socket):
+        self.__socket = sock
+        self.__mutex = threading.Lock()
+        self.closed = False
+
+    def send(self,message:dict):
+        data = (json.dumps(message) + "\n").encode("utf-8")
+        with self.__mutex:
+            if self.closed:
+                return
+            try:
+                self.__socket.sendall(data)
+            except OSError:
+                self.closed = True
+
+    def notify(self,method:str,params:dict):
+        self.send({'jsonrpc':"2.0",'method':method,'params':params})
+
+class _OutputStream(object):
+    def __init__(self,connection:_Connection,stream:str,isatty:bool):
+        self.__connection = connection
+        self.__stream = stream
+        self.__isatty = isatty
+
+    def write(self,text:str):
+        if text:
+            self.__connection.notify('output',{'stream':self.__stream,'text':text})
+        return len(text)
+
+    def flush(self):
+        pass
+
+    def isatty(self):
+        return self.__isatty
+
+class _OutputLogHandler(logging.Handler):
+    # Sends the log messages emitted while a command runs to its client.
+    def __init__(self,stream:_OutputStream):
+        logging.Handler.__init__(self,logging.INFO)
+        self.__stream = stream
+        self.setFormatter(logging.Formatter("[%(levelname)s:%(name)s] %(message)s"))
+
+    def emit(self,record):
+        try:
+            self.__stream.write(self.format(record) + "\n")
+        except Exception:
+            self.handleError(record)
+
+class Daemon(object):
+    """
+    Daemon The sgbackup daemon.
+
+    It keeps the `GameManager`, the caches and the archivers loaded and
+    serves the clients in a thread per connection. `Daemon.run()` runs the
+    GLib main loop until the daemon is shut down.
+    """
+    def __init__(self,path:str|None=None):
+        self.__path = path if path else get_socket_path()
+        self.__socket = None
+        self.__loop = None
+        self.__command_mutex = threading.Lock()
+        self.__reload_needed = False
+        self.__reload_source = 0
+        self.__monitor = None
+        self.__subscribers = set()
+        self.__subscribers_mutex = threading.Lock()
+
+    @property
+    def path(self)->str:
+        return self.__path
+
+    def __bind(self):
+        dirname = os.path.dirname(self.path)
+        if not os.path.isdir(dirname):
+            os.makedirs(dirname,mode=0o700)
+
+        if os.path.exists(self.path):
+            try:
+                with DaemonClient(self.path,1.0) as client:
+                    client.call('ping')
+                raise RuntimeError("The daemon is already running!")
+            except OSError:
+                # stale socket
+                os.unlink(self.path)
+
+        sock = socket.socket(socket.AF_UNIX,socket.SOCK_STREAM)
+        old_umask = os.umask(0o177)
+        try:
+            sock.bind(self.path)
+        finally:
+            os.umask(old_umask)
+        sock.listen(16)
+        self.__socket = sock
+
+    def run(self)->int:
+        """
+        run Run the daemon until it receives SIGINT or SIGTERM or a client
+        calls `shutdown`.
+
+        :return: The exit code.
+        :rtype: int
+        """
+        from .game import GameManager
+        from .settings import settings
+        from . import archiver
+        from .retention import RetentionManager
+
+        self.__bind()
+        GameManager.get_global()
+
+        am = archiver.ArchiverManager.get_global()
+        am_signals = [
+            am.connect('backup-game-progress',self._on_backup_game_progress),
+            am.connect('backup-game-skipped',self._on_backup_game_skipped),
+            am.connect('backup-game-finished',self._on_backup_game_finished),
+            am.connect('backup-progress',self._on_backup_progress),
+            am.connect('backup-finished',self._on_backup_finished),
+        ]
+        rm = RetentionManager.get_global()
+        rm_signals = [
+            rm.connect('backups-pruned',self._on_backups_pruned),
+        ]
+
+        sys.stdout = _RedirectStream(sys.stdout)
+        sys.stderr = _RedirectStream(sys.stderr)
+
+        self.__monitor = Gio.File.new_for_path(settings.gameconf_dir).monitor_directory(Gio.FileMonitorFlags.NONE,None)
+        self.__monitor.connect('changed',self._on_gameconf_dir_changed)
+
+        if settings.scheduler_enabled:
+            from .scheduler import BackupScheduler
+            BackupScheduler.get_global().start()
+
+        thread = threading.Thread(target=self.__accept_thread,daemon=True)
+        thread.start()
+        logger.info("sgbackup daemon listening on \"{path}\"".format(path=self.path))
+
+        self.__loop = GLib.MainLoop()
+        if hasattr(GLib,'unix_signal_add'):
+            for signum in (signal.SIGINT,signal.SIGTERM):
+                GLib.unix_signal_add(GLib.PRIORITY_DEFAULT,signum,self.__loop.quit)
+        try:
+            self.__loop.run()
+        except KeyboardInterrupt:
+            pass
+        self.__loop = None
+
+        if settings.scheduler_enabled:
+            from .scheduler import BackupScheduler
+            BackupScheduler.get_global().stop()
+        for signal_id in am_signals:
+            am.disconnect(signal_id)
+        for signal_id in rm_signals:
+            rm.disconnect(signal_id)
+        self.__monitor.cancel()
+        self.__socket.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        sys.stdout = sys.__stdout__
+        sys.stderr = sys.__stderr__
+        return 0
+
+    def shutdown(self):
+        if self.__loop is not None:
+            GLib.idle_add(self.__loop.quit)
+
+    def _on_gameconf_dir_changed(self,monitor,file,other_file,event_type):
+        # The games are reloaded before the next command, if no command runs
+        # they are reloaded after a short delay.
+        self.__reload_needed = True
+        if self.__reload_source:
+            GLib.source_remove(self.__reload_source)
+        self.__reload_source = GLib.timeout_add(RELOAD_DELAY,self._on_reload_timeout)
+
+    def _on_reload_timeout(self):
+        self.__reload_source = 0
+        if self.__command_mutex.acquire(blocking=False):
+            try:
+                self.__reload_games()
+            finally:
+                self.__command_mutex.release()
+        return False
+
+    def __reload_games(self,force:bool=False):
+        # needs to be called with the command mutex held
+        if not self.__reload_needed and not force:
+            return
+        from .game import GameManager
+        self.__reload_needed = False
+        GameManager.get_global().load()
+        logger.info("Reloaded the games.")
+
+    def __accept_thread(self):
+        while True:
+            try:
+                client_socket,address = self.__socket.accept()
+            except OSError:
+                # socket closed
+                return
+            threading.Thread(target=self.__client_thread,args=(client_socket,),daemon=True).start()
+
+    def __client_thread(self,client_socket:socket.socket):
+        connection = _Connection(client_socket)
+        try:
+            with client_socket.makefile('r',encoding="utf-8") as rfile:
+                for line in rfile:
+                    if not line.strip():
+                        continue
+                    self.__handle_request(connection,line)
+                    if connection.closed:
+                        break
+        except OSError:
+            pass
+        finally:
+            connection.closed = True
+            with self.__subscribers_mutex:
+                self.__subscribers.discard(connection)
+            client_socket.close()
+
+    def __handle_request(self,connection:_Connection,line:str):
+        try:
+            request = json.loads(line)
+            request_id = request.get('id',None)
+            method = request['method']
+            params = request.get('params',{})
+        except (ValueError,KeyError,AttributeError) as ex:
+            connection.send({'jsonrpc':"2.0",'id':None,
+                             'error':{'code':-32700,'message':"Invalid request! ({})".format(ex)}})
+            return
+
+        handler = getattr(self,"_rpc_" + str(method).replace('-','_'),None)
+        if handler is None:
+            connection.send({'jsonrpc':"2.0",'id':request_id,
+                             'error':{'code':-32601,'message':"No such method \"{}\"!".format(method)}})
+            return
+
+        try:
+            result = handler(connection,**params)
+        except DaemonError as ex:
+            connection.send({'jsonrpc':"2.0",'id':request_id,
+                             'error':{'code':ex.code,'message':str(ex)}})
+            return
+        except Exception as ex:
+            logger.error("Daemon method \"{method}\" failed! ({error})".format(method=method,error=str(ex)))
+            connection.send({'jsonrpc':"2.0",'id':request_id,
+                             'error':{'code':-32000,'message':str(ex)}})
+            return
+        if request_id is not None:
+            connection.send({'jsonrpc':"2.0",'id':request_id,'result':result})
+
+    def _rpc_ping(self,connection):
+        return {'version':VERSION,'pid':os.getpid()}
+
+    def _rpc_execute(self,connection,command:str,argv:list|None=None,isatty:bool=False,
+                     cwd:str|None=None,env:dict|None=None):
+        from . import commands
+        if command not in commands.COMMANDS:
+            raise DaemonError("No such command \"{}\"!".format(command),-32602)
+        cmd = commands.COMMANDS[command]
+        if not cmd.is_forwardable():
+            raise DaemonError("The command \"{}\" can not be run by the daemon!".format(command),-32602)
+        if env:
+            for key in CONFIG_ENV:
+                if key in env and env[key] != os.environ.get(key,None):
+                    raise DaemonError("The daemon uses another configuration (${})!".format(key),
+                                      ERROR_ENVIRONMENT)
+
+        stdout = _OutputStream(connection,'stdout',isatty)
+        stderr = _OutputStream(connection,'stderr',isatty)
+        log_handler = _OutputLogHandler(stderr)
+        with self.__command_mutex:
+            # Relative paths in argv are resolved against the directory of
+            # the client. The daemon itself only uses absolute paths.
+            old_cwd = os.getcwd()
+            if cwd:
+                try:
+                    os.chdir(cwd)
+                except OSError as ex:
+                    raise DaemonError("Unable to change to \"{cwd}\"! ({error})".format(
+                        cwd=cwd,
+                        error=str(ex)),ERROR_ENVIRONMENT)
+            self.__reload_games()
+            sys.stdout.set_target(stdout)
+            sys.stderr.set_target(stderr)
+            logging.getLogger().addHandler(log_handler)
+            try:
+                exit_code = cmd.execute(list(argv) if argv else [])
+            finally:
+                logging.getLogger().removeHandler(log_handler)
+                sys.stdout.set_target(None)
+                sys.stderr.set_target(None)
+                os.chdir(old_cwd)
+        return {'exit_code':exit_code if exit_code else 0}
+
+    def _rpc_reload(self,connection):
+        with self.__command_mutex:
+            self.__reload_games(True)
+        return True
+
+    def _rpc_subscribe(self,connection):
+        # The events are sent until the client disconnects.
+        with self.__subscribers_mutex:
+            self.__subscribers.add(connection)
+        return True
+
+    def __notify_subscribers(self,method:str,params:dict):
+        with self.__subscribers_mutex:
+            for connection in list(self.__subscribers):
+                if connection.closed:
+                    self.__subscribers.discard(connection)
+                else:
+                    connection.notify(method,params)
+
+    def _on_backup_game_progress(self,am,game,fraction,message,bytes_per_second,eta):
+        self.__notify_subscribers('backup-game-progress',{
+            'game':game.key,
+            'fraction':fraction,
+            'message':message,
+            'bytes_per_second':bytes_per_second,
+            'eta':eta,
+        })
+
+    def _on_backup_game_skipped(self,am,game,reason):
+        self.__notify_subscribers('backup-game-skipped',{'game':game.key,'reason':reason})
+
+    def _on_backup_game_finished(self,am,game):
+        self.__notify_subscribers('backup-game-finished',{'game':game.key})
+
+    def _on_backup_progress(self,am,fraction,bytes_per_second,eta):
+        self.__notify_subscribers('backup-progress',{
+            'fraction':fraction,
+            'bytes_per_second':bytes_per_second,
+            'eta':eta,
+        })
+
+    def _on_backup_finished(self,am):
+        self.__notify_subscribers('backup-finished',{})
+
+    def _on_backups_pruned(self,rm,game,files):
+        self.__notify_subscribers('backups-pruned',{'game':game.key,'files':list(files)})
+
+    def _rpc_shutdown(self,connection):
+        self.shutdown()
+        return True
@@ -17,6 +17,8 @@
 ###############################################################################
 
 import sys,os
+from threading import RLock
+from concurrent.futures import ThreadPoolExecutor
 from gi.repository import GLib
 from gi.repository.GObject import GObject,Signal,SignalFlags,Property
 
@@ -26,9 +28,12 @@ import json
 import logging
 from .i18n import gettext as _
 from .game import GameManager
+from ._filecache import FileCache
 
 logger = logging.getLogger(__name__)
 
+MAX_MANIFEST_PARSE_THREADS = 4
+
 
 class EpicGameInfo(GObject):
     def __init__(self,
@@ -64,6 +69,27 @@ class EpicGameInfo(GObject):
     def is_main(self)->bool:
         return (self.catalog_item_id == self.main_catalog_item_id)
 
+class EpicManifestCache(FileCache):
+    """
+    EpicManifestCache Cache for parsed Epic-Games manifest files.
+    
+    Manifests are only parsed again if their mtime or size changed. The cache
+    is shared by all `Epic` instances and stored in the configuration directory.
+    """
+    __global_cache = None
+    __global_mutex = RLock()
+    
+    def __init__(self):
+        FileCache.__init__(self,os.path.join(settings.config_dir,'epicmanifests.cache'))
+        
+    @staticmethod
+    def get_global():
+        with EpicManifestCache.__global_mutex:
+            if EpicManifestCache.__global_cache is None:
+                EpicManifestCache.__global_cache = EpicManifestCache()
+        return EpicManifestCache.__global_cache
+    
+
 class EpicIgnoredApp(GObject):
     def __init__(self,catalog_item_id:str,name:str,reason:str):
         GObject.__init__(self)
@@ -149,12 +175,7 @@ class Epic(GObject):
     def datadir(self):
         return settings.epic_datadir if settings.epic_datadir is not None else ""
     
-    def parse_manifest(self,filename)->EpicGameInfo|None:
-        if not os.path.exists(filename):
-            return None
-        if not filename.endswith('.item'):
-            return None
-        
+    def __read_manifest(self,filename)->dict|None:
         try:
             with open(filename,'r',encoding="utf-8") as ifile:
                 data = json.loads(ifile.read())
@@ -165,28 +186,84 @@ class Epic(GObject):
             ))
             return None
 
-        if data['FormatVersion'] == 0:
-            return EpicGameInfo(
-                name=data['DisplayName'],
-                installdir=data['InstallLocation'],
-                catalog_item_id=data['CatalogItemId'],
-                main_catalog_item_id=data['MainGameCatalogItemId']
-            )
+        try:
+            if data['FormatVersion'] == 0:
+                return {
+                    'name': data['DisplayName'],
+                    'installdir': data['InstallLocation'],
+                    'catalog_item_id': data['CatalogItemId'],
+                    'main_catalog_item_id': data['MainGameCatalogItemId'],
+                }
+        except (KeyError,TypeError) as ex:
+            self._logger.error(_("Invalid Epic manifest \"{manifest}\"! ({error})").format(
+                manifest=filename,
+                error=str(ex)
+            ))
+        return None
+    
+    def parse_manifest(self,filename)->EpicGameInfo|None:
+        if not os.path.exists(filename):
+            return None
+        if not filename.endswith('.item'):
+            return None
+        
+        data = self.__read_manifest(filename)
+        if data is not None:
+            return EpicGameInfo(**data)
         return None
     
     def parse_all_manifests(self)->list[EpicGameInfo]:
+        """
+        parse_all_manifests Get the game infos of all installed manifests.
+        
+        Unchanged manifests are taken from the `EpicManifestCache`, new or
+        changed manifests are parsed in a thread pool.
+        
+        :rtype: list[EpicGameInfo]
+        """
         ret = []
         if not settings.epic_datadir:
-            print("NO EPIC DATADIR")
+            self._logger.debug("No Epic-Games data directory set!")
             return ret
         
         manifest_dir=os.path.join(settings.epic_datadir,'Manifests')
+        cache = EpicManifestCache.get_global()
+        
+        try:
+            entries = [i for i in os.scandir(manifest_dir) if i.name.endswith('.item') and i.is_file()]
+        except OSError as ex:
+            self._logger.warning(_("Unable to read Epic manifest directory \"{dir}\"! ({error})").format(
+                dir=manifest_dir,
+                error=str(ex)
+            ))
+            return ret
+        
+        manifests = []
+        cold = []
+        for entry in entries:
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            hit,data = cache.lookup(entry.path,stat)
+            manifests.append((entry.path,stat,data))
+            if not hit:
+                cold.append(len(manifests) - 1)
+        
+        if cold:
+            with ThreadPoolExecutor(max_workers=min(len(cold),MAX_MANIFEST_PARSE_THREADS)) as executor:
+                results = executor.map(self.__read_manifest,[manifests[i][0] for i in cold])
+                for i,data in zip(cold,results):
+                    filename,stat,_data = manifests[i]
+                    manifests[i] = (filename,stat,data)
+                    cache.store(filename,stat,data)
+        
+        cache.prune(manifest_dir,set(i[0] for i in manifests))
+        cache.save()
         
-        for item in [ i for i in os.listdir(manifest_dir) if i.endswith('.item') ]:
-            manifest_file = os.path.join(manifest_dir,item)
-            info = self.parse_manifest(manifest_file)
-            if info is not None:
-                ret.append(info)
+        for filename,stat,data in manifests:
+            if data is not None:
+                ret.append(EpicGameInfo(**data))
                 
         return ret
     
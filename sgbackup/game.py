@@ -37,12 +37,14 @@ from string import Template
 logger = logging.getLogger(__name__)
 
 from .settings import settings
+from .profiling import profiled
 from .utility import (
     PLATFORM_WINDOWS,
     PLATFORM_UNIX,
     PLATFORM_LINUX,
     PLATFORM_MACOS,
     sanitize_windows_path,
+    write_text_atomic,
 )
 
 if PLATFORM_WINDOWS:
@@ -1232,6 +1234,7 @@ class Game(GObject):
         game.savegame_type = sgtype
         game.is_active = config['is_active'] if 'is_active' in config else False
         game.is_live = config['is_live'] if 'is_live' in config else True
+        game.backup_interval = config['backup_interval'] if 'backup_interval' in config else 0
         
         if 'windows' in config:
             winconf = config['windows']
@@ -1296,6 +1299,7 @@ class Game(GObject):
         self.__savegame_type = SavegameType.UNSET
         self.__active = False
         self.__live = True
+        self.__backup_interval = 0
         self.__variables = dict()
         
         self.__windows = None
@@ -1356,6 +1360,20 @@ class Game(GObject):
     @is_live.setter
     def is_live(self,live:bool):
         self.__live = bool(live)
+        
+    @Property(type=int,default=0)
+    def backup_interval(self)->int:
+        """
+        backup_interval The interval of scheduled backups in seconds.
+        
+        If it is `0`, the interval from the settings is used.
+
+        :type: int
+        """
+        return self.__backup_interval
+    @backup_interval.setter
+    def backup_interval(self,seconds:int):
+        self.__backup_interval = max(int(seconds),0)
 
     @Property
     def filename(self)->str|None:
@@ -1548,6 +1566,8 @@ class Game(GObject):
         }
         if self.dbid:
             ret['dbid'] = self.dbid
+        if self.backup_interval:
+            ret['backup_interval'] = self.backup_interval
         
         if (self.windows and self.windows.is_valid):
             ret['windows'] = self.windows.serialize()
@@ -1566,9 +1586,28 @@ class Game(GObject):
         
         return ret
     
-    def save(self):
+    def write(self)->bool:
+        """
+        write Write the gameconf file atomically.
+        
+        Unlike `Game.save()` the game is not (re-)added to the `GameManager`.
+        
+        :return: `True` if the file was written.
+        :rtype: bool
+        """
         path = pathlib.Path(self.filename).resolve() if self.filename else None
         if path is None:
+            logger.error("No filename for saving the game \"{game}\" set! Not saving file!".format(game=self.name))
+            return False
+        
+        if not path.parent.is_dir():
+            os.makedirs(path.parent)
+            
+        write_text_atomic(str(path),json.dumps(self.serialize(),ensure_ascii=False,indent=4))
+        return True
+        
+    def save(self):
+        if not self.filename:
             logger.error("No filename for saving the game \"{game}\" set! Not saving file!".format(game=self.name))
             return
         
@@ -1578,23 +1617,19 @@ class Game(GObject):
                 os.unlink(old_path)
             delattr(self,'__old_filename')
             
-        if not path.parent.is_dir():
-            os.makedirs(path.parent)
-            
-        with open(path,'wt',encoding='utf-8') as ofile:
-            ofile.write(json.dumps(self.serialize(),ensure_ascii=False,indent=4))
+        if not self.write():
+            return
             
         gm = GameManager.get_global()
         if hasattr(self,'_old_key'):
-            if self._old_key in gm.games:
-                del gm.games[self._old_key]
+            gm.remove_game(self._old_key)
             delattr(self,'_old_key')
         gm.add_game(self)
 
     def __bool__(self):
         return (bool(self.game_data) and bool(self.savegame_root) and bool(self.savegame_dir))
     
-
+    @profiled("game.get_backup_files")
     def get_backup_files(self)->dict[str:str]|None:
         def get_backup_files_recursive(sgroot:pathlib.Path,sgdir:str,subdir:str|None=None):
             if subdir:
@@ -1663,6 +1698,7 @@ class GameManager(GObject):
         self.__games = {}
         self.__steam_games = {}
         self.__epic_games = {}
+        self.__generation = 0
         
         self.load()
 
@@ -1670,6 +1706,19 @@ class GameManager(GObject):
     def games(self)->dict[str:Game]:
         return self.__games
     
+    @Property(type=int)
+    def generation(self)->int:
+        """
+        generation A counter that is increased whenever games are loaded,
+        added or removed.
+        
+        Caches built from the list of games can compare it to find out if
+        they are outdated.
+
+        :type: int
+        """
+        return self.__generation
+    
     @Property
     def steam_games(self)->dict[int:Game]:
         return dict(self.__steam_games)
@@ -1683,9 +1732,32 @@ class GameManager(GObject):
     def has_epic_game(self,catalog_item_id:str)->bool:
         return (catalog_item_id in self.__epic_games)
     
+    @Signal(name="game-added",return_type=None,arg_types=(Game,),flags=SignalFlags.RUN_FIRST)
+    def do_game_added(self,game:Game):
+        pass
+    
+    @Signal(name="game-removed",return_type=None,arg_types=(Game,str),flags=SignalFlags.RUN_FIRST)
+    def do_game_removed(self,game:Game,key:str):
+        """
+        do_game_removed Emitted when a game is removed.
+        
+        *key* is the key the game was registered with. It differs from
+        `Game.key` when the key of the game was changed.
+        """
+        pass
+    
+    @Signal(name="games-cleared",return_type=None,arg_types=(),flags=SignalFlags.RUN_FIRST)
+    def do_games_cleared(self):
+        pass
+    
+    @profiled("game.load")
     def load(self):
         if self.__games:
             self.__games = {}
+            self.__steam_games = {}
+            self.__epic_games = {}
+        self.__generation += 1
+        self.emit('games-cleared')
             
         gameconf_dir = settings.gameconf_dir
         if not os.path.isdir(gameconf_dir):
@@ -1710,16 +1782,20 @@ class GameManager(GObject):
             self.add_game(game)
         
     def add_game(self,game:Game):
+        if game.key in self.__games:
+            self.remove_game(game.key)
+        self.__generation += 1
         self.__games[game.key] = game
         if game.steam and game.steam.appid >= 0:
             self.__steam_games[game.steam.appid] = game
             
         if game.epic and game.epic.catalog_item_id:
             self.__epic_games[game.epic.catalog_item_id] = game
+        self.emit('game-added',game)
             
     def remove_game(self,game:Game|str):
         if isinstance(game,str):
-            if key not in self.__games:
+            if game not in self.__games:
                 return
             key = game
             game = self.__games[key]
@@ -1737,4 +1813,6 @@ class GameManager(GObject):
             
                 
         del self.__games[key]
+        self.__generation += 1
+        self.emit('game-removed',game,key)
         
@@ -20,11 +20,10 @@ from gi.repository import Gtk,Gio,Gdk,GLib
 from gi.repository.GObject import GObject,Signal,Property,SignalFlags,BindingFlags
 from ..i18n import gettext as _, noop as N_,pgettext,npgettext,ngettext,TEXTDOMAIN
 
-import rapidfuzz
-
 import logging; logger=logging.getLogger(__name__)
 
 import os,sys
+from threading import Thread,Event
 from datetime import datetime as DateTime
 from pathlib import Path
 
@@ -56,7 +55,14 @@ from ._epic import (
 )
 
 from ._backupdialog import BackupSingleDialog,BackupManyDialog
-from ..archiver import ArchiverManager
+from ._search import GameSearchIndex,SEARCH_DELAY
+from ._sorter import new_string_sorter,new_match_sorter,sort_key
+from ..archiver import ArchiverManager,BackupInfo
+from ..retention import RetentionManager
+from ..utility import format_size
+from ..scheduler import BackupScheduler
+from ..daemon import DaemonAttachment
+from ..profiling import profiled
 from ._dialogs import (
     AboutDialog,
     NoGamesToBackupDialog,
@@ -73,6 +79,7 @@ class GameViewData(GObject):
         GObject.__init__(self)
         self.__game = game
         self.__fuzzy_match = 0.0
+        self.__sort_key = sort_key(game.name)
         
     @property
     def game(self)->Game:
@@ -94,6 +101,15 @@ class GameViewData(GObject):
         """
         return self.game.name
     
+    @Property(type=str)
+    def sort_key(self)->str:
+        """
+        sort_key The casefolded name of the game, computed once for sorting.
+
+        :type: str
+        """
+        return self.__sort_key
+    
     @Property(type=str)
     def key(self)->str:
         """
@@ -126,84 +142,6 @@ class GameViewData(GObject):
         self.__fuzzy_match = match
         
         
-class GameViewKeySorter(Gtk.Sorter):
-    def __init__(self,sort_ascending:bool=True,*args,**kwargs):
-        Gtk.Sorter.__init__(self)
-        
-        self.sort_ascending = sort_ascending
-        
-    @Property(type=bool,default=True)
-    def sort_ascending(self)->bool:
-        return self.__sort_ascending
-    @sort_ascending.setter
-    def sort_ascending(self,asc:bool):
-        self.__sort_ascending = asc
-    
-    def do_compare(self,game1,game2):
-        if self.sort_ascending:
-            if game1.key > game2.key:
-                return Gtk.Ordering.LARGER
-            elif game1.key < game2.key:
-                return Gtk.Ordering.SMALLER
-            else:
-                return Gtk.Ordering.EQUAL
-        else:
-            if game1.key < game2.key:
-                return Gtk.Ordering.LARGER
-            elif game1.key > game2.key:
-                return Gtk.Ordering.SMALLER
-            else:
-                return Gtk.Ordering.EQUAL
-            
-class GameViewNameSorter(Gtk.Sorter):
-    def __init__(self,sort_ascending:bool=True,*args,**kwargs):
-        Gtk.Sorter.__init__(self)
-        
-        self.sort_ascending = sort_ascending
-        
-    @Property(type=bool,default=True)
-    def sort_ascending(self)->bool:
-        return self.__sort_ascending
-    @sort_ascending.setter
-    def sort_ascending(self,asc:bool):
-        self.__sort_ascending = asc
-    
-    def do_compare(self,game1,game2):
-        name1 = game1.name.lower()
-        name2 = game2.name.lower()
-        
-        if self.sort_ascending:
-            if name1 > name2:
-                return Gtk.Ordering.LARGER
-            elif name1 < name2:
-                return Gtk.Ordering.SMALLER
-            else:
-                return Gtk.Ordering.EQUAL
-        else:
-            if name1 < name2:
-                return Gtk.Ordering.LARGER
-            elif name1 > name2:
-                return Gtk.Ordering.SMALLER
-            else:
-                return Gtk.Ordering.EQUAL
-            
-        
-class GameViewMatchSorter(Gtk.Sorter):
-    def do_compare(self,item1:GameViewData,item2:GameViewData):
-        if item1.fuzzy_match < item2.fuzzy_match:
-            return Gtk.Ordering.LARGER
-        elif item1.fuzzy_match > item2.fuzzy_match:
-            return Gtk.Ordering.SMALLER
-        
-        name1 = item1.name.lower()
-        name2 = item2.name.lower()
-        if name1 > name2:
-            return Gtk.Ordering.LARGER
-        elif name1 < name2:
-            return Gtk.Ordering.SMALLER
-        else:
-            return Gtk.Ordering.EQUAL
-
 class GameViewMatchFilter(Gtk.Filter):
     def do_match(self,item:GameViewData|None):
         if item is None:
@@ -224,8 +162,12 @@ class GameView(Gtk.Box):
         GameView
         """
         Gtk.Box.__init__(self,orientation=Gtk.Orientation.VERTICAL)
-        self.__key_sorter = GameViewKeySorter(True)
-        self.__name_sorter = GameViewNameSorter(True)
+        self.__match_filter = GameViewMatchFilter()
+        self.__match_sorter = new_match_sorter(GameViewData,'fuzzy_match','sort_key')
+        self.__search_index = None
+        self.__search_timeout = 0
+        self.__search_generation = 0
+        self.__items = {}
         
         scrolled = Gtk.ScrolledWindow()
         scrolled.set_vexpand(True)
@@ -285,9 +227,7 @@ class GameView(Gtk.Box):
         columnview_sorter = self.columnview.get_sorter()
         self.__liststore = Gio.ListStore.new(GameViewData)
         
-        gamemanager = GameManager.get_global()
-        for g in gamemanager.games.values():
-            self._liststore.append(GameViewData(g))
+        self.__fill_liststore()
         self.__filter_model = Gtk.FilterListModel.new(self._liststore,None)
         self.__sort_model = Gtk.SortListModel.new(self.__filter_model,columnview_sorter)
             
@@ -300,13 +240,13 @@ class GameView(Gtk.Box):
         factory_key.connect('setup',self._on_key_column_setup)
         factory_key.connect('bind',self._on_key_column_bind)
         column_key = Gtk.ColumnViewColumn.new(_("Key"),factory_key)
-        column_key.set_sorter(GameViewKeySorter())
+        column_key.set_sorter(new_string_sorter(GameViewData,'key'))
         
         factory_name = Gtk.SignalListItemFactory.new()
         factory_name.connect('setup',self._on_name_column_setup)
         factory_name.connect('bind',self._on_name_column_bind)
         column_name = Gtk.ColumnViewColumn.new(_("Name"),factory_name)
-        column_name.set_sorter(GameViewNameSorter())
+        column_name.set_sorter(new_string_sorter(GameViewData,'sort_key'))
         column_name.set_expand(True)
         
         factory_active = Gtk.SignalListItemFactory.new()
@@ -378,14 +318,19 @@ class GameView(Gtk.Box):
         self.emit('refresh')
         
     @Signal(name="refresh",return_type=None,arg_types=(),flags=SignalFlags.RUN_FIRST)
+    @profiled("gui.gameview.refresh")
     def do_refresh(self):
         self._liststore.remove_all()
         self.__search_entry.set_text("")
         
         gamemanager = GameManager.get_global()
         gamemanager.load()
-        for game in gamemanager.games.values():
-            self._liststore.append(GameViewData(game))
+        self.__fill_liststore()
+        
+    def __fill_liststore(self):
+        self.__items = dict((game.key,GameViewData(game)) 
+                            for game in GameManager.get_global().games.values())
+        self._liststore.splice(0,self._liststore.get_n_items(),list(self.__items.values()))
             
     def _on_game_dialog_response(self,dialog,response):
         if response == Gtk.ResponseType.APPLY:
@@ -409,8 +354,9 @@ class GameView(Gtk.Box):
         
     def _on_new_steam_games_button_clicked(self,button):
         steam = Steam()
-        if steam.find_new_steamapps():
-            dialog = NewSteamAppsDialog(parent=self.get_root())
+        new_apps = steam.find_new_steamapps()
+        if new_apps:
+            dialog = NewSteamAppsDialog(parent=self.get_root(),steam_apps=new_apps)
             dialog.connect_after('response',self._on_new_apps_dialog_response)
             dialog.present()
         else:
@@ -419,10 +365,11 @@ class GameView(Gtk.Box):
 
     def _on_new_epic_games_button_clicked(self,button):
         epic = Epic()
-        if not epic.find_new_apps():
+        new_apps = epic.find_new_apps()
+        if not new_apps:
             dialog = EpicNoNewAppsDialog(self.get_root())
         else:
-            dialog = EpicNewAppsDialog(self.get_root())
+            dialog = EpicNewAppsDialog(self.get_root(),apps=new_apps)
             dialog.connect_after('response',self._on_new_apps_dialog_response)
             
         dialog.present()
@@ -431,7 +378,7 @@ class GameView(Gtk.Box):
         backup_games = []
         for i in range(self._liststore.get_n_items()):
             game = self._liststore.get_item(i).game
-            if game.is_live and game.is_active and os.path.exists(os.path.join(game.savegame_root,game.savegame_dir)):
+            if game.is_live and game.is_active:
                 backup_games.append(game)
          
  
@@ -439,53 +386,86 @@ class GameView(Gtk.Box):
         dialog.set_modal(False)
         dialog.run()
         
+    def __get_search_index(self)->GameSearchIndex:
+        gamemanager = GameManager.get_global()
+        if self.__search_index is None or self.__search_index.generation != gamemanager.generation:
+            self.__search_index = GameSearchIndex([item.game for item in self.__items.values()],
+                                                  gamemanager.generation)
+        return self.__search_index
+        
     def __real_search(self,search_name:str):
-        choices = []
-        for i in range(self._liststore.get_n_items()):
-            item = self._liststore.get_item(i)
-            choices.append(item.name)
-            item.fuzzy_match = 0.0
-            
-        if settings.search_case_sensitive:
-            processor=None
-            query=search_name
-        else:
-            processor=lambda s: s.lower()
-            query=search_name.lower()
+        def thread_func(index:GameSearchIndex,search_name:str,case_sensitive:bool,limit:int,generation:int):
+            try:
+                result = index.query(search_name,case_sensitive,limit)
+            except Exception as ex:
+                logger.error("Search failed! ({error})".format(error=str(ex)))
+                return
+            GLib.idle_add(self._on_search_result,result,generation)
             
-        result = rapidfuzz.process.extract(query=query,
-                                           choices=choices,
-                                           limit=settings.search_max_results,
-                                           scorer=rapidfuzz.fuzz.WRatio,
-                                           processor=processor)
-        
-        
-        for name,match,pos in result:
-            self._liststore.get_item(pos).fuzzy_match = match
+        self.__cancel_search_timeout()
+        self.__search_generation += 1
+        thread = Thread(target=thread_func,
+                        args=(self.__get_search_index(),
+                              search_name,
+                              settings.search_case_sensitive,
+                              settings.search_max_results,
+                              self.__search_generation),
+                        daemon=True)
+        thread.start()
+        
+    def _on_search_result(self,result:dict[str:float],generation:int):
+        if generation != self.__search_generation:
+            return False
         
-        self.__filter_model.set_filter(GameViewMatchFilter())
-        self.__sort_model.set_sorter(GameViewMatchSorter())
+        changed = False
+        for key,item in self.__items.items():
+            match = result.get(key,0.0)
+            if item.fuzzy_match != match:
+                item.fuzzy_match = match
+                changed = True
+                
+        if self.__filter_model.get_filter() is not self.__match_filter:
+            self.__filter_model.set_filter(self.__match_filter)
+            self.__sort_model.set_sorter(self.__match_sorter)
+        elif changed:
+            self.__match_filter.changed(Gtk.FilterChange.DIFFERENT)
+            self.__match_sorter.changed(Gtk.SorterChange.DIFFERENT)
+        return False
+    
+    def __cancel_search_timeout(self):
+        if self.__search_timeout:
+            GLib.source_remove(self.__search_timeout)
+            self.__search_timeout = 0
+        
+    def __clear_search(self):
+        self.__cancel_search_timeout()
+        self.__search_generation += 1
+        self.__filter_model.set_filter(None)
+        self.__sort_model.set_sorter(self.columnview.get_sorter())
+        
+    def _on_search_timeout(self,search_name:str):
+        self.__search_timeout = 0
+        self.__real_search(search_name)
+        return False
     
     def _on_search_entry_icon_release(self,entry,icon_pos):
         if icon_pos == Gtk.EntryIconPosition.PRIMARY:
             search_name=entry.get_text()
             if len(search_name) == 0:
-                self.__filter_model.set_filter(None)
-                self.__sort_model.set_sorter(self.columnview.get_sorter())
+                self.__clear_search()
             else:
                 self.__real_search(entry.get_text())
         elif icon_pos == Gtk.EntryIconPosition.SECONDARY:
             self.__search_entry.set_text("")
-            self.__filter_model.set_filter(None)
-            self.__sort_model.set_sorter(self.columnview.get_sorter())
+            self.__clear_search()
     
     def _on_search_entry_changed(self,entry):
         search_name = entry.get_text()
         if len(search_name) == 0:
-            self.__filter_model.set_filter(None)
-            self.__sort_model.set_sorter(self.columnview.get_sorter())
+            self.__clear_search()
         elif len(search_name) >= settings.search_min_chars:
-            self.__real_search(search_name)
+            self.__cancel_search_timeout()
+            self.__search_timeout = GLib.timeout_add(SEARCH_DELAY,self._on_search_timeout,search_name)
         
     def __set_column_widget_margin(self,widget:Gtk.Widget,margin:int=4):
         widget.set_margin_start(margin)
@@ -704,6 +684,8 @@ class GameView(Gtk.Box):
             if response == Gtk.ResponseType.YES:
                 if os.path.isfile(game.filename):
                     os.unlink(game.filename)
+                GameManager.get_global().remove_game(game)
+                self.__items.pop(game.key,None)
                 for i in range(self._liststore.get_n_items()):
                     item = self._liststore.get_item(i)
                     if item.key == game.key:
@@ -730,26 +712,11 @@ class BackupViewData(GObject):
     BackupViewData The data class for BackupView
     """
     
-    def __init__(self,_game:Game,filename:str):
+    def __init__(self,_game:Game,info:BackupInfo):
         GObject.__init__(self)
         self.__game = _game
-        self.__filename = filename
-        
-        basename = os.path.basename(filename)
-        parts = basename.split('.')
-        
-        try:
-            self.__savegame_name = parts[0]
-            self.__timestamp = DateTime.strptime(parts[1],"%Y%m%d-%H%M%S")
-            self.__sgtype = SavegameType.from_string(parts[2])
-            self.__is_live = parts[3] == 'live'
-        except:
-            self.__savegame_name = basename
-            self.__timestamp = "Unknown"
-            self.__sgtype = SavegameType.UNSET
-            self.__is_live = True
+        self.__info = info
         
-            
         WINDOWS_TYPES = [
             SavegameType.WINDOWS,
             SavegameType.STEAM_WINDOWS,
@@ -767,16 +734,16 @@ class BackupViewData(GObject):
             SavegameType.STEAM_MACOS,
         ]
         
-        if self.__sgtype in WINDOWS_TYPES:
+        if info.savegame_type in WINDOWS_TYPES:
             self.__sgos = 'windows'
-        elif self.__sgtype in LINUX_TYPES:
+        elif info.savegame_type in LINUX_TYPES:
             self.__sgos = 'linux'
-        elif self.__sgtype in MACOS_TYPES:
+        elif info.savegame_type in MACOS_TYPES:
             self.__sgos = 'macos'
         else:
             self.__sgos = ''
             
-        self.__extension = '.' + '.'.join(parts[5:])
+        self.__display_size = format_size(info.size)
         
     
     @property
@@ -788,13 +755,22 @@ class BackupViewData(GObject):
         """
         return self.__game
     
+    @property
+    def info(self)->BackupInfo:
+        """
+        info The `BackupInfo` of the backup file.
+
+        :type: BackupInfo
+        """
+        return self.__info
+    
     @Property
     def savegame_type(self)->SavegameType:
-        return self.__sgtype
+        return self.__info.savegame_type
     
     @Property(type=str)
     def savegame_type_icon_name(self)->str:
-        return SAVEGAME_TYPE_ICONS[self.__sgtype]
+        return SAVEGAME_TYPE_ICONS[self.__info.savegame_type]
     
     @Property(type=str)
     def savegame_os(self)->str:
@@ -826,7 +802,7 @@ class BackupViewData(GObject):
 
         :type: str
         """
-        return self.__savegame_name
+        return self.__info.savegame_name
     
     @Property(type=str)
     def filename(self)->str:
@@ -835,7 +811,7 @@ class BackupViewData(GObject):
 
         :type: str
         """
-        return self.__filename
+        return self.__info.filename
     
     @Property(type=bool,default=False)
     def is_live(self)->bool:
@@ -844,7 +820,7 @@ class BackupViewData(GObject):
 
         :type: bool
         """
-        return self.__is_live
+        return self.__info.is_live
     
     @Property(type=str)
     def extension(self)->str:
@@ -853,7 +829,25 @@ class BackupViewData(GObject):
 
         :type: str
         """
-        return self.__extension
+        return self.__info.extension
+    
+    @Property
+    def size(self)->int:
+        """
+        size The size of the file in bytes.
+
+        :type: int
+        """
+        return self.__info.size
+    
+    @Property(type=str)
+    def display_size(self)->str:
+        """
+        display_size The human readable size of the file.
+
+        :type: str
+        """
+        return self.__display_size
     
     @Property
     def timestamp(self)->DateTime:
@@ -864,7 +858,7 @@ class BackupViewData(GObject):
 
         :type: DateTime
         """
-        return self.__timestamp
+        return self.__info.timestamp
     
 
 class BackupViewSorter(Gtk.Sorter):
@@ -878,8 +872,14 @@ class BackupViewSorter(Gtk.Sorter):
 class BackupView(Gtk.Box):
     """
     BackupView This view displays the backup for the selected `Game`.
+    
+    The backups are listed in a worker thread and inserted in batches of
+    `BackupView.LOAD_BATCH_SIZE` items. Selecting another game cancels a
+    running load.
     """
     __gtype_name__ = "BackupView"
+    LOAD_BATCH_SIZE = 64
+    
     def __init__(self,gameview:GameView):
         """
         BackupView
@@ -891,6 +891,8 @@ class BackupView(Gtk.Box):
         self._title_label = Gtk.Label()
         scrolled = Gtk.ScrolledWindow()
         self.__gameview = gameview
+        self.__load_generation = 0
+        self.__load_cancel = None
         
         self.__action_group = Gio.SimpleActionGroup.new()
         self.__create_actions()
@@ -951,11 +953,26 @@ class BackupView(Gtk.Box):
         self.__columnview.set_single_click_activate(True)
         
         self.gameview.columnview.connect('activate',self._on_gameview_columnview_activate)
+        RetentionManager.get_global().connect('backups-pruned',self._on_retention_manager_backups_pruned)
         
         scrolled.set_child(self.__columnview)
         
+        loading_box = Gtk.Box.new(Gtk.Orientation.VERTICAL,4)
+        loading_box.set_valign(Gtk.Align.CENTER)
+        loading_box.set_halign(Gtk.Align.CENTER)
+        self.__loading_spinner = Gtk.Spinner()
+        self.__loading_spinner.set_size_request(32,32)
+        loading_box.append(self.__loading_spinner)
+        loading_box.append(Gtk.Label.new(_("Loading backups ...")))
+        
+        self.__stack = Gtk.Stack()
+        self.__stack.set_vexpand(True)
+        self.__stack.add_named(scrolled,"backups")
+        self.__stack.add_named(loading_box,"loading")
+        self.__stack.set_visible_child_name("backups")
+        
         self.append(self._title_label)
-        self.append(scrolled)
+        self.append(self.__stack)
         
         builder = Gtk.Builder()
         builder.add_from_file(os.path.join(os.path.dirname(__file__),'appmenu.ui'))
@@ -1138,23 +1155,8 @@ class BackupView(Gtk.Box):
     def _on_size_column_bind(self,factory,item):
         label = item.get_child()
         data = item.get_item()
-        file = Path(data.filename).resolve()
-
-        if not file.is_file():
-            label.set_markup("<span size=\"large\">0 B</span>")
-            return
-        
-        size = file.stat().st_size
-        if (size > 1073741824):
-            display_size = ".".join((str(int(size / 1073741824)),str(int(((size * 10) / 1073741824) % 10)))) + " GiB"
-        elif (size > 1048576):
-            display_size = ".".join((str(int(size / 1048576)), str(int(((size * 10) / 1048576) % 10)))) + " MiB"
-        elif (size > 1024):
-            display_size = ".".join((str(int(size / 1024)), str(int(((size * 10) / 1024) % 10)))) + " KiB"
-        else:
-            display_size = str(size) + " B"
         label.set_markup("<span size=\"large\">{}</span>".format(
-            GLib.markup_escape_text(display_size)))
+            GLib.markup_escape_text(data.display_size)))
         
     def _on_actions_column_setup(self,factory,item):
         child = Gtk.Box.new(Gtk.Orientation.HORIZONTAL,2)
@@ -1208,18 +1210,96 @@ class BackupView(Gtk.Box):
                 self.__liststore.remove(i)
                 return
         
+    def _on_retention_manager_backups_pruned(self,retention_manager,game:Game,files:list[str]):
+        # The expired backups are deleted by the background pruning job.
+        removed = set(files)
+        for i in reversed(range(self.__liststore.get_n_items())):
+            if self.__liststore.get_item(i).filename in removed:
+                self.__liststore.remove(i)
+        
     def _on_gameview_columnview_activate(self,columnview,position):
         model = columnview.get_model().get_model()
         game = model.get_item(position).game
         
         self._title_label.set_markup("<span size='large' weight='bold'>{}</span>".format(GLib.markup_escape_text(game.name)))
+        self.load_backups(game)
         
+    def load_backups(self,game:Game):
+        """
+        load_backups Load the backups of *game* in a worker thread.
+        
+        A load that is still running is cancelled.
+
+        :param game: The game to show the backups for.
+        :type game: Game
+        """
+        @profiled("gui.backupview.load_backups")
+        def thread_func(game:Game,generation:int,cancel:Event):
+            batch = []
+            try:
+                for info in ArchiverManager.get_global().iter_backup_infos(game):
+                    if cancel.is_set():
+                        return
+                    batch.append(info)
+                    if len(batch) >= self.LOAD_BATCH_SIZE:
+                        GLib.idle_add(self._on_load_backups_batch,game,generation,batch)
+                        batch = []
+            except Exception as ex:
+                logger.error("Unable to list backups for \"{game}\"! ({error})".format(
+                    game=game.key,
+                    error=str(ex)))
+            if not cancel.is_set():
+                GLib.idle_add(self._on_load_backups_finished,game,generation,batch)
+            
+        self.cancel_load()
+        self.__load_generation += 1
+        self.__load_cancel = Event()
         self.__liststore.remove_all()
-        for bf in sorted(ArchiverManager.get_global().get_backups(game),reverse=True):
+        self.__loading_spinner.start()
+        self.__stack.set_visible_child_name("loading")
+        
+        thread = Thread(target=thread_func,
+                        args=(game,self.__load_generation,self.__load_cancel),
+                        daemon=True)
+        thread.start()
+        
+    def cancel_load(self):
+        """
+        cancel_load Cancel a running backup load.
+        """
+        if self.__load_cancel is not None:
+            self.__load_cancel.set()
+            self.__load_cancel = None
+        self.__loading_spinner.stop()
+        self.__stack.set_visible_child_name("backups")
+        
+    def __splice_backups(self,game:Game,batch:list[BackupInfo]):
+        items = []
+        for info in batch:
             try:
-                self.__liststore.append(BackupViewData(game,bf))
-            except: 
+                items.append(BackupViewData(game,info))
+            except:
                 pass
+        if items:
+            self.__liststore.splice(self.__liststore.get_n_items(),0,items)
+        
+    @profiled("gui.backupview.add_backups")
+    def _on_load_backups_batch(self,game:Game,generation:int,batch:list[BackupInfo]):
+        if generation != self.__load_generation:
+            return False
+        self.__splice_backups(game,batch)
+        self.__loading_spinner.stop()
+        self.__stack.set_visible_child_name("backups")
+        return False
+    
+    def _on_load_backups_finished(self,game:Game,generation:int,batch:list[BackupInfo]):
+        if generation != self.__load_generation:
+            return False
+        self.__splice_backups(game,batch)
+        self.__load_cancel = None
+        self.__loading_spinner.stop()
+        self.__stack.set_visible_child_name("backups")
+        return False
         
 
 class AppWindow(Gtk.ApplicationWindow):
@@ -1278,29 +1358,21 @@ class AppWindow(Gtk.ApplicationWindow):
         self.__statusbar = Gtk.Statusbar()
         self.statusbar.set_hexpand(True)
         self.statusbar.set_vexpand(False)
+        
+        self.__game_states = {}
+        self.__n_active = 0
+        self.__n_live = 0
+        gamemanager = GameManager.get_global()
+        for game in gamemanager.games.values():
+            self.__update_game_state(game.key,game)
+        gamemanager.connect('game-added',self._on_gamemanager_game_added)
+        gamemanager.connect('game-removed',self._on_gamemanager_game_removed)
+        gamemanager.connect('games-cleared',self._on_gamemanager_games_cleared)
+        
         self.gameview.connect('refresh',self._on_gameview_refresh)
-        self.gameview.connect('game-active-changed',lambda gv,*data: self._on_gameview_refresh(gv))
-        self.gameview.connect('game-live-changed',lambda gv,*data: self._on_gameview_refresh(gv))
-        
-        n_games = self.gameview._liststore.get_n_items()
-        n_live = 0
-        n_active = 0
-        n_finished = 0
-        for i in range(n_games):
-            game = self.gameview._liststore.get_item(i).game
-            if game.is_live:
-                n_live += 1
-            else:
-                n_finished += 1
-    
-            if  game.is_active:
-                n_active += 1
-            
-        self.statusbar.push(0,_('{games} Games -- {active} Games active -- {live} Games live -- {finished} Games finished').format(
-            games=n_games,
-            active=n_active,
-            live=n_live,
-            finished=n_finished))
+        self.gameview.connect('game-active-changed',self._on_gameview_game_state_changed)
+        self.gameview.connect('game-live-changed',self._on_gameview_game_state_changed)
+        self.__update_statusbar()
         
         vbox.append(self.statusbar)
         
@@ -1340,6 +1412,7 @@ class AppWindow(Gtk.ApplicationWindow):
     def statusbar(self):
         return self.__statusbar
     
+    @profiled("gui.appwindow.refresh")
     def refresh(self,reload_game_manager:bool=False):
         """
         refresh Refresh the views of this window.
@@ -1349,27 +1422,54 @@ class AppWindow(Gtk.ApplicationWindow):
         self.gameview.refresh()
         #self.backupview.refresh()
         
-    def _on_gameview_refresh(self,gameview):
-        self.statusbar.pop(0)
-        n_games = gameview._liststore.get_n_items()
-        n_active = 0
-        n_live = 0
-        n_finished = 0
-        for i in range(n_games):
-            game = gameview._liststore.get_item(i).game
-            if game.is_live:
-                n_live += 1
-            else:
-                n_finished += 1
-    
-            if  game.is_active:
-                n_active += 1
+    def __update_game_state(self,key:str,game:Game|None):
+        """
+        __update_game_state Update the status bar counters for a single game.
+        
+        The `(is_active,is_live)` state of each game is stored, so a game
+        can be removed from the counters after its properties changed.
+
+        :param key: The key the game is registered with.
+        :type key: str
+        :param game: The game or `None` if the game was removed.
+        :type game: Game|None
+        """
+        old_state = self.__game_states.pop(key,None)
+        if old_state is not None:
+            self.__n_active -= old_state[0]
+            self.__n_live -= old_state[1]
+        if game is not None:
+            state = (int(game.is_active),int(game.is_live))
+            self.__game_states[key] = state
+            self.__n_active += state[0]
+            self.__n_live += state[1]
             
+    def __update_statusbar(self):
+        n_games = len(self.__game_states)
+        self.statusbar.pop(0)
         self.statusbar.push(0,_('{games} Games -- {active} Games active -- {live} Games live -- {finished} Games finished').format(
             games=n_games,
-            active=n_active,
-            live=n_live,
-            finished=n_finished))
+            active=self.__n_active,
+            live=self.__n_live,
+            finished=n_games - self.__n_live))
+        
+    def _on_gamemanager_game_added(self,gamemanager,game):
+        self.__update_game_state(game.key,game)
+        
+    def _on_gamemanager_game_removed(self,gamemanager,game,key):
+        self.__update_game_state(key,None)
+        
+    def _on_gamemanager_games_cleared(self,gamemanager):
+        self.__game_states = {}
+        self.__n_active = 0
+        self.__n_live = 0
+        
+    def _on_gameview_game_state_changed(self,gameview,game):
+        self.__update_game_state(game.key,game)
+        self.__update_statusbar()
+        
+    def _on_gameview_refresh(self,gameview):
+        self.__update_statusbar()
         
             
 class Application(Gtk.Application):
@@ -1480,6 +1580,19 @@ class Application(Gtk.Application):
         self.set_accels_for_action('app.backup-all',["<Primary><Shift>s"])
         self.set_accels_for_action('app.backup-active-live',["<Primary>s"])
         
+        # If the daemon is running, it runs the scheduled backups and the
+        # backups started in the GUI.
+        if not DaemonAttachment.get_global().attach() and settings.scheduler_enabled:
+            BackupScheduler.get_global().start()
+            
+    def do_shutdown(self):
+        """
+        do_shutdown The shutdown method for this application.
+        """
+        DaemonAttachment.get_global().detach()
+        BackupScheduler.get_global().stop(wait=False)
+        Gtk.Application.do_shutdown(self)
+        
     @property
     def builder(self)->Gtk.Builder:
         """
@@ -1533,10 +1646,7 @@ class Application(Gtk.Application):
             dialog.present()
             return
         
-        games = [g for g in gamemanager.games.values() 
-                 if (g.is_active 
-                     and g.is_live
-                     and os.path.exists(os.path.join(g.savegame_root,g.savegame_dir)))]
+        games = [g for g in gamemanager.games.values() if g.is_active and g.is_live]
         if games:
             if len(games) == 1:
                 dialog = BackupSingleDialog(self.appwindow,games[0])
@@ -1555,8 +1665,7 @@ class Application(Gtk.Application):
             dialog.present()
             return
         
-        games = [g for g in gamemanager.games.values() 
-                 if os.path.exists(os.path.join(g.savegame_root,g.savegame_dir))]
+        games = list(gamemanager.games.values())
         if games:
             if len(games) == 1:
                 dialog = BackupSingleDialog(self.appwindow,games[0])
@@ -1576,8 +1685,9 @@ class Application(Gtk.Application):
             self.appwindow.refresh()
             
         steam = Steam()
-        if steam.find_new_steamapps():
-            dialog = NewSteamAppsDialog(self.appwindow)
+        new_apps = steam.find_new_steamapps()
+        if new_apps:
+            dialog = NewSteamAppsDialog(self.appwindow,steam_apps=new_apps)
             dialog.connect_after('response',on_dialog_response)
             dialog.present()
         else:
@@ -1597,10 +1707,11 @@ class Application(Gtk.Application):
         
     def _on_action_epic_new_apps(self,action,param):
         epic = Epic()
-        if not epic.find_new_apps():
+        new_apps = epic.find_new_apps()
+        if not new_apps:
             dialog = EpicNoNewAppsDialog(self.appwindow)
         else:
-            dialog = EpicNewAppsDialog(self.appwindow)
+            dialog = EpicNewAppsDialog(self.appwindow,apps=new_apps)
             dialog.connect_after('response',lambda d,r: self.appwindow.refresh())
             
         dialog.present()
@@ -19,14 +19,91 @@
 from gi.repository import Gtk,GLib,GObject,Gio
 from ..game import GameManager,Game
 from ..archiver import ArchiverManager
+from ..daemon import DaemonAttachment,DaemonError
 from ..settings import settings
-from threading import Thread,ThreadError
+from ..utility import format_throughput,format_eta
+from threading import Thread,ThreadError,Lock
+from ._sorter import new_string_sorter,sort_key
 
 
 import logging
 
 logger = logging.getLogger(__name__)
 
+PROGRESS_UPDATE_INTERVAL = 100
+
+def format_progress_text(message:str|None,bytes_per_second:float,eta:float)->str:
+    text = message if message else "Working ..."
+    if bytes_per_second > 0.0:
+        text = "{text} ({throughput}, ETA {eta})".format(
+            text=text,
+            throughput=format_throughput(bytes_per_second),
+            eta=format_eta(eta))
+    return text
+
+class BackupProgressAggregator(object):
+    """
+    BackupProgressAggregator Coalesces progress events of backup threads.
+    
+    The backup threads only store the latest state of each game. The state
+    is delivered to the main loop every `PROGRESS_UPDATE_INTERVAL` ms by
+    calling *callback* with `(games,progress,finished)`. *games* is a dict
+    mapping the game keys to `(game,fraction,message,finished,bytes_per_second,eta)`
+    tuples of the games that changed since the last call, *progress* is a
+    `(fraction,bytes_per_second,eta)` tuple of the total progress or `None`
+    if it did not change and *finished* is `True` when the backup finished. After the last call the aggregator stops itself.
+    """
+    def __init__(self,callback,interval:int=PROGRESS_UPDATE_INTERVAL):
+        self.__callback = callback
+        self.__interval = interval
+        self.__mutex = Lock()
+        self.__games = {}
+        self.__progress = None
+        self.__finished = False
+        self.__source = 0
+        
+    def start(self):
+        if not self.__source:
+            self.__source = GLib.timeout_add(self.__interval,self.__flush)
+            
+    def stop(self):
+        if self.__source:
+            GLib.source_remove(self.__source)
+            self.__source = 0
+            
+    def game_progress(self,game:Game,fraction:float,message:str|None,
+                      bytes_per_second:float=0.0,eta:float=-1.0):
+        with self.__mutex:
+            self.__games[game.key] = (game,fraction,message,False,bytes_per_second,eta)
+            
+    def game_finished(self,game:Game):
+        with self.__mutex:
+            self.__games[game.key] = (game,1.0,None,True,0.0,0.0)
+            
+    def progress(self,fraction:float,bytes_per_second:float=0.0,eta:float=-1.0):
+        with self.__mutex:
+            self.__progress = (fraction,bytes_per_second,eta)
+            
+    def finished(self):
+        with self.__mutex:
+            self.__finished = True
+            
+    def __flush(self):
+        with self.__mutex:
+            games = self.__games
+            progress = self.__progress
+            finished = self.__finished
+            self.__games = {}
+            self.__progress = None
+            
+        if games or progress is not None or finished:
+            self.__callback(games,progress,finished)
+            
+        if finished:
+            self.__source = 0
+            return False
+        return True
+
 class BackupSingleDialog(Gtk.Dialog):
     def __init__(self,parent:Gtk.Window,game:Game):
         Gtk.Dialog.__init__(self)
@@ -51,61 +128,100 @@ class BackupSingleDialog(Gtk.Dialog):
         self.set_modal(True)
         
         self.__ok_button = self.add_button('Close',Gtk.ResponseType.OK)
+        self.__am_signals = []
+        self.__aggregator = None
+        self.__skipped_reason = None
         
-    def _on_propgress(self,fraction,message):
-        self.__progressbar.set_text(message if message else "Working ...")
+    def _on_propgress(self,fraction,message,bytes_per_second:float=0.0,eta:float=-1.0):
+        self.__progressbar.set_text(format_progress_text(message,bytes_per_second,eta))
         self.__progressbar.set_fraction(fraction)
         return False
         
     def do_response(self,response):
+        if self.__aggregator is not None:
+            self.__aggregator.stop()
+        self.__disconnect_signals()
         self.hide()
         self.destroy()
         
-    def _on_finished(self):
-        self.__progressbar.set_text("Finished ...")
-        self.__progressbar.set_fraction(1.0)
-        self.__ok_button.set_sensitive(True)
+    def __disconnect_signals(self):
         am = ArchiverManager.get_global()
+        for signal_id in self.__am_signals:
+            am.disconnect(signal_id)
+        self.__am_signals = []
         
-        if self.__am_signal_finished is not None:
-            am.disconnect(self.__am_signal_finished)
-            del self.__am_signal_finished
-            
-        if self.__am_signal_progress is not None:
-            am.disconnect(self.__am_signal_progress)
-            del self.__am_signal_progress
+    def _on_finished(self):
+        if self.__skipped_reason:
+            self.__progressbar.set_text("Skipped: {reason}".format(reason=self.__skipped_reason))
+            self.__progressbar.set_fraction(0.0)
+        else:
+            self.__progressbar.set_text("Finished ...")
+            self.__progressbar.set_fraction(1.0)
+        self.__ok_button.set_sensitive(True)
+        self.__disconnect_signals()
             
         if settings.gui_autoclose_backup_dialog:
             self.response(Gtk.ResponseType.OK)
         
         return False
+    
+    def _on_backup_error(self,message:str):
+        if self.__aggregator is not None:
+            self.__aggregator.stop()
+        self.__disconnect_signals()
+        self.__progressbar.set_text("Backup failed: {message}".format(message=message))
+        self.__progressbar.set_fraction(0.0)
+        self.__ok_button.set_sensitive(True)
+        self.set_decorated(True)
+        return False
+
+    def _on_progress_flush(self,games,progress,finished):
+        if self.__game.key in games:
+            game,fraction,message,game_finished,bytes_per_second,eta = games[self.__game.key]
+            if not game_finished:
+                self._on_propgress(min(max(fraction,0.0),1.0),message,bytes_per_second,eta)
+        if finished:
+            self._on_finished()
             
-    def _on_am_backup_game_progress(self,am,game,fraction,message):
-        def sanitize_fraction(fraction):
-            if fraction < 0.0:
-                return 0.0
-            if fraction > 1.0:
-                return 1.0
-            return fraction
+    def _on_am_backup_game_progress(self,am,game,fraction,message,bytes_per_second,eta):
         if self.__game.key == game.key:
-            GLib.idle_add(self._on_propgress,sanitize_fraction(fraction),message)
+            self.__aggregator.game_progress(game,fraction,message,bytes_per_second,eta)
             
     def _on_am_backup_game_finished(self,am,game):
         if self.__game.key == game.key:
-            GLib.idle_add(self._on_finished)
+            self.__aggregator.game_finished(game)
+            self.__aggregator.finished()
+            
+    def _on_am_backup_game_skipped(self,am,game,reason):
+        if self.__game.key == game.key:
+            self.__skipped_reason = reason
+            self.__aggregator.finished()
             
     def run(self):
         def _thread_func(archiver_manager,game):
-            am.backup(game)
+            try:
+                # The progress of backups run by the daemon is emitted on the
+                # local ArchiverManager.
+                if DaemonAttachment.get_global().backup([game]) is None:
+                    archiver_manager.backup(game)
+            except (RuntimeError,DaemonError) as ex:
+                # A scheduled or watched backup is running.
+                GLib.idle_add(self._on_backup_error,str(ex))
         self.__ok_button.set_sensitive(False)    
         self.present()
         
         
         am = ArchiverManager.get_global()
-        if not hasattr(self,'__am_signal_progress'):
-            self.__am_signal_progress = am.connect('backup-game-progress',self._on_am_backup_game_progress)
-        if not hasattr(self,'__am_signal_finished'):
-            self.__am_signal_finished = am.connect('backup-game-finished',self._on_am_backup_game_finished)
+        if am.backup_in_progress:
+            self._on_backup_error("A backup is already in progress!")
+            return
+        self.__am_signals = [
+            am.connect('backup-game-progress',self._on_am_backup_game_progress),
+            am.connect('backup-game-finished',self._on_am_backup_game_finished),
+            am.connect('backup-game-skipped',self._on_am_backup_game_skipped),
+        ]
+        self.__aggregator = BackupProgressAggregator(self._on_progress_flush)
+        self.__aggregator.start()
         thread = Thread(target=_thread_func,args=(am,self.__game),daemon=True)
         thread.start()
 
@@ -115,10 +231,15 @@ class BackupGameData(GObject.GObject):
         self.__progress = 0.0
         self.__game = game
         self.__finished = False
+        self.__sort_key = sort_key(game.name)
 
     @GObject.Property
     def game(self)->Game:
         return self.__game
+    
+    @GObject.Property(type=str)
+    def sort_key(self)->str:
+        return self.__sort_key
 
     @GObject.Property(type=str)
     def key(self)->str:
@@ -145,32 +266,22 @@ class BackupGameData(GObject.GObject):
     def finished(self,is_finished:bool):
         self.__finished = is_finished
         
-class BackupGameDataSorter(Gtk.Sorter):
-    def do_compare(self,item1,item2):
-        name1 = item1.game.name.lower()
-        name2 = item2.game.name.lower()
-        
-        if item1.finished:
-            if not item2.finished:
-                return Gtk.Ordering.SMALLER
-            elif name1 > name2:
-                return Gtk.Ordering.LARGER
-            elif name1 < name2:
-                return Gtk.Ordering.SMALLER
-            else:
-                return Gtk.Ordering.EQUAL
-        elif item2.finished:
-            return Gtk.Ordering.LARGER
-        elif item1.progress > item2.progress:
-            return Gtk.Ordering.SMALLER
-        elif item1.progress < item2.progress:
-            return Gtk.Ordering.LARGER
-        elif name1 > name2:
-            return Gtk.Ordering.LARGER
-        elif name1 < name2:
-            return Gtk.Ordering.SMALLER
-        else:
-            return Gtk.Ordering.EQUAL
+def new_backup_game_data_sorter()->Gtk.MultiSorter:
+    """
+    new_backup_game_data_sorter Create the sorter for the `BackupManyDialog`.
+    
+    Finished games come first, then the running games by progress and
+    finally by name.
+    
+    :rtype: Gtk.MultiSorter
+    """
+    sorter = Gtk.MultiSorter.new()
+    for prop in ('finished','progress'):
+        numeric_sorter = Gtk.NumericSorter.new(Gtk.PropertyExpression.new(BackupGameData,None,prop))
+        numeric_sorter.set_sort_order(Gtk.SortType.DESCENDING)
+        sorter.append(numeric_sorter)
+    sorter.append(new_string_sorter(BackupGameData,'sort_key'))
+    return sorter
 
 
 class BackupManyDialog(Gtk.Dialog):
@@ -185,7 +296,12 @@ class BackupManyDialog(Gtk.Dialog):
                 
         self.__scrolled = Gtk.ScrolledWindow()
         self.__games_liststore = Gio.ListStore.new(BackupGameData)
-        self.__games_progress_sorter = BackupGameDataSorter()
+        self.__games_rows = {}
+        self.__am_signals = []
+        self.__aggregator = None
+        self.__skipped_mutex = Lock()
+        self.__n_skipped = 0
+        self.__games_progress_sorter = new_backup_game_data_sorter()
         self.__games_sortmodel = Gtk.SortListModel.new(self.__games_liststore,
                                                        self.__games_progress_sorter)
         self.__games_selection = Gtk.SingleSelection.new(self.__games_sortmodel)
@@ -212,7 +328,8 @@ class BackupManyDialog(Gtk.Dialog):
         
         self.__progressbar = Gtk.ProgressBar()
         self.__progressbar.set_hexpand(True)
-        self.__progressbar.set_show_text(False)
+        self.__progressbar.set_show_text(True)
+        self.__progressbar.set_text("")
         self.get_content_area().append(self.__progressbar)
 
         self.__ok_button = self.add_button("Close",Gtk.ResponseType.OK)
@@ -232,34 +349,49 @@ class BackupManyDialog(Gtk.Dialog):
                 if not isinstance(g,Game):
                     self.__games = {}
                     raise TypeError("\"games\" is not an Iterable of \"Game\" instances!")
-                if g.get_backup_files():
-                    self.__games.append(g)
+                self.__games.append(g)
         if self.__games:
             self.__ok_button.set_sensitive(False)
         else:
             self.__ok_button.set_sensitive(True)
     
     def do_response(self,response):
+        if self.__aggregator is not None:
+            self.__aggregator.stop()
+        self.__disconnect_signals()
         self.hide()
         self.destroy()
         
     def run(self):
         def thread_func(am,games):
-            am.backup_many(games)
+            try:
+                if DaemonAttachment.get_global().backup(games) is None:
+                    am.backup_many(games)
+            except (RuntimeError,DaemonError) as ex:
+                # A scheduled or watched backup is running.
+                GLib.idle_add(self._on_backup_error,str(ex))
+                return 1
             return 0
         
-        def on_am_backup_game_progress(am,game,progress,message):
-            GLib.idle_add(self._on_backup_game_progress,game,progress)
+        def on_am_backup_game_progress(am,game,progress,message,bytes_per_second,eta):
+            if game.key in keys:
+                self.__aggregator.game_progress(game,progress,message,bytes_per_second,eta)
             
         def on_am_backup_game_finished(am,game):
-            GLib.idle_add(self._on_backup_game_finished,game)
+            if game.key in keys:
+                self.__aggregator.game_finished(game)
             
-        def on_am_backup_progress(am,progress):
-            GLib.idle_add(self._on_backup_progress,progress)
+        def on_am_backup_progress(am,progress,bytes_per_second,eta):
+            self.__aggregator.progress(progress,bytes_per_second,eta)
             
+        def on_am_backup_game_skipped(am,game,reason):
+            with self.__skipped_mutex:
+                self.__n_skipped += 1
+                
         def on_am_backup_finished(am):
-            GLib.idle_add(self._on_backup_finished)
+            self.__aggregator.finished()
             
+        keys = set(game.key for game in self.games)
         if not self.games:
             logger.warning("No games to backup!")
             self.hide()
@@ -270,22 +402,23 @@ class BackupManyDialog(Gtk.Dialog):
         self.__ok_button.set_sensitive(False)
         
         am = ArchiverManager.get_global()
+        if am.backup_in_progress:
+            self.present()
+            self._on_backup_error("A backup is already in progress!")
+            return
         
-        if not hasattr(self,'__signal_backup_progress'):
-            self.__signal_backup_progress =  am.connect('backup-progress',
-                                                        on_am_backup_progress)
-        if not hasattr(self,'__signal_backup_finished'):
-            self.__signal_backup_finished = am.connect('backup-finished',
-                                                       on_am_backup_finished)    
-        if not hasattr(self,'__signal_backup_game_progress'):
-            self.__signal_backup_game_progress = am.connect('backup-game-progress',
-                                                            on_am_backup_game_progress)    
-        if not hasattr(self,'__signal_backup_game_finished'):
-            self.__signal_backup_game_finished = am.connect('backup-game-finished',
-                                                            on_am_backup_game_finished)
+        self.__aggregator = BackupProgressAggregator(self._on_progress_flush)
+        self.__am_signals = [
+            am.connect('backup-progress',on_am_backup_progress),
+            am.connect('backup-finished',on_am_backup_finished),
+            am.connect('backup-game-progress',on_am_backup_game_progress),
+            am.connect('backup-game-finished',on_am_backup_game_finished),
+            am.connect('backup-game-skipped',on_am_backup_game_skipped),
+        ]
                 
         thread = Thread(target=thread_func,args=(am,list(self.__games)),daemon=True)
         self.present()
+        self.__aggregator.start()
         thread.start()        
 
     
@@ -310,69 +443,103 @@ class BackupManyDialog(Gtk.Dialog):
         progressbar = item.get_child()
         data = item.get_item()
         
-        if not hasattr(progressbar,'_property_progress_binding'):
-            progressbar._property_progress_binding = data.bind_property('progress',progressbar,'fraction',GObject.BindingFlags.SYNC_CREATE)
+        if hasattr(progressbar,'_property_progress_binding'):
+            progressbar._property_progress_binding.unbind()
+        progressbar._property_progress_binding = data.bind_property('progress',progressbar,'fraction',GObject.BindingFlags.SYNC_CREATE)
             
-    def _on_backup_game_progress(self,game:Game,progress:float):
-        for i in reversed(range(self.__games_liststore.get_n_items())):
-            gamedata = self.__games_liststore.get_item(i)
-            if gamedata.key == game.key:
-                gamedata.progress = progress
-                self.__games_progress_sorter.changed(Gtk.SorterChange.DIFFERENT)
-                return
-        gamedata = BackupGameData(game)
-        gamedata.progress = progress
-        self.__games_liststore.append(gamedata)
-        vadjustment = self.__scrolled.get_vadjustment()
-        vadjustment.set_value(vadjustment.get_upper() - vadjustment.get_page_size())
-        
+    def __is_out_of_order(self,rows:list[BackupGameData])->bool:
+        # Checks the rows against their neighbours in the sort model.
+        keys = set(row.key for row in rows)
+        model = self.__games_sortmodel
+        n_items = model.get_n_items()
+        for i in range(n_items):
+            item = model.get_item(i)
+            if item.key not in keys:
+                continue
+            if i > 0 and self.__games_progress_sorter.compare(model.get_item(i - 1),item) == Gtk.Ordering.LARGER:
+                return True
+            if i + 1 < n_items and self.__games_progress_sorter.compare(item,model.get_item(i + 1)) == Gtk.Ordering.LARGER:
+                return True
         return False
-        
-    def _on_backup_game_finished(self,game):
-        for i in reversed(range(self.__games_liststore.get_n_items())):
-            gamedata = self.__games_liststore.get_item(i)
-            if gamedata.key == game.key:
-                gamedata.progress = 1.0
+            
+    def _on_progress_flush(self,games:dict,progress:float|None,finished:bool):
+        new_rows = []
+        changed_rows = []
+        resort = False
+        for key,(game,fraction,message,game_finished,bytes_per_second,eta) in games.items():
+            gamedata = self.__games_rows.get(key,None)
+            if gamedata is None:
+                gamedata = BackupGameData(game)
+                self.__games_rows[key] = gamedata
+                new_rows.append(gamedata)
+            if gamedata.finished:
+                continue
+            old_progress = gamedata.progress
+            gamedata.progress = fraction
+            if gamedata.progress != old_progress:
+                changed_rows.append(gamedata)
+            if game_finished:
                 gamedata.finished = True
-                self.__games_progress_sorter.changed(Gtk.SorterChange.DIFFERENT)
-                return
-        gamedata = BackupGameData(game)
-        gamedata.progress = 1.0
-        gamedata.finished = True
-        self.__games_liststore.append(gamedata)
-        self.__games_progress_sorter.changed(Gtk.SorterChange.DIFFERENT)
-        vadjustment = self.__scrolled.get_vadjustment()
-        vadjustment.set_value(vadjustment.get_upper() - vadjustment.get_page_size())
-
-        return False
+                resort = True
+                
+        if new_rows:
+            self.__games_liststore.splice(self.__games_liststore.get_n_items(),0,new_rows)
+            resort = True
+            
+        # The sorter is only notified when the order of the rows changes.
+        if resort or (changed_rows and self.__is_out_of_order(changed_rows)):
+            self.__games_progress_sorter.changed(Gtk.SorterChange.DIFFERENT)
+                    
+        if new_rows:
+            vadjustment = self.__scrolled.get_vadjustment()
+            vadjustment.set_value(vadjustment.get_upper() - vadjustment.get_page_size())
         
-    def _on_backup_progress(self,progress:float):
+        if progress is not None:
+            self._on_backup_progress(*progress)
+        if finished:
+            self._on_backup_finished()
+        
+    def _on_backup_progress(self,progress:float,bytes_per_second:float=0.0,eta:float=-1.0):
         self.__progressbar.set_fraction(progress)
+        if bytes_per_second > 0.0:
+            self.__progressbar.set_text("{percent:.0f}% ({throughput}, ETA {eta})".format(
+                percent=progress * 100.0,
+                throughput=format_throughput(bytes_per_second),
+                eta=format_eta(eta)))
         
         return False
+    
+    def __disconnect_signals(self):
+        am = ArchiverManager.get_global()
+        for signal_id in self.__am_signals:
+            am.disconnect(signal_id)
+        self.__am_signals = []
+        
+    def _on_backup_error(self,message:str):
+        if self.__aggregator is not None:
+            self.__aggregator.stop()
+        self.__disconnect_signals()
+        self.__progressbar.set_fraction(0.0)
+        self.__progressbar.set_text("Backup failed: {message}".format(message=message))
+        self.__ok_button.set_sensitive(True)
+        self.set_decorated(True)
+        return False
         
     def _on_backup_finished(self):
+        with self.__skipped_mutex:
+            n_skipped = self.__n_skipped
         self.__progressbar.set_fraction(1.0)
+        if n_skipped >= len(self.__games):
+            self.__progressbar.set_text("No savegames found ...")
+        elif n_skipped:
+            self.__progressbar.set_text("Finished ({n} games skipped) ...".format(n=n_skipped))
+        else:
+            self.__progressbar.set_text("Finished ...")
         self.__ok_button.set_sensitive(True)
         self.set_decorated(True)
-        
-        am = ArchiverManager.get_global()
-        if hasattr(self,'__signal_backup_game_finished'):
-            am.diconnect(self.__signal_backup_game_finished)
-            del self.__signal_backup_game_finished
-        if hasattr(self,'__signal_backup_game_progress'):
-            am.disconnect(self.__signal_backup_game_progress)
-            del self.__signal_backup_game_progress
-        if hasattr(self,'__signal_backup_finished'):
-            am.disconnect(self.__signal_backup_finished)
-            del self.__signal_backup_finished
-        if hasattr(self,'__signal_backup_progress'):
-            am.disconnect(self.__signal_backup_progress)
-            del self.__signal_backup_progress
+        self.__disconnect_signals()
 
         if settings.gui_autoclose_backup_dialog:
             self.response(Gtk.ResponseType.OK)
                     
         return False
-        
-        
@@ -26,6 +26,7 @@ from ._gamedialog import GameSearchDialog
 from ..utility import PLATFORM_WINDOWS
 
 from ._gamedialog import GameDialog
+from ._sorter import new_string_sorter
 
 class EpicNoNewAppsDialog(Gtk.MessageDialog):
     def __init__(self,parent:Gtk.Window|None):
@@ -95,19 +96,8 @@ class EpicLookupGamesDialog(GameSearchDialog):
 
 ### EpicNewGamesDialog ########################################################
 
-class EpicNewAppsDialogSorter(Gtk.Sorter):
-    def do_compare(self,item1:EpicGameInfo,item2:EpicGameInfo):
-        name1 = item1.name.lower()
-        name2 = item2.name.lower()
-        
-        if name1 > name2:
-            return Gtk.Ordering.LARGER
-        elif name1 < name2:
-            return Gtk.Ordering.SMALLER
-        return Gtk.Ordering.EQUAL
-
 class EpicNewAppsDialog(Gtk.Dialog):
-    def __init__(self,parent:Gtk.Window|None=None):
+    def __init__(self,parent:Gtk.Window|None=None,apps:list[EpicGameInfo]|None=None):
         Gtk.Dialog.__init__(self,
                             transient_for=parent,
                             title=_("SGBackup: Manage new Epic-Games apps"),
@@ -116,13 +106,14 @@ class EpicNewAppsDialog(Gtk.Dialog):
         self.set_default_size(800,600)
         scrolled = Gtk.ScrolledWindow()
         
-        epic = Epic()
+        if apps is None:
+            apps = Epic().find_new_apps()
         self.__liststore = Gio.ListStore.new(EpicGameInfo)
-        for info in epic.find_new_apps():
+        for info in apps:
             self.__liststore.append(info)
             
         sort_model = Gtk.SortListModel(model=self.__liststore,
-                                       sorter=EpicNewAppsDialogSorter())
+                                       sorter=new_string_sorter(EpicGameInfo,'name',True))
         selection = Gtk.SingleSelection(model=sort_model,
                                         autoselect=False,
                                         can_unselect=True)
@@ -303,19 +294,6 @@ class EpicNewAppsDialog(Gtk.Dialog):
 
 #### EpicIgnoreAppsDialog ##########################################################
 
-class EpicIgnoredAppsDialogSorter(Gtk.Sorter):
-    def do_compare(self,item1:EpicIgnoredApp,item2:EpicIgnoredApp):
-        name1=item1.name.lower()
-        name2=item2.name.lower()
-        
-        if name1 < name2:
-            return Gtk.Ordering.SMALLER
-        elif name1 > name2:
-            return Gtk.Ordering.LARGER
-        
-        return Gtk.Ordering.EQUAL
-    
-
 class EpicIgnoredAppsDialog(Gtk.Dialog):
     def __init__(self,parent:Gtk.Window|None=None):
         Gtk.Dialog.__init__(self,transient_for=parent)
@@ -326,7 +304,7 @@ class EpicIgnoredAppsDialog(Gtk.Dialog):
         for ignored in epic.ignored_apps.values():
             self.__liststore.append(ignored)
     
-        sort_model = Gtk.SortListModel(model=self.__liststore,sorter=EpicIgnoredAppsDialogSorter())
+        sort_model = Gtk.SortListModel(model=self.__liststore,sorter=new_string_sorter(EpicIgnoredApp,'name',True))
         selection = Gtk.SingleSelection(model=sort_model)
         factory = Gtk.SignalListItemFactory()
         factory.connect('setup',self._on_listview_item_setup)
@@ -420,7 +398,13 @@ class EpicIgnoredAppsDialog(Gtk.Dialog):
             
         game = Game("",data.name,"")
         epic = Epic()
-        game_info = epic.find_apps()[data.catalog_item_id]
+        game_info = None
+        for info in epic.find_apps():
+            if info.catalog_item_id == data.catalog_item_id:
+                game_info = info
+                break
+        if game_info is None:
+            return
         
         if PLATFORM_WINDOWS:
             windows = EpicWindowsData("","",installdir=game_info.installdir)
@@ -22,6 +22,7 @@ from gi.repository import Gio,GLib,Gtk,Pango
 from gi.repository.GObject import Property,Signal,GObject,BindingFlags,SignalFlags
 import rapidfuzz
 from ..i18n import gettext as _, gettext_noop as N_
+from ._sorter import new_string_sorter,new_match_sorter,sort_key
 
 from ..game import (
     Game,
@@ -1528,11 +1529,16 @@ class GameSearchDialogData(GObject):
         GObject.__init__(self)
         self.__game = game
         self.__fuzzy_match = fuzzy_match
+        self.__sort_key = sort_key(game.name)
         
     @Property
     def game(self)->Game:
         return self.__game
     
+    @Property(type=str)
+    def sort_key(self)->str:
+        return self.__sort_key
+    
     @Property(type=float)
     def fuzzy_match(self)->float:
         return self.__fuzzy_match
@@ -1542,34 +1548,6 @@ class GameSearchDialogData(GObject):
         self.__fuzzy_match = match
         
 
-class GameSearchDialogDataSorter(Gtk.Sorter):
-    def do_compare(self,item1:GameSearchDialogData,item2:GameSearchDialogData):
-        if (item1.fuzzy_match > item2.fuzzy_match):
-            return Gtk.Ordering.SMALLER
-        elif (item1.fuzzy_match < item2.fuzzy_match):
-            return Gtk.Ordering.LARGER
-        
-        name1 = item1.game.name.lower()
-        name2 = item2.game.name.lower()
-        
-        if (name1 > name2):
-            return Gtk.Ordering.LARGER
-        elif (name1 < name2):
-            return Gtk.Ordering.SMALLER
-        return Gtk.Ordering.EQUAL
-
-class GameSearchDialogDataNameSorter(Gtk.Sorter):
-    def do_compare(self,item1:GameSearchDialogData,item2:GameSearchDialogData):
-        name1 = item1.game.name.lower()
-        name2 = item2.game.name.lower()
-        
-        if (name1 > name2):
-            return Gtk.Ordering.LARGER
-        elif (name1 < name2):
-            return Gtk.Ordering.SMALLER
-        return Gtk.Ordering.EQUAL
-    
-
 class GameSearchDialogDataFilter(Gtk.Filter):
     def do_match(self,item:GameSearchDialogData):
         return (item.fuzzy_match > 0.0)
@@ -1615,7 +1593,7 @@ class GameSearchDialog(Gtk.Dialog):
         self.__liststore = Gio.ListStore()
         for i in self.__get_search_games(search_name):
             self.__liststore.append(GameSearchDialogData(**i))
-        self.__sort_model = Gtk.SortListModel(model=self.__liststore,sorter=GameSearchDialogDataSorter())
+        self.__sort_model = Gtk.SortListModel(model=self.__liststore,sorter=new_match_sorter(GameSearchDialogData,'fuzzy_match','sort_key'))
         self.__filter_model = Gtk.FilterListModel(model=self.__sort_model,
                                                   filter=GameSearchDialogDataFilter() if search_name else None)
         selection = Gtk.SingleSelection(model=self.__filter_model,autoselect=False,can_unselect=True)
@@ -1774,10 +1752,10 @@ class GameSearchDialog(Gtk.Dialog):
     
     def _on_search_switch_state_set(self,switch:Gtk.Switch,state:bool):
         if state:
-            self.__sort_model.set_sorter(GameSearchDialogDataSorter())
+            self.__sort_model.set_sorter(new_match_sorter(GameSearchDialogData,'fuzzy_match','sort_key'))
             self.__filter_model.set_filter(GameSearchDialogDataFilter())
         else:
-            self.__sort_model.set_sorter(GameSearchDialogDataNameSorter())
+            self.__sort_model.set_sorter(new_string_sorter(GameSearchDialogData,'sort_key'))
             self.__filter_model.set_filter(None)
         
     @Property(type=str)
@@ -0,0 +1,91 @@
+###############################################################################
+# sgbackup - The SaveGame Backup tool                                         #
+#    Copyright (C) 2024,2025  Christian Moser                                 #
+#                                                                             #
+#    This program is free software: you can redistribute it and/or modify     #
+#    it under the terms of the GNU General Public License as published by     #
+#    the Free Software Foundation, either version 3 of the License, or        #
+#    (at your option) any later version.                                      #
+#                                                                             #
+#    This program is distributed in the hope that it will be useful,          #
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of           #
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the            #
+#    GNU General Public License for more details.                             #
+#                                                                             #
+#    You should have received a copy of the GNU General Public License        #
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.   #
+###############################################################################
+
+import rapidfuzz
+
+from ..game import Game
+
+SEARCH_DELAY = 150
+
+class GameSearchIndex(object):
+    """
+    GameSearchIndex A prebuilt fuzzy search index over games.
+
+    The names, keys and savegame names of the games are collected once (and
+    lowercased once for case insensitive searches), so a query only has to
+    run the scorer. The index does not reference any GTK objects and can be
+    queried from a worker thread.
+    """
+    def __init__(self,games:list[Game],generation:int=0):
+        self.__generation = generation
+        self.__choices = []
+        self.__choices_lower = []
+        self.__choice_keys = []
+
+        for game in games:
+            for text in set((game.name,game.key,game.savegame_name)):
+                if not text:
+                    continue
+                self.__choices.append(text)
+                self.__choices_lower.append(text.lower())
+                self.__choice_keys.append(game.key)
+
+    @property
+    def generation(self)->int:
+        """
+        generation The `GameManager.generation` the index was built for.
+
+        :type: int
+        """
+        return self.__generation
+
+    def query(self,search_name:str,case_sensitive:bool=False,limit:int|None=None)->dict[str:float]:
+        """
+        query Run a fuzzy search.
+
+        :param search_name: The text to search for.
+        :type search_name: str
+        :param case_sensitive: Compare case sensitive.
+        :type case_sensitive: bool
+        :param limit: The maximum number of games to return.
+        :type limit: int|None
+        :return: A dict mapping the game keys to their best score.
+        :rtype: dict[str:float]
+        """
+        if case_sensitive:
+            choices = self.__choices
+            query = search_name
+        else:
+            choices = self.__choices_lower
+            query = search_name.lower()
+
+        result = rapidfuzz.process.extract(query=query,
+                                           choices=choices,
+                                           limit=None,
+                                           scorer=rapidfuzz.fuzz.WRatio,
+                                           processor=None,
+                                           score_cutoff=0.1)
+        ret = {}
+        for text,score,pos in result:
+            key = self.__choice_keys[pos]
+            if score > ret.get(key,0.0):
+                ret[key] = score
+
+        if limit and len(ret) > limit:
+            ret = dict(sorted(ret.items(),key=lambda i: i[1],reverse=True)[:limit])
+        return ret
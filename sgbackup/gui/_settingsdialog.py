@@ -221,6 +221,25 @@ class SettingsDialog(Gtk.Dialog):
         backup_frame.set_child(grid)
         vbox.append(backup_frame)
         
+        ### Retention Settings
+        retention_frame = self.create_frame('Retention Settings')
+        retention_grid = self.create_grid()
+        
+        page.retention_spinbuttons = {}
+        for row,(name,label_text) in enumerate((('hourly',"Hourly backups:"),
+                                                ('daily',"Daily backups:"),
+                                                ('weekly',"Weekly backups:"),
+                                                ('monthly',"Monthly backups:"))):
+            label = self.create_label(label_text)
+            spinbutton = Gtk.SpinButton.new_with_range(0,1000,1)
+            spinbutton.set_hexpand(True)
+            spinbutton.set_value(settings.get_property('retention-' + name))
+            retention_grid.attach(label,0,row,1,1)
+            retention_grid.attach(spinbutton,1,row,1,1)
+            page.retention_spinbuttons[name] = spinbutton
+        retention_frame.set_child(retention_grid)
+        vbox.append(retention_frame)
+        
         ### Search Settings
         search_frame = self.create_frame('Search Settings')
         search_grid = self.create_grid()
@@ -493,6 +512,8 @@ class SettingsDialog(Gtk.Dialog):
     def do_save(self):
         settings.backup_dir = self.general_page.backupdir_label.get_text()
         settings.backup_versions = self.general_page.backup_versions_spinbutton.get_value_as_int()
+        for name,spinbutton in self.general_page.retention_spinbuttons.items():
+            settings.set_property('retention-' + name,spinbutton.get_value_as_int())
         settings.backup_threads = self.general_page.backup_threads_spinbutton.get_value_as_int()
         settings.archiver = self.general_page.archiver_dropdown.get_selected_item().key
         settings.gui_autoclose_backup_dialog = self.general_page.gui_autoclose_backup_dialog_switch.get_active()
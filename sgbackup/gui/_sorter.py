@@ -0,0 +1,71 @@
+###############################################################################
+# sgbackup - The SaveGame Backup tool                                         #
+#    Copyright (C) 2024,2025  Christian Moser                                 #
+#                                                                             #
+#    This program is free software: you can redistribute it and/or modify     #
+#    it under the terms of the GNU General Public License as published by     #
+#    the Free Software Foundation, either version 3 of the License, or        #
+#    (at your option) any later version.                                      #
+#                                                                             #
+#    This program is distributed in the hope that it will be useful,          #
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of           #
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the            #
+#    GNU General Public License for more details.                             #
+#                                                                             #
+#    You should have received a copy of the GNU General Public License        #
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.   #
+###############################################################################
+
+from gi.repository import Gtk
+
+def new_string_sorter(item_type:type,property_name:str,ignore_case:bool=False)->Gtk.StringSorter:
+    """
+    new_string_sorter Create a `Gtk.StringSorter` for a string property.
+
+    Use it with a precomputed sort key (see `sort_key()`) and *ignore_case*
+    set to `False`, so the comparison runs in C without any Python calls.
+
+    :param item_type: The GObject type of the list items.
+    :type item_type: type
+    :param property_name: The name of the property to sort by.
+    :type property_name: str
+    :param ignore_case: Let GTK casefold the strings.
+    :type ignore_case: bool
+    :rtype: Gtk.StringSorter
+    """
+    sorter = Gtk.StringSorter.new(Gtk.PropertyExpression.new(item_type,None,property_name))
+    sorter.set_ignore_case(ignore_case)
+    return sorter
+
+def new_match_sorter(item_type:type,match_property:str,sort_key_property:str)->Gtk.MultiSorter:
+    """
+    new_match_sorter Create a sorter for search results.
+
+    The items are sorted by *match_property* (a float) in descending order
+    and by *sort_key_property* for equal matches.
+
+    :param item_type: The GObject type of the list items.
+    :type item_type: type
+    :param match_property: The name of the match value property.
+    :type match_property: str
+    :param sort_key_property: The name of the sort key property.
+    :type sort_key_property: str
+    :rtype: Gtk.MultiSorter
+    """
+    match_sorter = Gtk.NumericSorter.new(Gtk.PropertyExpression.new(item_type,None,match_property))
+    match_sorter.set_sort_order(Gtk.SortType.DESCENDING)
+
+    sorter = Gtk.MultiSorter.new()
+    sorter.append(match_sorter)
+    sorter.append(new_string_sorter(item_type,sort_key_property))
+    return sorter
+
+def sort_key(text:str|None)->str:
+    """
+    sort_key Get the precomputed sort key for a string.
+
+    :param text: The string.
+    :type text: str|None
+    :rtype: str
+    """
+    return text.casefold() if text else ""
@@ -44,6 +44,7 @@ from ..game import (
 
 
 from ._gamedialog import GameDialog,GameSearchDialog
+from ._sorter import new_string_sorter
 
 class SteamLibrariesDialog(Gtk.Dialog):
     def __init__(self,parent:Gtk.Window|None=None):
@@ -212,24 +213,13 @@ class SteamLibrariesDialog(Gtk.Dialog):
                 if os.path.isdir(item.directory):
                     steamlibs.append(item)
             self.__steam.libraries = steamlibs                
+            # games moved to another library get their new directories
+            self.__steam.update_steam_apps()
         
         self.hide()
         self.destroy()
         
 
-class NewSteamAppSorter(Gtk.Sorter):
-    def do_compare(self,item1:SteamApp,item2:SteamApp):
-        s1=item1.name.lower()
-        s2=item2.name.lower()
-        
-        if s1 < s2:
-            return Gtk.Ordering.SMALLER
-        elif s1 > s2:
-            return Gtk.Ordering.LARGER
-        else:
-            return Gtk.Ordering.EQUAL
-
-
 class SteamGameLookupDialog(GameSearchDialog):
     def __init__(self,parent,steam_app:SteamApp):
         GameSearchDialog.__init__(self,parent,steam_app.name,_("Search Steam Apps"))
@@ -285,7 +275,7 @@ class SteamGameLookupDialog(GameSearchDialog):
         
 
 class NewSteamAppsDialog(Gtk.Dialog):
-    def __init__(self,parent:Gtk.Window|None=None):
+    def __init__(self,parent:Gtk.Window|None=None,steam_apps:list[SteamApp]|None=None):
         Gtk.Dialog.__init__(self)
         if parent:
             self.set_transient_for(parent)
@@ -294,11 +284,13 @@ class NewSteamAppsDialog(Gtk.Dialog):
         self.set_default_size(800,600)
         self.__steam = Steam()
         
+        if steam_apps is None:
+            steam_apps = self.__steam.find_new_steamapps()
         self.__listmodel = Gio.ListStore.new(SteamApp)
-        for app in self.__steam.find_new_steamapps():
+        for app in steam_apps:
             self.__listmodel.append(app)
         
-        sortmodel = Gtk.SortListModel.new(self.__listmodel,NewSteamAppSorter())
+        sortmodel = Gtk.SortListModel.new(self.__listmodel,new_string_sorter(SteamApp,'sort_key'))
         selection = Gtk.SingleSelection.new(sortmodel)
         selection.set_can_unselect(True)
         selection.set_autoselect(False)
@@ -514,18 +506,6 @@ class SteamNoIgnoredAppsDialog(Gtk.MessageDialog):
         self.destroy()
 
 
-class SteamIgnoreAppsSorter(Gtk.Sorter):
-    def do_compare(self,item1:IgnoreSteamApp,item2:IgnoreSteamApp):
-        s1 = item1.name.lower()
-        s2 = item2.name.lower()
-        
-        if s1 > s2:
-            return Gtk.Ordering.LARGER
-        elif s1 < s2:
-            return Gtk.Ordering.SMALLER
-        else:
-            return Gtk.Ordering.EQUAL
-
 class SteamIgnoreAppsDialog(Gtk.Dialog):
     def __init__(self,parent:Gtk.Window|None=None):
         Gtk.Dialog.__init__(self)
@@ -541,7 +521,7 @@ class SteamIgnoreAppsDialog(Gtk.Dialog):
         for sia in steam.ignore_apps.values():
             self.__liststore.append(sia)
             
-        self.__sortmodel = Gtk.SortListModel(model=self.__liststore,sorter=SteamIgnoreAppsSorter())
+        self.__sortmodel = Gtk.SortListModel(model=self.__liststore,sorter=new_string_sorter(IgnoreSteamApp,'name',True))
         self.__selection = Gtk.SingleSelection(model=self.__sortmodel,
                                                can_unselect=True,
                                                autoselect=True)
@@ -18,9 +18,6 @@
 ###############################################################################
 
 import logging
-from . import gui
-from .gui import Application
-from .steam import SteamLibrary
 import sys
 from . import commands
 
@@ -57,7 +54,13 @@ def cli_main():
         return commands.COMMANDS['synopsis'].execute([])
     
     for cmd,argv in commands_to_execute:
-        ec = cmd.execute(argv)
+        ec = None
+        if cmd.is_forwardable():
+            # The daemon module is only imported if a command can be forwarded.
+            from .daemon import forward_command
+            ec = forward_command(cmd.get_id(),argv)
+        if ec is None:
+            ec = cmd.execute(argv)
         if ec:
             logger.error('sgbackup aborted due to an error!')
             return ec
@@ -66,6 +69,9 @@ def cli_main():
 
 def gui_main():
     logger.debug("Running gui_main()")
+    # The GUI is imported here, so the CLI does not load Gtk.
+    from . import gui
+    from .gui import Application
     gui._app = Application()
     gui._app.run()
     return 0
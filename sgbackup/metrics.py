@@ -0,0 +1,252 @@
+###############################################################################
+# sgbackup - The SaveGame Backup tool                                         #
+#    Copyright (C) 2024,2025  Christian Moser                                 #
+#                                                                             #
+#    This program is free software: you can redistribute it and/or modify     #
+#    it under the terms of the GNU General Public License as published by     #
+#    the Free Software Foundation, either version 3 of the License, or        #
+#    (at your option) any later version.                                      #
+#                                                                             #
+#    This program is distributed in the hope that it will be useful,          #
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of           #
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the            #
+#    GNU General Public License for more details.                             #
+#                                                                             #
+#    You should have received a copy of the GNU General Public License        #
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.   #
+###############################################################################
+
+import os
+import json
+import time
+import threading
+
+from .settings import settings
+
+import logging
+logger = logging.getLogger(__name__)
+
+class BackupMetrics(object):
+    """
+    BackupMetrics Timings and sizes of a single game backup.
+
+    All times are in seconds. The record is filled by `Archiver.backup()`,
+    `BackupProgress` and `ArchiverManager.backup()` and delivered by the
+    *backup-metrics* signal of the `ArchiverManager`.
+    """
+    def __init__(self,game_key:str,archiver_key:str):
+        self.game = game_key
+        self.archiver = archiver_key
+        self.timestamp = time.time()
+        self.filename = None
+        self.success = False
+        self.skipped = False
+        self.file_count = 0
+        self.total_bytes = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.scan_time = 0.0
+        self.compress_time = 0.0
+        self.fsync_time = 0.0
+        self.cpu_time = 0.0
+        self.total_time = 0.0
+
+    @property
+    def compression_ratio(self)->float:
+        """
+        compression_ratio The bytes read divided by the bytes written, `0.0`
+        if nothing was written.
+
+        :type: float
+        """
+        if self.bytes_written <= 0:
+            return 0.0
+        return self.bytes_read / self.bytes_written
+
+    def to_dict(self)->dict:
+        return {
+            'type':'backup',
+            'timestamp':self.timestamp,
+            'game':self.game,
+            'archiver':self.archiver,
+            'filename':self.filename,
+            'success':self.success,
+            'skipped':self.skipped,
+            'file_count':self.file_count,
+            'total_bytes':self.total_bytes,
+            'bytes_read':self.bytes_read,
+            'bytes_written':self.bytes_written,
+            'compression_ratio':self.compression_ratio,
+            'scan_time':self.scan_time,
+            'compress_time':self.compress_time,
+            'fsync_time':self.fsync_time,
+            'cpu_time':self.cpu_time,
+            'total_time':self.total_time,
+        }
+
+class BatchMetrics(object):
+    """
+    BatchMetrics Summary of a `ArchiverManager.backup_many()` call.
+    """
+    def __init__(self,archiver_key:str,threads:int):
+        self.archiver = archiver_key
+        self.threads = threads
+        self.timestamp = time.time()
+        self.games = []
+        self.total_time = 0.0
+
+    def add(self,metrics:BackupMetrics):
+        self.games.append(metrics)
+
+    @property
+    def bytes_read(self)->int:
+        return sum(m.bytes_read for m in self.games)
+
+    @property
+    def bytes_written(self)->int:
+        return sum(m.bytes_written for m in self.games)
+
+    @property
+    def bytes_per_second(self)->float:
+        """
+        bytes_per_second The bytes read per second of wall time.
+
+        :type: float
+        """
+        if self.total_time <= 0.0:
+            return 0.0
+        return self.bytes_read / self.total_time
+
+    def to_dict(self)->dict:
+        return {
+            'type':'batch',
+            'timestamp':self.timestamp,
+            'archiver':self.archiver,
+            'threads':self.threads,
+            'games':len(self.games),
+            'succeeded':len([m for m in self.games if m.success]),
+            'failed':len([m for m in self.games if not m.success and not m.skipped]),
+            'skipped':len([m for m in self.games if m.skipped]),
+            'bytes_read':self.bytes_read,
+            'bytes_written':self.bytes_written,
+            'bytes_per_second':self.bytes_per_second,
+            'cpu_time':sum(m.cpu_time for m in self.games),
+            'total_job_time':sum(m.total_time for m in self.games),
+            'total_time':self.total_time,
+        }
+
+class PruneMetrics(object):
+    """
+    PruneMetrics Summary of a `RetentionManager.prune()` call.
+
+    The expired backups are deleted in the background after the backups, so
+    the pruning is recorded separately from the backups.
+    """
+    def __init__(self,games:int):
+        self.timestamp = time.time()
+        self.games = games
+        self.removed = 0
+        self.total_time = 0.0
+
+    def to_dict(self)->dict:
+        return {
+            'type':'prune',
+            'timestamp':self.timestamp,
+            'games':self.games,
+            'removed':self.removed,
+            'total_time':self.total_time,
+        }
+
+class MetricsLog(object):
+    """
+    MetricsLog Appends metrics records as JSON lines to `metrics.jsonl` in
+    `settings.config_dir`.
+
+    When the file grows beyond `settings.metrics_max_size` bytes it is
+    rotated to `metrics.1.jsonl` and so on. `settings.metrics_keep` rotated
+    files are kept.
+    """
+    __global_metrics_log = None
+
+    @staticmethod
+    def get_global()->"MetricsLog":
+        if MetricsLog.__global_metrics_log is None:
+            MetricsLog.__global_metrics_log = MetricsLog()
+        return MetricsLog.__global_metrics_log
+
+    def __init__(self,filename:str|None=None):
+        self.__filename = filename if filename else os.path.join(settings.config_dir,'metrics.jsonl')
+        self.__mutex = threading.Lock()
+
+    @property
+    def filename(self)->str:
+        return self.__filename
+
+    def get_rotated_filename(self,n:int)->str:
+        base,ext = os.path.splitext(self.filename)
+        return "{base}.{n}{ext}".format(base=base,n=n,ext=ext)
+
+    def __rotate(self):
+        keep = settings.metrics_keep
+        if keep < 1:
+            os.unlink(self.filename)
+            return
+        oldest = self.get_rotated_filename(keep)
+        if os.path.exists(oldest):
+            os.unlink(oldest)
+        for n in range(keep - 1,0,-1):
+            rotated = self.get_rotated_filename(n)
+            if os.path.exists(rotated):
+                os.rename(rotated,self.get_rotated_filename(n + 1))
+        os.rename(self.filename,self.get_rotated_filename(1))
+
+    def write(self,record:dict):
+        """
+        write Append a record to the metrics log.
+
+        Errors are logged and otherwise ignored, so a broken metrics log
+        never fails a backup.
+
+        :param record: The record to write. It needs to be JSON serializable.
+        :type record: dict
+        """
+        line = json.dumps(record) + "\n"
+        with self.__mutex:
+            try:
+                max_size = settings.metrics_max_size
+                if (max_size > 0 and os.path.isfile(self.filename)
+                        and os.path.getsize(self.filename) + len(line) > max_size):
+                    self.__rotate()
+                dirname = os.path.dirname(self.filename)
+                if not os.path.isdir(dirname):
+                    os.makedirs(dirname)
+                with open(self.filename,'a',encoding="utf-8") as ofile:
+                    ofile.write(line)
+            except OSError as ex:
+                logger.warning("Unable to write metrics to \"{filename}\"! ({error})".format(
+                    filename=self.filename,
+                    error=str(ex)))
+
+    def read(self)->list[dict]:
+        """
+        read Read the records of the metrics log, oldest first.
+
+        The rotated files are read as well.
+
+        :rtype: list[dict]
+        """
+        ret = []
+        filenames = [self.get_rotated_filename(n) for n in range(settings.metrics_keep,0,-1)]
+        filenames.append(self.filename)
+        with self.__mutex:
+            for filename in filenames:
+                if not os.path.isfile(filename):
+                    continue
+                with open(filename,'r',encoding="utf-8") as ifile:
+                    for line in ifile:
+                        try:
+                            ret.append(json.loads(line))
+                        except ValueError:
+                            # truncated line
+                            continue
+        return ret
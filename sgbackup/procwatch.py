@@ -0,0 +1,373 @@
+###############################################################################
+# sgbackup - The SaveGame Backup tool                                         #
+#    Copyright (C) 2024,2025  Christian Moser                                 #
+#                                                                             #
+#    This program is free software: you can redistribute it and/or modify     #
+#    it under the terms of the GNU General Public License as published by     #
+#    the Free Software Foundation, either version 3 of the License, or        #
+#    (at your option) any later version.                                      #
+#                                                                             #
+#    This program is distributed in the hope that it will be useful,          #
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of           #
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the            #
+#    GNU General Public License for more details.                             #
+#                                                                             #
+#    You should have received a copy of the GNU General Public License        #
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.   #
+###############################################################################
+
+from gi.repository import GLib
+from gi.repository.GObject import GObject,Signal,SignalFlags,Property
+
+import os
+import time
+import socket
+import struct
+import threading
+
+from .game import Game,GameManager
+
+import logging
+logger = logging.getLogger(__name__)
+
+# The interval of /proc scans when the netlink proc connector is not available.
+POLL_INTERVAL = 5.0
+
+# The seconds after the start of a process when unmatched processes are
+# matched again. Wine and Proton rewrite argv and comm after exec.
+RECHECK_DELAYS = (1.0,3.0,10.0)
+
+# netlink proc connector constants (linux/connector.h, linux/cn_proc.h)
+_NETLINK_CONNECTOR = 11
+_CN_IDX_PROC = 1
+_CN_VAL_PROC = 1
+_NLMSG_DONE = 3
+_PROC_CN_MCAST_LISTEN = 1
+_PROC_CN_MCAST_IGNORE = 2
+_PROC_EVENT_EXEC = 0x00000002
+_PROC_EVENT_EXIT = 0x80000000
+
+_NLMSGHDR = struct.Struct("=IHHII")
+_CN_MSG = struct.Struct("=IIIIHH")
+_PROC_EVENT_HEADER = struct.Struct("=IIQ")
+_PROC_EVENT_PID = struct.Struct("=II")
+
+def _normalize_path(path:str)->str:
+    # Wine and Proton show the executables as "Z:\\path\\to\\game.exe".
+    if len(path) > 2 and path[1] == ':' and path[0] in "zZ":
+        path = path[2:].replace('\\','/')
+    return os.path.normpath(path)
+
+class GameProcessMatcher(object):
+    """
+    GameProcessMatcher Maps executables to games.
+
+    A process belongs to a game if its executable (or for Wine/Proton its
+    first argument) is `LinuxGame.binary` or is located in the Steam or Epic
+    *installdir* of the game.
+    """
+    def __init__(self,games:list[Game]):
+        self.__binaries = {}
+        self.__binary_names = {}
+        self.__installdirs = []
+
+        for game in games:
+            if game.linux and game.linux.binary:
+                binary = game.linux.binary
+                if os.path.isabs(binary):
+                    self.__binaries[os.path.normpath(binary)] = game
+                else:
+                    self.__binary_names[os.path.basename(binary)] = game
+
+            installdirs = []
+            if game.steam:
+                for data in (game.steam.linux,game.steam.windows):
+                    if data and data.installdir:
+                        installdirs.append(data.installdir)
+            if game.epic and game.epic.windows and game.epic.windows.installdir:
+                installdirs.append(game.epic.windows.installdir)
+
+            for installdir in installdirs:
+                installdir = _normalize_path(installdir)
+                if os.path.isabs(installdir):
+                    self.__installdirs.append((installdir + os.sep,game))
+
+        # longest prefix first, for libraries inside of other install dirs
+        self.__installdirs.sort(key=lambda i: len(i[0]),reverse=True)
+
+    def __bool__(self):
+        return bool(self.__binaries or self.__binary_names or self.__installdirs)
+
+    def match_path(self,path:str)->Game|None:
+        """
+        match_path Find the game an executable belongs to.
+
+        :param path: The path of the executable.
+        :type path: str
+        :rtype: Game|None
+        """
+        if not path:
+            return None
+        path = _normalize_path(path)
+        if path in self.__binaries:
+            return self.__binaries[path]
+        for installdir,game in self.__installdirs:
+            if path.startswith(installdir):
+                return game
+        return self.__binary_names.get(os.path.basename(path),None)
+
+    def match_pid(self,pid:int)->Game|None:
+        """
+        match_pid Find the game a process belongs to.
+
+        :param pid: The process id.
+        :type pid: int
+        :rtype: Game|None
+        """
+        try:
+            game = self.match_path(os.readlink("/proc/{pid}/exe".format(pid=pid)))
+            if game is not None:
+                return game
+        except OSError:
+            # process exited or belongs to another user
+            pass
+
+        try:
+            with open("/proc/{pid}/cmdline".format(pid=pid),'rb') as ifile:
+                argv0 = ifile.read(4096).split(b'\0',1)[0]
+        except OSError:
+            return None
+        if not argv0:
+            return None
+        return self.match_path(os.fsdecode(argv0))
+
+class GameProcessWatcher(GObject):
+    """
+    GameProcessWatcher Reports when the processes of a game exit.
+
+    On Linux the netlink proc connector is used if the process is permitted
+    to listen to it (usually it needs `CAP_NET_ADMIN`). Otherwise `/proc` is
+    scanned every `POLL_INTERVAL` seconds. Only processes that were not seen
+    before are inspected, so a scan costs one `os.scandir()` call on `/proc`
+    plus the lookups of new processes. New processes that do not match a game
+    are matched again after each of the `RECHECK_DELAYS`.
+
+    `game-started` and `game-exited` are emitted in the main loop.
+    """
+    def __init__(self,games:list[Game]|None=None,poll_interval:float=POLL_INTERVAL):
+        GObject.__init__(self)
+        if games is None:
+            games = [game for game in GameManager.get_global().games.values() if game.is_active]
+        self.__matcher = GameProcessMatcher(games)
+        self.__poll_interval = poll_interval
+        self.__processes = {}
+        self.__rechecks = {}
+        self.__running_games = {}
+        self.__stop_event = threading.Event()
+        self.__thread = None
+        self.__use_netlink = False
+
+    @staticmethod
+    def is_supported()->bool:
+        return os.path.isdir("/proc/self")
+
+    @Property(type=bool,default=False)
+    def is_running(self)->bool:
+        return self.__thread is not None
+
+    @Property(type=bool,default=False)
+    def uses_netlink(self)->bool:
+        """
+        uses_netlink `True` if the netlink proc connector is used instead of
+        scanning `/proc`.
+
+        :type: bool
+        """
+        return self.__use_netlink
+
+    @property
+    def running_games(self)->list[str]:
+        """
+        running_games The keys of the games with running processes.
+
+        :type: list[str]
+        """
+        return list(self.__running_games.keys())
+
+    def start(self):
+        if self.__thread is not None:
+            return
+        if not self.is_supported():
+            raise RuntimeError("Watching game processes needs a /proc filesystem!")
+
+        self.__stop_event.clear()
+        sock = self.__open_netlink()
+        self.__use_netlink = sock is not None
+        self.__thread = threading.Thread(target=self.__thread_func,args=(sock,),daemon=True)
+        self.__thread.start()
+
+    def stop(self):
+        if self.__thread is None:
+            return
+        self.__stop_event.set()
+        self.__thread.join()
+        self.__thread = None
+
+    def __open_netlink(self)->socket.socket|None:
+        if not hasattr(socket,'AF_NETLINK'):
+            return None
+        try:
+            sock = socket.socket(socket.AF_NETLINK,socket.SOCK_DGRAM,_NETLINK_CONNECTOR)
+            sock.bind((os.getpid(),_CN_IDX_PROC))
+            self.__send_netlink_op(sock,_PROC_CN_MCAST_LISTEN)
+        except OSError as ex:
+            logger.debug("netlink proc connector not available, scanning /proc instead. ({error})".format(
+                error=str(ex)))
+            return None
+        sock.settimeout(1.0)
+        return sock
+
+    def __send_netlink_op(self,sock:socket.socket,op:int):
+        payload = struct.pack("=I",op)
+        cn_msg = _CN_MSG.pack(_CN_IDX_PROC,_CN_VAL_PROC,0,0,len(payload),0) + payload
+        header = _NLMSGHDR.pack(_NLMSGHDR.size + len(cn_msg),_NLMSG_DONE,0,0,os.getpid())
+        sock.send(header + cn_msg)
+
+    def __scan_proc(self,recheck:bool=True):
+        # Only new processes are matched, known processes are looked up.
+        seen = set()
+        try:
+            entries = list(os.scandir("/proc"))
+        except OSError as ex:
+            logger.error("Unable to scan /proc! ({error})".format(error=str(ex)))
+            return
+        for entry in entries:
+            if not entry.name.isdigit():
+                continue
+            pid = int(entry.name)
+            seen.add(pid)
+            if pid not in self.__processes:
+                self.__process_started(pid,recheck)
+
+        for pid in [pid for pid in self.__processes.keys() if pid not in seen]:
+            self.__process_exited(pid)
+
+    def __process_started(self,pid:int,recheck:bool=True):
+        self.__rechecks.pop(pid,None)
+        game = self.__matcher.match_pid(pid)
+        if game is None:
+            self.__processes[pid] = None
+            if recheck:
+                self.__rechecks[pid] = (time.monotonic() + RECHECK_DELAYS[0],0)
+            return
+        self.__add_game_process(pid,game)
+
+    def __add_game_process(self,pid:int,game:Game):
+        self.__processes[pid] = game.key
+        pids = self.__running_games.setdefault(game.key,set())
+        pids.add(pid)
+        if len(pids) == 1:
+            GLib.idle_add(self.__emit,'game-started',game)
+
+    def __recheck_processes(self):
+        now = time.monotonic()
+        for pid,(due,n) in list(self.__rechecks.items()):
+            if due > now:
+                continue
+            game = self.__matcher.match_pid(pid)
+            if game is not None:
+                del self.__rechecks[pid]
+                self.__add_game_process(pid,game)
+            elif n + 1 < len(RECHECK_DELAYS):
+                self.__rechecks[pid] = (due - RECHECK_DELAYS[n] + RECHECK_DELAYS[n + 1],n + 1)
+            else:
+                del self.__rechecks[pid]
+
+    def __get_next_recheck(self)->float|None:
+        if not self.__rechecks:
+            return None
+        return min(due for due,n in self.__rechecks.values())
+
+    def __process_exited(self,pid:int):
+        self.__rechecks.pop(pid,None)
+        key = self.__processes.pop(pid,None)
+        if key is None or key not in self.__running_games:
+            return
+        pids = self.__running_games[key]
+        pids.discard(pid)
+        if not pids:
+            del self.__running_games[key]
+            game = GameManager.get_global().games.get(key,None)
+            if game is not None:
+                GLib.idle_add(self.__emit,'game-exited',game)
+
+    def __emit(self,signal:str,game:Game):
+        self.emit(signal,game)
+        return False
+
+    def __read_netlink(self,sock:socket.socket):
+        try:
+            data = sock.recv(4096)
+        except socket.timeout:
+            return
+        except OSError as ex:
+            # ENOBUFS if events were dropped, the scan catches up.
+            logger.debug("Reading from the netlink socket failed! ({error})".format(error=str(ex)))
+            self.__scan_proc()
+            return
+        offset = 0
+        while offset + _NLMSGHDR.size <= len(data):
+            msg_len = _NLMSGHDR.unpack_from(data,offset)[0]
+            if msg_len < _NLMSGHDR.size:
+                break
+            event_offset = offset + _NLMSGHDR.size + _CN_MSG.size
+            if event_offset + _PROC_EVENT_HEADER.size + _PROC_EVENT_PID.size <= offset + msg_len:
+                what = _PROC_EVENT_HEADER.unpack_from(data,event_offset)[0]
+                pid,tgid = _PROC_EVENT_PID.unpack_from(data,event_offset + _PROC_EVENT_HEADER.size)
+                # only the main threads of the processes are of interest
+                if pid == tgid:
+                    if what == _PROC_EVENT_EXEC:
+                        self.__processes.pop(pid,None)
+                        self.__process_started(pid)
+                    elif what == _PROC_EVENT_EXIT:
+                        self.__process_exited(pid)
+            offset += (msg_len + 3) & ~3
+
+    def __thread_func(self,sock:socket.socket|None):
+        if not self.__matcher:
+            logger.warning("No game has a binary or installdir to match processes against!")
+
+        # The initial scan finds the games that are already running, their
+        # argv is final.
+        self.__scan_proc(False)
+        next_scan = time.monotonic() + self.__poll_interval
+        try:
+            while not self.__stop_event.is_set():
+                if sock is not None:
+                    self.__read_netlink(sock)
+                else:
+                    wakeup = next_scan
+                    next_recheck = self.__get_next_recheck()
+                    if next_recheck is not None:
+                        wakeup = min(wakeup,next_recheck)
+                    if self.__stop_event.wait(max(wakeup - time.monotonic(),0.0)):
+                        break
+                    if time.monotonic() >= next_scan:
+                        self.__scan_proc()
+                        next_scan = time.monotonic() + self.__poll_interval
+                self.__recheck_processes()
+        finally:
+            if sock is not None:
+                try:
+                    self.__send_netlink_op(sock,_PROC_CN_MCAST_IGNORE)
+                except OSError:
+                    pass
+                sock.close()
+
+    @Signal(name="game-started",return_type=None,arg_types=(Game,),flags=SignalFlags.RUN_FIRST)
+    def do_game_started(self,game:Game):
+        logger.info("{game} started.".format(game=game.key))
+
+    @Signal(name="game-exited",return_type=None,arg_types=(Game,),flags=SignalFlags.RUN_FIRST)
+    def do_game_exited(self,game:Game):
+        logger.info("{game} exited.".format(game=game.key))
@@ -0,0 +1,304 @@
+###############################################################################
+# sgbackup - The SaveGame Backup tool                                         #
+#    Copyright (C) 2024,2025  Christian Moser                                 #
+#                                                                             #
+#    This program is free software: you can redistribute it and/or modify     #
+#    it under the terms of the GNU General Public License as published by     #
+#    the Free Software Foundation, either version 3 of the License, or        #
+#    (at your option) any later version.                                      #
+#                                                                             #
+#    This program is distributed in the hope that it will be useful,          #
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of           #
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the            #
+#    GNU General Public License for more details.                             #
+#                                                                             #
+#    You should have received a copy of the GNU General Public License        #
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.   #
+###############################################################################
+
+"""
+Opt-in profiling of the slow code paths.
+
+Profiling is enabled with the environment variable `SGBACKUP_PROFILE` or the
+`mode` key of the `[profiling]` settings group. The value is a comma
+separated list of modes:
+
++ **timing** - Writes the wall and CPU time of each profiled call to
+  `<run>.timing.jsonl`.
++ **cprofile** - Collects `cProfile` statistics per profiled section and
+  writes them to `<run>.<section>.prof` on exit. The files can be read with
+  `python -m pstats` or *snakeviz*.
++ **tracemalloc** - Traces the memory allocations. The memory growth and peak
+  of each call are added to the timing records and a snapshot is written to
+  `<run>.tracemalloc` on exit.
+
+The files are written to `SGBACKUP_PROFILE_DIR`, the `directory` key of the
+`[profiling]` settings group or `profiles` in the config directory. `<run>`
+is the start time and the pid of the process.
+
+Code is profiled with the `profiled` decorator or the `profile` context
+manager. If profiling is disabled they cost a single attribute lookup.
+"""
+
+import os
+import json
+import time
+import atexit
+import datetime
+import threading
+import functools
+from contextlib import contextmanager
+
+from .settings import settings
+
+import logging
+logger = logging.getLogger(__name__)
+
+PROFILE_ENV = "SGBACKUP_PROFILE"
+PROFILE_DIR_ENV = "SGBACKUP_PROFILE_DIR"
+
+MODES = ('timing','cprofile','tracemalloc')
+
+class Profiler(object):
+    """
+    Profiler Collects the profiles of the current process.
+
+    The timing of every section is recorded, nested sections included. The
+    records have a *depth*, `0` for the outermost section of a thread, so
+    reports can avoid counting nested times twice. Only one `cProfile`
+    profiler can be active in a process, so it only profiles the outermost
+    section of one thread at a time. Sections running meanwhile in other
+    threads are only timed.
+
+    The profile directory is created when the first file is written. Errors
+    writing the profiles are logged and never reach the profiled code.
+    """
+    __global_profiler = None
+
+    @staticmethod
+    def get_global()->"Profiler":
+        if Profiler.__global_profiler is None:
+            Profiler.__global_profiler = Profiler()
+        return Profiler.__global_profiler
+
+    def __init__(self,modes:list[str]|None=None,directory:str|None=None):
+        if modes is None:
+            value = os.environ.get(PROFILE_ENV,None)
+            if value is None:
+                value = settings.profiling_mode
+            modes = [mode.strip().lower() for mode in value.split(',') if mode.strip()]
+        for mode in modes:
+            if mode not in MODES:
+                logger.warning("Unknown profiling mode \"{mode}\"!".format(mode=mode))
+        self.__modes = frozenset(mode for mode in modes if mode in MODES)
+
+        if directory is None:
+            directory = os.environ.get(PROFILE_DIR_ENV,None)
+        if not directory:
+            directory = settings.profiling_dir
+        self.__directory = directory
+        self.__run_id = "{time}-{pid}".format(
+            time=datetime.datetime.now().strftime("%Y%m%d-%H%M%S"),
+            pid=os.getpid())
+
+        self.__mutex = threading.Lock()
+        self.__thread_data = threading.local()
+        # The thread running the cProfile profiler.
+        self.__cprofile_thread = None
+        self.__stats = {}
+        self.__timing_file = None
+        # None until the directory was created or creating it failed
+        self.__directory_created = None
+
+        if self.__modes:
+            if 'tracemalloc' in self.__modes:
+                import tracemalloc
+                tracemalloc.start()
+            atexit.register(self.write)
+            logger.info("Profiling ({modes}) to \"{directory}\".".format(
+                modes=",".join(sorted(self.__modes)),
+                directory=self.__directory))
+
+    @property
+    def enabled(self)->bool:
+        return bool(self.__modes)
+
+    @property
+    def modes(self)->frozenset[str]:
+        return self.__modes
+
+    @property
+    def directory(self)->str:
+        return self.__directory
+
+    @property
+    def run_id(self)->str:
+        return self.__run_id
+
+    def get_filename(self,suffix:str)->str:
+        """
+        get_filename Get the path of a profile file of this run.
+
+        :param suffix: The part of the filename after the run id.
+        :type suffix: str
+        :rtype: str
+        """
+        return os.path.join(self.__directory,"{run}.{suffix}".format(run=self.__run_id,suffix=suffix))
+
+    @contextmanager
+    def profile(self,name:str):
+        """
+        profile Profile a section of code.
+
+        :param name: The name of the section, for example `"game.load"`.
+        :type name: str
+        """
+        if not self.__modes:
+            yield
+            return
+
+        depth = getattr(self.__thread_data,'depth',0)
+        self.__thread_data.depth = depth + 1
+        profile = None
+        if 'cprofile' in self.__modes and depth == 0:
+            profile = self.__acquire_cprofile()
+        if 'tracemalloc' in self.__modes:
+            import tracemalloc
+            memory_start = tracemalloc.get_traced_memory()[0]
+        wall_start = time.monotonic()
+        cpu_start = time.thread_time()
+        if profile is not None:
+            try:
+                profile.enable()
+            except ValueError as ex:
+                # another profiling tool is active
+                logger.warning("Unable to enable cProfile for \"{name}\"! ({error})".format(
+                    name=name,
+                    error=str(ex)))
+                self.__release_cprofile()
+                profile = None
+        try:
+            yield
+        finally:
+            if profile is not None:
+                profile.disable()
+                self.__release_cprofile()
+            record = {
+                'name':name,
+                'thread':threading.current_thread().name,
+                'depth':depth,
+                'timestamp':time.time(),
+                'wall_time':time.monotonic() - wall_start,
+                'cpu_time':time.thread_time() - cpu_start,
+            }
+            if 'tracemalloc' in self.__modes:
+                current,peak = tracemalloc.get_traced_memory()
+                record['memory_growth'] = current - memory_start
+                record['memory_peak'] = peak
+            self.__thread_data.depth = depth
+            self.__add(name,record,profile)
+
+    def __acquire_cprofile(self):
+        with self.__mutex:
+            if self.__cprofile_thread is not None:
+                return None
+            self.__cprofile_thread = threading.get_ident()
+        import cProfile
+        return cProfile.Profile()
+
+    def __release_cprofile(self):
+        with self.__mutex:
+            if self.__cprofile_thread == threading.get_ident():
+                self.__cprofile_thread = None
+
+    def __create_directory(self)->bool:
+        # needs to be called with the mutex held
+        if self.__directory_created is None:
+            try:
+                os.makedirs(self.__directory,exist_ok=True)
+                self.__directory_created = True
+            except OSError as ex:
+                logger.warning("Unable to create the profile directory \"{directory}\"! ({error})".format(
+                    directory=self.__directory,
+                    error=str(ex)))
+                self.__directory_created = False
+        return self.__directory_created
+
+    def __add(self,name:str,record:dict,profile):
+        with self.__mutex:
+            if profile is not None:
+                import pstats
+                if name in self.__stats:
+                    self.__stats[name].add(profile)
+                else:
+                    self.__stats[name] = pstats.Stats(profile)
+            if 'timing' in self.__modes or 'tracemalloc' in self.__modes:
+                try:
+                    if self.__timing_file is None:
+                        if not self.__create_directory():
+                            return
+                        self.__timing_file = open(self.get_filename("timing.jsonl"),'a',encoding="utf-8")
+                    self.__timing_file.write(json.dumps(record) + "\n")
+                    self.__timing_file.flush()
+                except OSError as ex:
+                    logger.warning("Unable to write timing record! ({error})".format(error=str(ex)))
+
+    def write(self):
+        """
+        write Write the collected `cProfile` statistics and the
+        `tracemalloc` snapshot.
+
+        It is called on exit, but can be called earlier to look at a running
+        process (the GUI or the daemon).
+        """
+        if not self.__modes:
+            return
+        with self.__mutex:
+            if not self.__create_directory():
+                return
+            try:
+                for name,stats in self.__stats.items():
+                    stats.dump_stats(self.get_filename("{name}.prof".format(name=name)))
+                if 'tracemalloc' in self.__modes:
+                    import tracemalloc
+                    if tracemalloc.is_tracing():
+                        tracemalloc.take_snapshot().dump(self.get_filename("tracemalloc"))
+                if self.__timing_file is not None:
+                    self.__timing_file.flush()
+            except OSError as ex:
+                logger.warning("Unable to write profiles to \"{directory}\"! ({error})".format(
+                    directory=self.__directory,
+                    error=str(ex)))
+
+def profile(name:str):
+    """
+    profile Profile a section of code with the global `Profiler`.
+
+    Usage:
+
+        with profile("archiver.backup"):
+            ...
+
+    :param name: The name of the section.
+    :type name: str
+    """
+    return Profiler.get_global().profile(name)
+
+def profiled(name:str):
+    """
+    profiled Decorator that profiles every call of a function with the
+    global `Profiler`.
+
+    :param name: The name of the section.
+    :type name: str
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args,**kwargs):
+            profiler = Profiler.get_global()
+            if not profiler.enabled:
+                return func(*args,**kwargs)
+            with profiler.profile(name):
+                return func(*args,**kwargs)
+        return wrapper
+    return decorator
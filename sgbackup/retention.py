@@ -0,0 +1,390 @@
+###############################################################################
+# sgbackup - The SaveGame Backup tool                                         #
+#    Copyright (C) 2024,2025  Christian Moser                                 #
+#                                                                             #
+#    This program is free software: you can redistribute it and/or modify     #
+#    it under the terms of the GNU General Public License as published by     #
+#    the Free Software Foundation, either version 3 of the License, or        #
+#    (at your option) any later version.                                      #
+#                                                                             #
+#    This program is distributed in the hope that it will be useful,          #
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of           #
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the            #
+#    GNU General Public License for more details.                             #
+#                                                                             #
+#    You should have received a copy of the GNU General Public License        #
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.   #
+###############################################################################
+
+from gi.repository import GLib
+from gi.repository.GObject import GObject,Signal,SignalFlags,Property
+
+import os
+import time
+import atexit
+import datetime
+import threading
+
+from .game import Game
+from .settings import settings
+from .archiver import ArchiverManager,BackupInfo
+from .metrics import PruneMetrics,MetricsLog
+
+import logging
+logger = logging.getLogger(__name__)
+
+# The seconds the pruning job waits for more games before it starts, so the
+# games of a `backup_many()` call are pruned in one batch.
+PRUNE_DELAY = 2.0
+
+def _hour_key(dt:datetime.datetime):
+    return (dt.year,dt.month,dt.day,dt.hour)
+
+def _day_key(dt:datetime.datetime):
+    return (dt.year,dt.month,dt.day)
+
+def _week_key(dt:datetime.datetime):
+    iso = dt.isocalendar()
+    return (iso[0],iso[1])
+
+def _month_key(dt:datetime.datetime):
+    return (dt.year,dt.month)
+
+class RetentionPolicy(object):
+    """
+    RetentionPolicy A grandfather-father-son retention policy.
+
+    A backup is kept if it is one of the *last* newest backups or the newest
+    backup of one of the *hourly* newest hours, the *daily* newest days, the
+    *weekly* newest ISO weeks or the *monthly* newest months that have
+    backups. All other backups expire. If all counts are `0` nothing expires.
+    """
+    def __init__(self,last:int=0,hourly:int=0,daily:int=0,weekly:int=0,monthly:int=0):
+        self.last = last
+        self.hourly = hourly
+        self.daily = daily
+        self.weekly = weekly
+        self.monthly = monthly
+
+    @staticmethod
+    def new_from_settings()->"RetentionPolicy":
+        """
+        new_from_settings Create the policy configured in the settings.
+
+        `settings.backup_versions` is the number of newest backups to keep.
+
+        :rtype: RetentionPolicy
+        """
+        return RetentionPolicy(settings.backup_versions,
+                               settings.retention_hourly,
+                               settings.retention_daily,
+                               settings.retention_weekly,
+                               settings.retention_monthly)
+
+    @property
+    def is_enabled(self)->bool:
+        return (self.last > 0 or self.hourly > 0 or self.daily > 0
+                or self.weekly > 0 or self.monthly > 0)
+
+    def select(self,infos:list[BackupInfo])->tuple[list[BackupInfo],list[BackupInfo]]:
+        """
+        select Split backups into the backups to keep and the expired backups.
+
+        :param infos: The backups of one game.
+        :type infos: list[BackupInfo]
+        :return: The kept and the expired backups, newest first.
+        :rtype: tuple[list[BackupInfo],list[BackupInfo]]
+        """
+        ordered = sorted(infos,key=lambda info: (info.timestamp,info.filename),reverse=True)
+        if not self.is_enabled:
+            return ordered,[]
+
+        keep = set(info.filename for info in ordered[:self.last])
+        for count,period_key in ((self.hourly,_hour_key),
+                                 (self.daily,_day_key),
+                                 (self.weekly,_week_key),
+                                 (self.monthly,_month_key)):
+            if count <= 0:
+                continue
+            periods = set()
+            for info in ordered:
+                period = period_key(info.timestamp)
+                if period in periods:
+                    continue
+                periods.add(period)
+                keep.add(info.filename)
+                if len(periods) >= count:
+                    break
+
+        return ([info for info in ordered if info.filename in keep],
+                [info for info in ordered if info.filename not in keep])
+
+class BackupIndex(object):
+    """
+    BackupIndex An in-memory index of the live backups of the games.
+
+    A backup directory is scanned when it is first used and whenever its
+    mtime changed since, so backups added or deleted by other processes are
+    seen. Backups added or removed through the index update it and its
+    mtime, so the retention policy is computed without listing the
+    directory again.
+    """
+    def __init__(self):
+        self.__mutex = threading.Lock()
+        self.__directories = {}
+
+    @staticmethod
+    def get_directory(game:Game)->str:
+        """
+        get_directory Get the directory of the live backups of a game.
+
+        :param game: The game.
+        :type game: Game
+        :rtype: str
+        """
+        return os.path.join(settings.backup_dir,game.savegame_name,game.savegame_type.value,'live')
+
+    @staticmethod
+    def __get_mtime(directory:str)->int|None:
+        try:
+            return os.stat(directory).st_mtime_ns
+        except OSError:
+            return None
+
+    def __scan(self,directory:str)->dict[str:BackupInfo]:
+        am = ArchiverManager.get_global()
+        archivers = list(am.archivers.values())
+        ret = {}
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            return ret
+        for entry in entries:
+            try:
+                if not entry.is_file() or not any(a.has_extension(entry.name) for a in archivers):
+                    continue
+                ret[entry.path] = BackupInfo.new_from_direntry(entry)
+            except OSError:
+                continue
+        return ret
+
+    def get(self,game:Game)->list[BackupInfo]:
+        """
+        get Get the live backups of a game.
+
+        :param game: The game.
+        :type game: Game
+        :rtype: list[BackupInfo]
+        """
+        directory = self.get_directory(game)
+        # The mtime is read before the scan, so changes during the scan
+        # cause another scan next time.
+        mtime = self.__get_mtime(directory)
+        with self.__mutex:
+            cached = self.__directories.get(directory,None)
+            if cached is not None and mtime is not None and cached[0] == mtime:
+                return list(cached[1].values())
+        entries = self.__scan(directory)
+        with self.__mutex:
+            self.__directories[directory] = (mtime,entries)
+            return list(entries.values())
+
+    def __update_mtime(self,directory:str):
+        # needs to be called with the mutex held
+        # The change of the directory is our own. A backup written by another
+        # process at the same time is missed until the next change, which
+        # only makes the policy keep more backups.
+        cached = self.__directories.get(directory,None)
+        if cached is not None:
+            self.__directories[directory] = (self.__get_mtime(directory),cached[1])
+
+    def add(self,filename:str):
+        """
+        add Add a new backup to the index.
+
+        Backups in directories that were not scanned yet are ignored, they
+        are found by the scan.
+
+        :param filename: The backup file.
+        :type filename: str
+        """
+        directory = os.path.dirname(filename)
+        with self.__mutex:
+            cached = self.__directories.get(directory,None)
+            if cached is None:
+                return
+            try:
+                cached[1][filename] = BackupInfo.new_from_file(filename)
+            except OSError:
+                cached[1].pop(filename,None)
+            self.__update_mtime(directory)
+
+    def remove(self,filename:str):
+        directory = os.path.dirname(filename)
+        with self.__mutex:
+            cached = self.__directories.get(directory,None)
+            if cached is not None:
+                cached[1].pop(filename,None)
+                self.__update_mtime(directory)
+
+    def clear(self):
+        with self.__mutex:
+            self.__directories = {}
+
+class RetentionManager(GObject):
+    """
+    RetentionManager Applies the `RetentionPolicy` to the live backups.
+
+    `ArchiverManager.backup()` reports new backups with `backup_added()`.
+    The games are pruned in batches by a background thread after
+    `PRUNE_DELAY` seconds. Pending games are pruned on exit, so short lived
+    CLI processes prune their backups too.
+
+    *backups-pruned* is emitted in the main loop.
+    """
+    __global_retention_manager = None
+
+    @staticmethod
+    def get_global()->"RetentionManager":
+        if RetentionManager.__global_retention_manager is None:
+            RetentionManager.__global_retention_manager = RetentionManager()
+        return RetentionManager.__global_retention_manager
+
+    def __init__(self):
+        GObject.__init__(self)
+        self.__index = BackupIndex()
+        self.__condition = threading.Condition()
+        self.__prune_mutex = threading.Lock()
+        self.__pending = {}
+        self.__thread = None
+        ArchiverManager.get_global().connect('remove-backup',self._on_archiver_manager_remove_backup)
+
+    @property
+    def index(self)->BackupIndex:
+        return self.__index
+
+    @property
+    def policy(self)->RetentionPolicy:
+        """
+        policy The policy configured in the settings.
+
+        :type: RetentionPolicy
+        """
+        return RetentionPolicy.new_from_settings()
+
+    @Property(type=int,default=0)
+    def n_pending(self)->int:
+        with self.__condition:
+            return len(self.__pending)
+
+    def backup_added(self,game:Game,filename:str|None):
+        """
+        backup_added Add a new backup to the index and schedule the game for
+        pruning.
+
+        :param game: The game that was backed up.
+        :type game: Game
+        :param filename: The new backup file.
+        :type filename: str|None
+        """
+        if filename:
+            self.__index.add(filename)
+        self.schedule(game)
+
+    def schedule(self,game:Game):
+        """
+        schedule Prune the live backups of a game in the background.
+
+        :param game: The game to prune.
+        :type game: Game
+        """
+        if not game.is_live or not self.policy.is_enabled:
+            return
+        with self.__condition:
+            self.__pending[game.key] = game
+            if self.__thread is None:
+                self.__thread = threading.Thread(target=self.__thread_func,daemon=True)
+                self.__thread.start()
+                atexit.register(self.flush)
+            self.__condition.notify()
+
+    def flush(self):
+        """
+        flush Prune the pending games in the calling thread.
+        """
+        with self.__condition:
+            games = list(self.__pending.values())
+            self.__pending = {}
+        if games:
+            self.prune(games)
+
+    def prune(self,games:list[Game])->dict[str:list[str]]:
+        """
+        prune Delete the expired live backups of games.
+
+        :param games: The games to prune.
+        :type games: list[Game]
+        :return: A dict mapping the game keys to the deleted files.
+        :rtype: dict[str:list[str]]
+        """
+        policy = self.policy
+        removed = {}
+        if not policy.is_enabled:
+            return removed
+
+        start = time.monotonic()
+        with self.__prune_mutex:
+            for game in games:
+                keep,expired = policy.select(self.__index.get(game))
+                files = []
+                for info in expired:
+                    try:
+                        os.unlink(info.filename)
+                    except FileNotFoundError:
+                        pass
+                    except OSError as ex:
+                        logger.error("Unable to remove backup \"{filename}\"! ({error})".format(
+                            filename=info.filename,
+                            error=str(ex)))
+                        continue
+                    self.__index.remove(info.filename)
+                    files.append(info.filename)
+                if files:
+                    removed[game.key] = files
+                    GLib.idle_add(self.__emit_backups_pruned,game,files)
+
+        metrics = PruneMetrics(len(games))
+        metrics.removed = sum(len(files) for files in removed.values())
+        metrics.total_time = time.monotonic() - start
+        if settings.metrics_enabled:
+            MetricsLog.get_global().write(metrics.to_dict())
+        logger.debug("Pruned {n} backups of {games} games in {seconds:.3f}s".format(
+            n=metrics.removed,
+            games=metrics.games,
+            seconds=metrics.total_time))
+        return removed
+
+    def __thread_func(self):
+        while True:
+            with self.__condition:
+                while not self.__pending:
+                    self.__condition.wait()
+            # collect the other games of the batch
+            time.sleep(PRUNE_DELAY)
+            try:
+                self.flush()
+            except Exception as ex:
+                # keep the thread running, the games are pruned again after
+                # their next backup
+                logger.error("Pruning backups failed! ({error})".format(error=str(ex)))
+
+    def __emit_backups_pruned(self,game:Game,files:list[str]):
+        self.emit('backups-pruned',game,files)
+        return False
+
+    def _on_archiver_manager_remove_backup(self,am,game,filename):
+        self.__index.remove(filename)
+
+    @Signal(name="backups-pruned",return_type=None,arg_types=(Game,object),flags=SignalFlags.RUN_FIRST)
+    def do_backups_pruned(self,game:Game,files:list[str]):
+        logger.info("Removed {n} expired backups of {game}.".format(n=len(files),game=game.key))
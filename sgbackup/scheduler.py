@@ -0,0 +1,301 @@
+###############################################################################
+# sgbackup - The SaveGame Backup tool                                         #
+#    Copyright (C) 2024,2025  Christian Moser                                 #
+#                                                                             #
+#    This program is free software: you can redistribute it and/or modify     #
+#    it under the terms of the GNU General Public License as published by     #
+#    the Free Software Foundation, either version 3 of the License, or        #
+#    (at your option) any later version.                                      #
+#                                                                             #
+#    This program is distributed in the hope that it will be useful,          #
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of           #
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the            #
+#    GNU General Public License for more details.                             #
+#                                                                             #
+#    You should have received a copy of the GNU General Public License        #
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.   #
+###############################################################################
+
+from gi.repository.GObject import GObject,Signal,SignalFlags,Property
+
+import time
+import heapq
+import random
+import threading
+
+from .game import Game,GameManager
+from .settings import settings
+from .archiver import ArchiverManager
+from .throttle import Throttle
+
+import logging
+logger = logging.getLogger(__name__)
+
+# The delay before a batch is retried when another backup is in progress.
+RETRY_INTERVAL = 30.0
+
+class BackupScheduler(GObject):
+    """
+    BackupScheduler Runs the backups of active live games periodically.
+
+    The due time of each game is kept in a heap. When games become due, all
+    due games are backed up with `ArchiverManager.backup_many()`, most overdue
+    first and with at most `settings.scheduler_max_jobs` concurrent jobs. The
+    next due time of a game is its backup time plus its interval
+    (`Game.backup_interval` or `settings.scheduler_interval`) plus a random
+    jitter of up to `settings.scheduler_jitter` seconds, so games that were
+    backed up together drift apart.
+
+    On start the due times are computed from the newest existing backup of
+    each game and get a jitter too. Overdue games and games that were never
+    backed up are spread over the next `settings.scheduler_jitter` seconds
+    instead of being backed up at once. The scheduler runs in its own thread and does not need a main
+    loop. The signals are emitted from the scheduler thread.
+    """
+    __global_scheduler = None
+
+    @staticmethod
+    def get_global()->"BackupScheduler":
+        if BackupScheduler.__global_scheduler is None:
+            BackupScheduler.__global_scheduler = BackupScheduler()
+        return BackupScheduler.__global_scheduler
+
+    def __init__(self):
+        GObject.__init__(self)
+        self.__condition = threading.Condition()
+        self.__heap = []
+        self.__due = {}
+        self.__new_games = []
+        self.__thread = None
+        self.__running = False
+        self.__gm_signals = []
+
+    @Property(type=bool,default=False)
+    def is_running(self)->bool:
+        return self.__running
+
+    def get_interval(self,game:Game)->int:
+        """
+        get_interval Get the backup interval of a game.
+
+        :param game: The game.
+        :type game: Game
+        :return: The interval in seconds.
+        :rtype: int
+        """
+        if game.backup_interval > 0:
+            return game.backup_interval
+        return settings.scheduler_interval
+
+    def get_due_times(self)->list[tuple[float,str]]:
+        """
+        get_due_times Get the scheduled games.
+
+        :return: A list of `(due_time,key)` tuples sorted by the due time.
+            The due times are UNIX timestamps.
+        :rtype: list[tuple[float,str]]
+        """
+        with self.__condition:
+            return sorted((due,key) for key,due in self.__due.items())
+
+    def schedule(self,game:Game,due:float|None=None):
+        """
+        schedule Schedule the next backup of a game.
+
+        :param game: The game to schedule.
+        :type game: Game
+        :param due: The due time as UNIX timestamp. If `None`, the game is
+            scheduled one interval (plus jitter) from now.
+        :type due: float|None
+        """
+        if due is None:
+            due = time.time() + self.get_interval(game) + random.uniform(0.0,settings.scheduler_jitter)
+        with self.__condition:
+            self.__due[game.key] = due
+            heapq.heappush(self.__heap,(due,game.key))
+            self.__condition.notify()
+
+    def unschedule(self,key:str):
+        """
+        unschedule Remove a game from the schedule.
+
+        :param key: The key of the game.
+        :type key: str
+        """
+        with self.__condition:
+            # The heap entry is skipped when it is popped.
+            self.__due.pop(key,None)
+
+    def get_next_due_time(self,game:Game)->float:
+        """
+        get_next_due_time Compute the due time of a game from its newest backup.
+
+        The backup directory is read without opening the archives.
+
+        :param game: The game.
+        :type game: Game
+        :return: The due time as UNIX timestamp, `0.0` if the game was never
+            backed up.
+        :rtype: float
+        """
+        last = None
+        for info in ArchiverManager.get_global().iter_backup_infos(game,validate=False):
+            timestamp = info.timestamp.timestamp()
+            if last is None or timestamp > last:
+                last = timestamp
+        if last is None:
+            return 0.0
+        return last + self.get_interval(game)
+
+    def get_initial_due_time(self,game:Game,now:float|None=None)->float:
+        """
+        get_initial_due_time Compute the first due time of a game after the
+        scheduler started.
+
+        A random jitter is added to the due time from `get_next_due_time()`.
+        Overdue games are due within the jitter from *now*.
+
+        :param game: The game.
+        :type game: Game
+        :param now: The current time as UNIX timestamp. If `None`,
+            `time.time()` is used.
+        :type now: float|None
+        :return: The due time as UNIX timestamp.
+        :rtype: float
+        """
+        if now is None:
+            now = time.time()
+        return max(self.get_next_due_time(game),now) + random.uniform(0.0,settings.scheduler_jitter)
+
+    def start(self):
+        """
+        start Start the scheduler thread.
+        """
+        with self.__condition:
+            if self.__running:
+                return
+            self.__running = True
+
+        gm = GameManager.get_global()
+        self.__gm_signals = [
+            gm.connect('game-added',self._on_gamemanager_game_added),
+            gm.connect('game-removed',self._on_gamemanager_game_removed),
+            gm.connect('games-cleared',self._on_gamemanager_games_cleared),
+        ]
+        with self.__condition:
+            self.__heap = []
+            self.__due = {}
+            self.__new_games = [game for game in gm.games.values() if game.is_active and game.is_live]
+        self.__thread = threading.Thread(target=self.__thread_func,daemon=True)
+        self.__thread.start()
+        self.notify('is-running')
+
+    def stop(self,wait:bool=True):
+        """
+        stop Stop the scheduler thread.
+
+        A running batch of backups is finished first.
+
+        :param wait: Wait for the thread to exit.
+        :type wait: bool
+        """
+        with self.__condition:
+            if not self.__running:
+                return
+            self.__running = False
+            self.__condition.notify()
+
+        gm = GameManager.get_global()
+        for signal_id in self.__gm_signals:
+            gm.disconnect(signal_id)
+        self.__gm_signals = []
+
+        if wait and self.__thread is not None and self.__thread is not threading.current_thread():
+            self.__thread.join()
+        self.__thread = None
+        self.notify('is-running')
+
+    def __pop_due_games(self,now:float)->list[Game]:
+        # needs to be called with the condition held
+        games = GameManager.get_global().games
+        ret = []
+        while self.__heap and self.__heap[0][0] <= now:
+            due,key = heapq.heappop(self.__heap)
+            if self.__due.get(key,None) != due:
+                # stale entry
+                continue
+            del self.__due[key]
+            if key in games:
+                ret.append(games[key])
+        return ret
+
+    def __thread_func(self):
+        while True:
+            with self.__condition:
+                while self.__running and not self.__new_games:
+                    now = time.time()
+                    if self.__heap and self.__heap[0][0] <= now:
+                        break
+                    timeout = (self.__heap[0][0] - now) if self.__heap else None
+                    self.__condition.wait(timeout)
+                if not self.__running:
+                    return
+                new_games = self.__new_games
+                self.__new_games = []
+                
+            # Reading the backup directories may be slow, so it is done
+            # without holding the lock.
+            if new_games:
+                for game in new_games:
+                    self.schedule(game,self.get_initial_due_time(game))
+                continue
+            
+            with self.__condition:
+                due_games = self.__pop_due_games(time.time())
+            if due_games:
+                self.__run_batch(due_games)
+
+    def __run_batch(self,games:list[Game]):
+        self.emit('batch-started',[game.key for game in games])
+        am = ArchiverManager.get_global()
+        try:
+            with Throttle.get_global().background():
+                results = am.backup_many(games,settings.scheduler_max_jobs)
+        except RuntimeError as ex:
+            # another backup is in progress
+            logger.info("Postponing scheduled backups! ({error})".format(error=str(ex)))
+            due = time.time() + RETRY_INTERVAL
+            for game in games:
+                self.schedule(game,due)
+            return
+
+        for game in games:
+            if game.is_active and game.is_live:
+                self.schedule(game)
+        self.emit('batch-finished',results)
+
+    def _on_gamemanager_game_added(self,gm,game):
+        if not game.is_active or not game.is_live:
+            self.unschedule(game.key)
+            return
+        with self.__condition:
+            if game.key not in self.__due:
+                self.__new_games.append(game)
+                self.__condition.notify()
+
+    def _on_gamemanager_game_removed(self,gm,game,key):
+        self.unschedule(key)
+
+    def _on_gamemanager_games_cleared(self,gm):
+        with self.__condition:
+            self.__due = {}
+            self.__heap = []
+            self.__new_games = []
+
+    @Signal(name="batch-started",return_type=None,arg_types=(object,),flags=SignalFlags.RUN_FIRST)
+    def do_batch_started(self,keys:list[str]):
+        logger.info("Running scheduled backups of {games}".format(games=", ".join(keys)))
+
+    @Signal(name="batch-finished",return_type=None,arg_types=(object,),flags=SignalFlags.RUN_FIRST)
+    def do_batch_finished(self,results:dict[str:bool]):
+        pass
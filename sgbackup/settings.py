@@ -344,6 +344,89 @@ class Settings(GObject.GObject):
             max_threads = 1
         self.set_integer('sgbackup','maxBackupThreads',max_threads)
         
+    @GObject.Property(type=bool,default=False)
+    def scheduler_enabled(self)->bool:
+        return self.get_boolean('scheduler','enabled',False)
+    
+    @scheduler_enabled.setter
+    def scheduler_enabled(self,enabled:bool):
+        self.set_boolean('scheduler','enabled',bool(enabled))
+        
+    @GObject.Property(type=int)
+    def scheduler_interval(self)->int:
+        return self.get_integer('scheduler','interval',3600)
+    
+    @scheduler_interval.setter
+    def scheduler_interval(self,seconds:int):
+        self.set_integer('scheduler','interval',max(int(seconds),60))
+        
+    @GObject.Property(type=int)
+    def scheduler_jitter(self)->int:
+        return self.get_integer('scheduler','jitter',300)
+    
+    @scheduler_jitter.setter
+    def scheduler_jitter(self,seconds:int):
+        self.set_integer('scheduler','jitter',max(int(seconds),0))
+        
+    @GObject.Property(type=int)
+    def scheduler_max_jobs(self)->int:
+        max_jobs = self.get_integer('scheduler','maxJobs',0)
+        if max_jobs < 1:
+            return self.backup_threads
+        return max_jobs
+    
+    @scheduler_max_jobs.setter
+    def scheduler_max_jobs(self,max_jobs:int):
+        self.set_integer('scheduler','maxJobs',max(int(max_jobs),0))
+        
+    @GObject.Property(type=float)
+    def watch_quiet_period(self)->float:
+        return self.get_double('watch','quietPeriod',10.0)
+    
+    @watch_quiet_period.setter
+    def watch_quiet_period(self,seconds:float):
+        self.set_double('watch','quietPeriod',max(float(seconds),0.0))
+
+    @GObject.Property(type=bool,default=True)
+    def metrics_enabled(self)->bool:
+        return self.get_boolean('metrics','enabled',True)
+
+    @metrics_enabled.setter
+    def metrics_enabled(self,enabled:bool):
+        self.set_boolean('metrics','enabled',enabled)
+
+    @GObject.Property(type=int)
+    def metrics_max_size(self)->int:
+        return self.get_integer('metrics','maxSize',1048576)
+
+    @metrics_max_size.setter
+    def metrics_max_size(self,size:int):
+        self.set_integer('metrics','maxSize',max(int(size),0))
+
+    @GObject.Property(type=int)
+    def metrics_keep(self)->int:
+        return self.get_integer('metrics','keep',3)
+
+    @metrics_keep.setter
+    def metrics_keep(self,keep:int):
+        self.set_integer('metrics','keep',max(int(keep),0))
+
+    @GObject.Property(type=str)
+    def profiling_mode(self)->str:
+        return self.get_string('profiling','mode',"")
+
+    @profiling_mode.setter
+    def profiling_mode(self,mode:str):
+        self.set_string('profiling','mode',mode)
+
+    @GObject.Property(type=str)
+    def profiling_dir(self)->str:
+        return self.get_string('profiling','directory',os.path.join(self.config_dir,'profiles'))
+
+    @profiling_dir.setter
+    def profiling_dir(self,directory:str):
+        self.set_string('profiling','directory',directory)
+
     @GObject.Property(type=int)
     def search_max_results(self)->int:
         return self.get_integer('search','maxResults',10)
@@ -427,6 +510,14 @@ class Settings(GObject.GObject):
     @steam_installpath.setter
     def steam_installpath(self,path:str):
         self.set_string('steam','installpath',path)
+        
+    @GObject.Property(type=bool,default=True)
+    def steam_discover_libraries(self)->bool:
+        return self.get_boolean('steam','discoverLibraries',True)
+    
+    @steam_discover_libraries.setter
+    def steam_discover_libraries(self,discover:bool):
+        self.set_boolean('steam','discoverLibraries',bool(discover))
 
     @GObject.Property
     def epic_datadir(self)->str|None:
@@ -538,6 +629,70 @@ class Settings(GObject.GObject):
     @backup_versions.setter
     def backup_versions(self,versions:int):
         self.set_integer('sgbackup','backupVersions',versions)
+
+    @GObject.Property(type=int)
+    def throttle_read_limit(self)->int:
+        return self.get_integer('throttle','readLimit',0)
+
+    @throttle_read_limit.setter
+    def throttle_read_limit(self,bytes_per_second:int):
+        self.set_integer('throttle','readLimit',max(int(bytes_per_second),0))
+
+    @GObject.Property(type=int)
+    def throttle_write_limit(self)->int:
+        return self.get_integer('throttle','writeLimit',0)
+
+    @throttle_write_limit.setter
+    def throttle_write_limit(self,bytes_per_second:int):
+        self.set_integer('throttle','writeLimit',max(int(bytes_per_second),0))
+
+    @GObject.Property(type=int)
+    def throttle_nice(self)->int:
+        return self.get_integer('throttle','nice',10)
+
+    @throttle_nice.setter
+    def throttle_nice(self,nice:int):
+        self.set_integer('throttle','nice',min(max(int(nice),0),19))
+
+    @GObject.Property(type=bool,default=True)
+    def throttle_io_idle(self)->bool:
+        return self.get_boolean('throttle','ioIdle',True)
+
+    @throttle_io_idle.setter
+    def throttle_io_idle(self,idle:bool):
+        self.set_boolean('throttle','ioIdle',idle)
+
+    @GObject.Property(type=int)
+    def retention_hourly(self)->int:
+        return self.get_integer('retention','hourly',0)
+
+    @retention_hourly.setter
+    def retention_hourly(self,n:int):
+        self.set_integer('retention','hourly',max(int(n),0))
+
+    @GObject.Property(type=int)
+    def retention_daily(self)->int:
+        return self.get_integer('retention','daily',0)
+
+    @retention_daily.setter
+    def retention_daily(self,n:int):
+        self.set_integer('retention','daily',max(int(n),0))
+
+    @GObject.Property(type=int)
+    def retention_weekly(self)->int:
+        return self.get_integer('retention','weekly',0)
+
+    @retention_weekly.setter
+    def retention_weekly(self,n:int):
+        self.set_integer('retention','weekly',max(int(n),0))
+
+    @GObject.Property(type=int)
+    def retention_monthly(self)->int:
+        return self.get_integer('retention','monthly',0)
+
+    @retention_monthly.setter
+    def retention_monthly(self,n:int):
+        self.set_integer('retention','monthly',max(int(n),0))
     
     
     @GObject.Property(type=int)
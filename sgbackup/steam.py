@@ -21,8 +21,15 @@ import re
 from pathlib import Path
 import sys
 import json
+import time
+from threading import RLock
+from concurrent.futures import ThreadPoolExecutor
 from .settings import settings
 from .game import GameManager
+from ._filecache import FileCache
+
+import logging
+logger = logging.getLogger(__name__)
 
 __gtype_name__ = __name__
 
@@ -31,7 +38,9 @@ PLATFORM_LINUX = (sys.platform.lower() in ('linux','freebsd','netbsd','openbsd',
 PLATFORM_MACOS = (sys.platform.lower() == 'macos')
 
 
-from gi.repository.GObject import GObject,Property,Signal
+from gi.repository.GObject import GObject,Property,Signal,SignalFlags
+
+MAX_LIBRARY_SCAN_THREADS = 4
 
 
 class AcfFileParser(object):
@@ -74,19 +83,172 @@ class AcfFileParser(object):
                 
         return line_count,ret
     
-    def parse_file(self,acf_file)->dict:
+    def parse_file(self,acf_file,section:str="AppState")->dict:
+        """
+        parse_file Parse a acf or vdf file.
+
+        :param acf_file: The file to parse.
+        :type acf_file: str
+        :param section: The name of the toplevel section, compared case insensitive.
+        :type section: str
+        :return: The contents of the toplevel section.
+        :rtype: dict
+        """
         if not os.path.isfile(acf_file):
-            raise FileNotFoundError("File \"{s}\" does not exist!")
+            raise FileNotFoundError("File \"{}\" does not exist!".format(acf_file))
         
         with open(acf_file,'rt',encoding="utf-8") as ifile:
             buffer = ifile.read()
         lines = [l.strip() for l in buffer.split('\n')]
-        if lines[0] == "\"AppState\"" and lines[1] == "{":
+        if (len(lines) > 1 
+                and lines[0].lower() == "\"{}\"".format(section.lower()) 
+                and lines[1] == "{"):
             n_lines,sect = self.__parse_section(lines[2:])
             return sect
         
         raise RuntimeError("Not a acf file!")
 
+class SteamManifestCache(FileCache):
+    """
+    SteamManifestCache Cache for parsed Steam appmanifest files.
+    
+    Manifests are only parsed again if their mtime or size changed. The cache
+    is shared between all `SteamLibrary` instances and stored in the
+    configuration directory.
+    """
+    __global_cache = None
+    __global_mutex = RLock()
+    
+    def __init__(self):
+        FileCache.__init__(self,os.path.join(settings.config_dir,'steamapps.cache'))
+        
+    @staticmethod
+    def get_global():
+        with SteamManifestCache.__global_mutex:
+            if SteamManifestCache.__global_cache is None:
+                SteamManifestCache.__global_cache = SteamManifestCache()
+        return SteamManifestCache.__global_cache
+    
+    def scan(self,appdir:str)->list[dict]:
+        """
+        scan Get the data of all appmanifest files in a steamapps directory.
+        
+        :param appdir: The steamapps directory.
+        :type appdir: str
+        :return: A list of dicts with the keys *appid*, *name* and *installdir*.
+        :rtype: list[dict]
+        """
+        parser = AcfFileParser()
+        ret = []
+        seen = set()
+        
+        try:
+            entries = list(os.scandir(appdir))
+        except OSError:
+            return ret
+        
+        for entry in entries:
+            if not entry.name.startswith('appmanifest_') or not entry.name.endswith('.acf'):
+                continue
+            try:
+                if not entry.is_file():
+                    continue
+                stat = entry.stat()
+            except OSError:
+                continue
+            
+            seen.add(entry.path)
+            hit,data = self.lookup(entry.path,stat)
+            if not hit:
+                try:
+                    acf = parser.parse_file(entry.path)
+                    data = {
+                        'appid': int(acf['appid']),
+                        'name': acf['name'],
+                        'installdir': acf['installdir'],
+                    }
+                except Exception:
+                    data = None
+                self.store(entry.path,stat,data)
+            if data:
+                ret.append(data)
+                
+        self.prune(appdir,seen)
+        return ret
+    
+
+class SteamLibraryFoldersCache(FileCache):
+    """
+    SteamLibraryFoldersCache Cache for the library paths read from
+    Steam's libraryfolders.vdf files.
+    """
+    __global_cache = None
+    __global_mutex = RLock()
+    
+    def __init__(self):
+        FileCache.__init__(self,os.path.join(settings.config_dir,'steamlibraryfolders.cache'))
+    
+    @staticmethod
+    def get_global():
+        with SteamLibraryFoldersCache.__global_mutex:
+            if SteamLibraryFoldersCache.__global_cache is None:
+                SteamLibraryFoldersCache.__global_cache = SteamLibraryFoldersCache()
+        return SteamLibraryFoldersCache.__global_cache
+    
+    @staticmethod
+    def parse_libraryfolders(vdf_file:str)->list[str]:
+        """
+        parse_libraryfolders Read the library paths from a libraryfolders.vdf file.
+        
+        Both the current format (numbered sections with a *path* key) and
+        the old format (numbered keys with the path as value) are supported.
+        
+        :param vdf_file: The libraryfolders.vdf file.
+        :type vdf_file: str
+        :rtype: list[str]
+        """
+        data = AcfFileParser().parse_file(vdf_file,"libraryfolders")
+        ret = []
+        for key,value in data.items():
+            if not key.isdigit():
+                continue
+            if isinstance(value,dict):
+                path = value.get('path',None)
+            else:
+                path = value
+            if path:
+                ret.append(path.replace('\\\\','\\'))
+        return ret
+    
+    def get_library_paths(self,vdf_file:str)->list[str]:
+        """
+        get_library_paths Get the library paths of a libraryfolders.vdf file.
+        
+        The file is only parsed if it changed since the last call.
+        
+        :param vdf_file: The libraryfolders.vdf file.
+        :type vdf_file: str
+        :rtype: list[str]
+        """
+        try:
+            stat = os.stat(vdf_file)
+        except OSError:
+            self.discard(vdf_file)
+            return []
+        
+        hit,paths = self.lookup(vdf_file,stat)
+        if not hit:
+            try:
+                paths = self.parse_libraryfolders(vdf_file)
+            except Exception as ex:
+                logger.warning("Unable to parse \"{filename}\"! ({error})".format(
+                    filename=vdf_file,
+                    error=str(ex)))
+                paths = []
+            self.store(vdf_file,stat,paths)
+        return paths
+    
+
 class IgnoreSteamApp(GObject):
     __gtype_name__ = "sgbackup-steam-IgnoreSteamApp"
     
@@ -140,16 +302,21 @@ class SteamApp(GObject):
         self.__appid = int(appid)
         self.__name = name
         self.__installdir = installdir
+        self.__sort_key = name.casefold() if name else ""
         
     @Property(type=int)
     def appid(self):
         return self.__appid
     
-    @Property
+    @Property(type=str)
     def name(self):
         return self.__name
     
-    @Property
+    @Property(type=str)
+    def sort_key(self)->str:
+        return self.__sort_key
+    
+    @Property(type=str)
     def installdir(self):
         return self.__installdir
     
@@ -191,23 +358,39 @@ class SteamLibrary(GObject):
     def path(self)->Path:
         return Path(self.directory).resolve()
     
+    @Property
+    def inode(self)->tuple[int,int]:
+        """
+        inode The `(st_dev,st_ino)` pair of the resolved library directory.
+        
+        Two libraries with the same inode are the same library reached via
+        different (symlinked) paths.
+        
+        :type: tuple[int,int]
+        """
+        st = os.stat(self.path)
+        return (st.st_dev,st.st_ino)
+    
     @Property
     def steam_apps(self)->list[SteamApp]:
-        parser = AcfFileParser()
+        return self.get_steam_apps()
+    
+    def get_steam_apps(self,save_cache:bool=True)->list[SteamApp]:
+        """
+        get_steam_apps Get the apps installed in this library.
+        
+        :param save_cache: Write the manifest cache after scanning.
+        :type save_cache: bool
+        :rtype: list[SteamApp]
+        """
+        cache = SteamManifestCache.get_global()
         appdir = self.path / "steamapps"
         commondir = appdir / "common"
         
-        ret = []
-        for acf_file in appdir.glob('appmanifest_*.acf'):
-            if not acf_file.is_file():
-                continue
-            try:
-                data = parser.parse_file(str(acf_file))
-                app = SteamApp(data['appid'],data['name'],str(commondir/data['installdir']))
-                ret.append(app)
-            except:
-                pass
-            
+        ret = [SteamApp(data['appid'],data['name'],str(commondir/data['installdir']))
+               for data in cache.scan(str(appdir))]
+        if save_cache:
+            cache.save()
         return sorted(ret)
     
 class Steam(GObject):
@@ -216,7 +399,22 @@ class Steam(GObject):
     def __init__(self):
         GObject.__init__(self)
         self.__libraries = []
+        self.__discovered_libraries = set()
         self.__ignore_apps = {}
+        library_inodes = set()
+        
+        def add_library(libdir:str,discovered:bool=False):
+            try:
+                lib = SteamLibrary(libdir)
+                inode = lib.inode
+            except:
+                return
+            if inode in library_inodes:
+                return
+            library_inodes.add(inode)
+            self.__libraries.append(lib)
+            if discovered:
+                self.__discovered_libraries.add(inode)
                 
         if not self.steamlib_list_file.is_file():
             if (PLATFORM_WINDOWS):
@@ -226,7 +424,7 @@ class Steam(GObject):
                 ]
                 for i in libdirs:
                     if (os.path.isdir(i)):
-                        self.__libraries.append(SteamLibrary(i))
+                        add_library(i)
                         break
         else:
             with open(str(self.steamlib_list_file),'rt',encoding="utf-8") as ifile:
@@ -235,10 +433,11 @@ class Steam(GObject):
                         continue
                     libdir = Path(line).resolve()
                     if libdir.is_dir():
-                        try:
-                            self.__libraries.append(SteamLibrary(str(libdir)))
-                        except:
-                            pass
+                        add_library(str(libdir))
+        
+        if settings.steam_discover_libraries:
+            for libdir in self.discover_libraries():
+                add_library(libdir,True)
         
         if self.ignore_apps_file.is_file():
             with open(str(self.ignore_apps_file),'r',encoding="utf-8") as ifile:
@@ -253,6 +452,63 @@ class Steam(GObject):
             
     #__init__()     
 
+    @staticmethod
+    def get_steam_roots()->list[str]:
+        """
+        get_steam_roots Get the directories Steam may be installed in.
+        
+        :rtype: list[str]
+        """
+        roots = []
+        if settings.steam_installpath:
+            roots.append(settings.steam_installpath)
+        if PLATFORM_WINDOWS:
+            roots += [
+                "C:\\Program Files (x86)\\steam",
+                "C:\\Program Files\\steam",
+            ]
+        elif PLATFORM_MACOS:
+            roots.append(os.path.expanduser("~/Library/Application Support/Steam"))
+        else:
+            roots += [
+                os.path.expanduser("~/.steam/steam"),
+                os.path.expanduser("~/.local/share/Steam"),
+                os.path.expanduser("~/.var/app/com.valvesoftware.Steam/.local/share/Steam"),
+            ]
+        return [i for i in roots if os.path.isdir(i)]
+    
+    @staticmethod
+    def discover_libraries()->list[str]:
+        """
+        discover_libraries Find Steam libraries using the libraryfolders.vdf
+        files of the Steam installations.
+        
+        The returned list may contain the same library more than once when
+        Steam directories are symlinked.
+        
+        :rtype: list[str]
+        """
+        cache = SteamLibraryFoldersCache.get_global()
+        ret = []
+        for root in Steam.get_steam_roots():
+            if os.path.isdir(os.path.join(root,'steamapps')):
+                ret.append(root)
+            for vdf_file in (os.path.join(root,'steamapps','libraryfolders.vdf'),
+                             os.path.join(root,'config','libraryfolders.vdf')):
+                for path in cache.get_library_paths(vdf_file):
+                    if os.path.isabs(path) and os.path.isdir(path):
+                        ret.append(path)
+        cache.save()
+        return ret
+    
+    @Signal(name="library-scanned",return_type=None,arg_types=(SteamLibrary,float,int),
+            flags=SignalFlags.RUN_FIRST)
+    def do_library_scanned(self,library:SteamLibrary,seconds:float,n_manifests:int):
+        logger.debug("Scanned steam library \"{library}\" in {seconds:.3f}s ({n} apps)".format(
+            library=library.directory,
+            seconds=seconds,
+            n=n_manifests))
+    
     @Property
     def steamlib_list_file(self)->Path:
         return Path(settings.config_dir).resolve() / 'steamlib.lst'
@@ -292,9 +548,16 @@ class Steam(GObject):
         else:
             raise TypeError("illegal ignore_apps type!")
     
+    def __is_discovered_library(self,lib:SteamLibrary)->bool:
+        try:
+            return lib.inode in self.__discovered_libraries
+        except:
+            return False
+        
     def __write_steamlib_list_file(self):
         with open(self.steamlib_list_file,'wt',encoding='utf-8') as ofile:
-            output = '\n'.join([sl.directory for sl in self.__libraries])
+            output = '\n'.join([sl.directory for sl in self.__libraries 
+                                if not self.__is_discovered_library(sl)])
             ofile.write(output)
             
     def __write_ignore_steamapps_file(self):
@@ -309,7 +572,7 @@ class Steam(GObject):
         
         lib_exists = False    
         for i in self.libraries:
-            if i.derctory == lib.directory:
+            if i.directory == lib.directory or i.inode == lib.inode:
                 lib_exists = True
                 break
             
@@ -346,34 +609,112 @@ class Steam(GObject):
             del self.__ignore_apps[appid]
             self.__write_ignore_steamapps_file()
             
+    def scan_libraries(self)->list[tuple[SteamLibrary,list[SteamApp]]]:
+        """
+        scan_libraries Get the installed apps of all libraries.
+        
+        Libraries are grouped by the device they are located on. The devices
+        are scanned concurrently while the libraries on the same device are
+        scanned one after another, so that a single disk does not need to seek
+        between libraries. The *library-scanned* signal is emitted for each
+        library.
+        
+        :return: A list of `(library,apps)` tuples in the order of `Steam.libraries`.
+        :rtype: list[tuple[SteamLibrary,list[SteamApp]]]
+        """
+        def scan_device(libraries:list[SteamLibrary]):
+            ret = []
+            for lib in libraries:
+                t = time.perf_counter()
+                apps = lib.get_steam_apps(save_cache=False)
+                ret.append((lib,apps,time.perf_counter() - t))
+            return ret
+        
+        devices = {}
+        for lib in self.libraries:
+            try:
+                dev = lib.inode[0]
+            except:
+                dev = None
+            devices.setdefault(dev,[]).append(lib)
+        
+        results = {}
+        if len(devices) > 1:
+            with ThreadPoolExecutor(max_workers=min(len(devices),MAX_LIBRARY_SCAN_THREADS)) as executor:
+                for device_result in executor.map(scan_device,devices.values()):
+                    for lib,apps,seconds in device_result:
+                        results[id(lib)] = (apps,seconds)
+        else:
+            for libs in devices.values():
+                for lib,apps,seconds in scan_device(libs):
+                    results[id(lib)] = (apps,seconds)
+                    
+        SteamManifestCache.get_global().save()
+        
+        ret = []
+        for lib in self.libraries:
+            apps,seconds = results[id(lib)]
+            self.emit('library-scanned',lib,seconds,len(apps))
+            ret.append((lib,apps))
+        return ret
+    
     def find_new_steamapps(self)->list[SteamApp]:
+        gm = GameManager.get_global()
         new_apps = []
-        for lib in self.libraries:
-            for app in lib.steam_apps:
-                if not GameManager.get_global().has_steam_game(app.appid) and not app.appid in self.ignore_apps:
+        for lib,apps in self.scan_libraries():
+            for app in apps:
+                if not gm.has_steam_game(app.appid) and not app.appid in self.ignore_apps:
                     new_apps.append(app)
         return sorted(new_apps)
     
-    def update_steam_apps(self):
+    def update_steam_apps(self)->list:
+        """
+        update_steam_apps Synchronize the *installdir* and *librarydir* of the
+        Steam games with the installed apps.
+        
+        The manifests of all libraries are compared to the Steam data of the
+        current platform. Each changed game is written once; the games are not
+        re-added to the `GameManager`.
+        
+        :return: The list of changed games.
+        :rtype: list[Game]
+        """
         gm = GameManager.get_global()
+        steam_games = gm.steam_games
+        changed = {}
+        if not steam_games:
+            return []
         
-        for lib in self.libraries():
-            for app in lib.steam_apps:
+        for lib,apps in self.scan_libraries():
+            for app in apps:
+                game = steam_games.get(app.appid,None)
+                if game is None or not game.steam:
+                    continue
+                
                 if PLATFORM_WINDOWS:
-                    if ((app.appid in gm.steam_windows_games) 
-                            and (gm.steam_windows_games[app.appid].installdir != app.installdir)):
-                        game = gm.steam_windows_games[app.appid]
-                        game.installdir = app.installdir
-                        game.save()
-                elif PLATFORM_LINUX:
-                    if ((app.appid in gm.steam_linux_games) 
-                            and (gm.steam_linux_games[app.appid].installdir != app.installdir)):
-                        game = gm.steam_linux_games[app.appid]
-                        game.installdir = app.installdir
-                        game.save()
+                    data = game.steam.windows
                 elif PLATFORM_MACOS:
-                    if ((app.appid in gm.steam_macos_games) 
-                            and (gm.steam_macos_games[app.appid].installdir != app.installdir)):
-                        game = gm.steam_macos_games[app.appid]
-                        game.installdir = app.installdir
-                        game.save()
+                    data = game.steam.macos
+                elif PLATFORM_LINUX:
+                    data = game.steam.linux
+                else:
+                    data = None
+                if data is None:
+                    continue
+                
+                if data.installdir == app.installdir and data.librarydir == lib.directory:
+                    continue
+                
+                data.installdir = app.installdir
+                data.librarydir = lib.directory
+                changed[game.key] = game
+        
+        for game in changed.values():
+            try:
+                game.write()
+                logger.info("Updated the steam installdir of \"{game}\"".format(game=game.key))
+            except Exception as ex:
+                logger.error("Unable to write gameconf for \"{game}\"! ({error})".format(
+                    game=game.key,
+                    error=str(ex)))
+        return list(changed.values())
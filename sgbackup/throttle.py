@@ -0,0 +1,286 @@
+###############################################################################
+# sgbackup - The SaveGame Backup tool                                         #
+#    Copyright (C) 2024,2025  Christian Moser                                 #
+#                                                                             #
+#    This program is free software: you can redistribute it and/or modify     #
+#    it under the terms of the GNU General Public License as published by     #
+#    the Free Software Foundation, either version 3 of the License, or        #
+#    (at your option) any later version.                                      #
+#                                                                             #
+#    This program is distributed in the hope that it will be useful,          #
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of           #
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the            #
+#    GNU General Public License for more details.                             #
+#                                                                             #
+#    You should have received a copy of the GNU General Public License        #
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.   #
+###############################################################################
+
+import os
+import sys
+import time
+import platform
+import threading
+from contextlib import contextmanager
+
+from .settings import settings
+
+import logging
+logger = logging.getLogger(__name__)
+
+# ioprio_set(2) constants (linux/ioprio.h)
+_IOPRIO_WHO_PROCESS = 1
+_IOPRIO_CLASS_IDLE = 3
+_IOPRIO_CLASS_SHIFT = 13
+
+# The syscall numbers of ioprio_set, Python has no wrapper for it.
+_IOPRIO_SET_SYSCALLS = {
+    'x86_64': 251,
+    'i386': 289,
+    'i686': 289,
+    'aarch64': 30,
+    'arm64': 30,
+    'riscv64': 30,
+    'armv7l': 314,
+    'ppc64le': 273,
+    'ppc64': 273,
+    's390x': 282,
+}
+
+class TokenBucket(object):
+    """
+    TokenBucket Limits a byte stream to a rate.
+
+    The bucket holds up to *burst* bytes and is refilled with *rate* bytes
+    per second. A consumer that takes more than is available is put to sleep
+    until the debt is refilled, so large chunks are allowed but the average
+    rate is kept. The bucket is shared by all threads using it.
+    """
+    def __init__(self,rate:float,burst:float|None=None):
+        self.__rate = float(rate)
+        self.__burst = float(burst) if burst else self.__rate
+        self.__tokens = self.__burst
+        self.__last = time.monotonic()
+        self.__mutex = threading.Lock()
+
+    @property
+    def rate(self)->float:
+        return self.__rate
+
+    @property
+    def burst(self)->float:
+        return self.__burst
+
+    def consume(self,n_bytes:int)->float:
+        """
+        consume Take *n_bytes* from the bucket and sleep if the rate is
+        exceeded.
+
+        :param n_bytes: The number of bytes read or written.
+        :type n_bytes: int
+        :return: The seconds slept.
+        :rtype: float
+        """
+        if self.__rate <= 0.0 or n_bytes <= 0:
+            return 0.0
+        with self.__mutex:
+            now = time.monotonic()
+            self.__tokens = min(self.__burst,self.__tokens + (now - self.__last) * self.__rate)
+            self.__last = now
+            self.__tokens -= n_bytes
+            delay = -self.__tokens / self.__rate if self.__tokens < 0.0 else 0.0
+        if delay > 0.0:
+            time.sleep(delay)
+        return delay
+
+class ThrottledWriter(object):
+    """
+    ThrottledWriter A file wrapper that limits the write rate.
+
+    All other attributes are taken from the wrapped file, so it can be passed
+    to `zipfile.ZipFile` and `tarfile.open()`.
+    """
+    def __init__(self,fileobj,throttle:"Throttle"):
+        self.__fileobj = fileobj
+        self.__throttle = throttle
+
+    def write(self,data)->int:
+        self.__throttle.throttle_write(len(data))
+        return self.__fileobj.write(data)
+
+    def __getattr__(self,name):
+        return getattr(self.__fileobj,name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,exc_type,exc_value,traceback):
+        self.__fileobj.close()
+
+def set_io_priority_idle(tid:int=0)->bool:
+    """
+    set_io_priority_idle Put a thread into the idle I/O scheduling class.
+
+    Only supported on Linux. Threads created afterwards by the thread inherit
+    the I/O priority.
+
+    :param tid: The native thread id, `0` for the calling thread.
+    :type tid: int
+    :return: `True` on success.
+    :rtype: bool
+    """
+    if not sys.platform.startswith('linux'):
+        return False
+    syscall_nr = _IOPRIO_SET_SYSCALLS.get(platform.machine(),None)
+    if syscall_nr is None:
+        return False
+    try:
+        import ctypes
+        libc = ctypes.CDLL(None,use_errno=True)
+        ret = libc.syscall(syscall_nr,_IOPRIO_WHO_PROCESS,tid,_IOPRIO_CLASS_IDLE << _IOPRIO_CLASS_SHIFT)
+    except (OSError,AttributeError):
+        return False
+    if ret != 0:
+        logger.debug("ioprio_set() failed! ({error})".format(error=os.strerror(ctypes.get_errno())))
+        return False
+    return True
+
+class Throttle(object):
+    """
+    Throttle Slows down background backups, so they do not compete with a
+    running game.
+
+    Background backups are the backups run by threads inside
+    `Throttle.background()`. The bytes they read are limited to
+    `settings.throttle_read_limit` and the bytes they write to
+    `settings.throttle_write_limit` bytes per second. The limits are shared
+    by all background threads. Their backup threads lower their CPU priority
+    to `settings.throttle_nice` and, if `settings.throttle_io_idle` is set,
+    switch to the idle I/O class.
+
+    Backups started by the user run in other threads and are not throttled,
+    even while a background backup runs.
+    """
+    __global_throttle = None
+
+    @staticmethod
+    def get_global()->"Throttle":
+        if Throttle.__global_throttle is None:
+            Throttle.__global_throttle = Throttle()
+        return Throttle.__global_throttle
+
+    def __init__(self):
+        self.__mutex = threading.Lock()
+        self.__n_background = 0
+        self.__read_bucket = None
+        self.__write_bucket = None
+        self.__thread_data = threading.local()
+
+    @property
+    def is_active(self)->bool:
+        """
+        is_active `True` while a background backup runs.
+
+        :type: bool
+        """
+        return self.__n_background > 0
+
+    @property
+    def is_background_thread(self)->bool:
+        """
+        is_background_thread `True` if the calling thread runs background
+        backups.
+
+        :type: bool
+        """
+        return getattr(self.__thread_data,'background',0) > 0
+
+    @contextmanager
+    def background(self,enabled:bool=True):
+        """
+        background Run the backups of the calling thread as background
+        backups.
+
+        Threads started inside the section are not background threads, pass
+        `is_background_thread` of the starting thread as *enabled* to
+        inherit it. The buckets are created from the settings when the first
+        background section is entered.
+
+        :param enabled: If `False`, the section does nothing.
+        :type enabled: bool
+        """
+        if not enabled:
+            yield self
+            return
+        with self.__mutex:
+            if self.__n_background == 0:
+                read_limit = settings.throttle_read_limit
+                write_limit = settings.throttle_write_limit
+                self.__read_bucket = TokenBucket(read_limit) if read_limit > 0 else None
+                self.__write_bucket = TokenBucket(write_limit) if write_limit > 0 else None
+            self.__n_background += 1
+        self.__thread_data.background = getattr(self.__thread_data,'background',0) + 1
+        try:
+            yield self
+        finally:
+            self.__thread_data.background -= 1
+            with self.__mutex:
+                self.__n_background -= 1
+
+    def throttle_read(self,n_bytes:int):
+        bucket = self.__read_bucket
+        if bucket is not None and self.is_background_thread:
+            bucket.consume(n_bytes)
+
+    def throttle_write(self,n_bytes:int):
+        bucket = self.__write_bucket
+        if bucket is not None and self.is_background_thread:
+            bucket.consume(n_bytes)
+
+    def open_for_writing(self,filename:str)->ThrottledWriter:
+        """
+        open_for_writing Create a new file whose writes are throttled.
+
+        :param filename: The file to create, it must not exist.
+        :type filename: str
+        :rtype: ThrottledWriter
+        """
+        return ThrottledWriter(open(filename,'xb'),self)
+
+    def lower_thread_priority(self):
+        """
+        lower_thread_priority Lower the CPU and I/O priority of the calling
+        thread.
+
+        The priority can not be raised again by an unprivileged process, so
+        this should only be called in threads dedicated to backups or in a
+        process that only runs backups. Threads started afterwards by the
+        thread inherit the priorities. Calling it twice in a thread does
+        nothing.
+        """
+        if getattr(self.__thread_data,'lowered',False):
+            return
+        self.__thread_data.lowered = True
+
+        nice = settings.throttle_nice
+        if nice > 0 and hasattr(os,'setpriority'):
+            # On Linux the nice value is per thread, elsewhere the whole
+            # process is affected.
+            who = threading.get_native_id() if sys.platform.startswith('linux') else 0
+            try:
+                current = os.getpriority(os.PRIO_PROCESS,who)
+                if nice > current:
+                    os.setpriority(os.PRIO_PROCESS,who,nice)
+            except OSError as ex:
+                logger.debug("Unable to set the nice value! ({error})".format(error=str(ex)))
+
+        if settings.throttle_io_idle:
+            set_io_priority_idle(threading.get_native_id() if sys.platform.startswith('linux') else 0)
+
+    def on_backup_started(self):
+        """
+        on_backup_started Called by the backup threads, lowers the priority
+        of background threads.
+        """
+        if self.is_background_thread:
+            self.lower_thread_priority()
@@ -17,6 +17,8 @@
 ###############################################################################
 
 import os,sys
+import stat
+import tempfile
 from .i18n import gettext as _
 from string import Template
 
@@ -52,6 +54,86 @@ def sanitize_path(path:str)->str:
         return sanitize_windows_path(path)
     return path
 
+def write_text_atomic(filename:str,text:str,encoding:str="utf-8"):
+    """
+    write_text_atomic Write a text file atomically.
+    
+    The text is written to a temporary file in the same directory which
+    replaces *filename* when it was written successfully, so readers never
+    see a partially written file.
+
+    :param filename: The file to write.
+    :type filename: str
+    :param text: The text to write.
+    :type text: str
+    :param encoding: The encoding to use, defaults to "utf-8"
+    :type encoding: str, optional
+    """
+    dirname = os.path.dirname(os.path.abspath(filename))
+    fd,tmpname = tempfile.mkstemp(prefix="." + os.path.basename(filename) + ".",
+                                  suffix=".tmp",
+                                  dir=dirname)
+    try:
+        with os.fdopen(fd,'w',encoding=encoding) as ofile:
+            ofile.write(text)
+            ofile.flush()
+            os.fsync(ofile.fileno())
+        if os.path.isfile(filename):
+            os.chmod(tmpname,stat.S_IMODE(os.stat(filename).st_mode))
+        else:
+            os.chmod(tmpname,0o644)
+        os.replace(tmpname,filename)
+    except:
+        if os.path.exists(tmpname):
+            os.unlink(tmpname)
+        raise
+
+def format_size(size:int)->str:
+    """
+    format_size Format a file size for display.
+
+    :param size: The size in bytes.
+    :type size: int
+    :rtype: str
+    """
+    if (size > 1073741824):
+        return ".".join((str(int(size / 1073741824)),str(int(((size * 10) / 1073741824) % 10)))) + " GiB"
+    elif (size > 1048576):
+        return ".".join((str(int(size / 1048576)), str(int(((size * 10) / 1048576) % 10)))) + " MiB"
+    elif (size > 1024):
+        return ".".join((str(int(size / 1024)), str(int(((size * 10) / 1024) % 10)))) + " KiB"
+    return str(size) + " B"
+
+def format_throughput(bytes_per_second:float)->str:
+    """
+    format_throughput Format a throughput for display.
+
+    :param bytes_per_second: The throughput in bytes per second.
+    :type bytes_per_second: float
+    :rtype: str
+    """
+    for unit,factor in (("GiB/s",1073741824),("MiB/s",1048576),("KiB/s",1024)):
+        if bytes_per_second >= factor:
+            return "{:.1f} {}".format(bytes_per_second / factor,unit)
+    return "{:.0f} B/s".format(max(bytes_per_second,0.0))
+
+def format_eta(eta:float)->str:
+    """
+    format_eta Format an estimated time left for display.
+
+    :param eta: The time left in seconds, a negative value if unknown.
+    :type eta: float
+    :rtype: str
+    """
+    if eta < 0.0:
+        return "--:--"
+    eta = int(eta + 0.5)
+    hours,rest = divmod(eta,3600)
+    minutes,seconds = divmod(rest,60)
+    if hours:
+        return "{}:{:02d}:{:02d}".format(hours,minutes,seconds)
+    return "{}:{:02d}".format(minutes,seconds)
+
 def create_help_title(self,title:str):
     help=_("HELP")
 
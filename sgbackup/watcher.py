@@ -0,0 +1,419 @@
+###############################################################################
+# sgbackup - The SaveGame Backup tool                                         #
+#    Copyright (C) 2024,2025  Christian Moser                                 #
+#                                                                             #
+#    This program is free software: you can redistribute it and/or modify     #
+#    it under the terms of the GNU General Public License as published by     #
+#    the Free Software Foundation, either version 3 of the License, or        #
+#    (at your option) any later version.                                      #
+#                                                                             #
+#    This program is distributed in the hope that it will be useful,          #
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of           #
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the            #
+#    GNU General Public License for more details.                             #
+#                                                                             #
+#    You should have received a copy of the GNU General Public License        #
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.   #
+###############################################################################
+
+from gi.repository import GLib,Gio
+from gi.repository.GObject import GObject,Signal,SignalFlags,Property
+
+import os
+from threading import Lock
+from concurrent.futures import ThreadPoolExecutor
+
+from .game import Game,GameManager
+from .settings import settings
+from .archiver import ArchiverManager
+from .throttle import Throttle
+
+import logging
+logger = logging.getLogger(__name__)
+
+# Events that do not change the contents of a savegame directory.
+_IGNORED_EVENTS = (
+    Gio.FileMonitorEvent.ATTRIBUTE_CHANGED,
+    Gio.FileMonitorEvent.PRE_UNMOUNT,
+    Gio.FileMonitorEvent.UNMOUNTED,
+)
+
+# The delay before a backup that failed because another backup is in
+# progress is retried.
+RETRY_INTERVAL = 5.0
+
+def _find_existing_parent(directory:str)->str|None:
+    parent = os.path.dirname(directory)
+    while not os.path.isdir(parent):
+        next_parent = os.path.dirname(parent)
+        if next_parent == parent:
+            return None
+        parent = next_parent
+    return parent
+
+def _is_same_or_parent(path:str,directory:str)->bool:
+    return directory == path or directory.startswith(path.rstrip(os.sep) + os.sep)
+
+class BackupQueue(GObject):
+    """
+    BackupQueue Runs queued backups one after another in a worker thread.
+
+    A game that is already waiting in the queue is not queued again. A backup
+    that collides with another backup in progress is retried after
+    `RETRY_INTERVAL` seconds. `backup-finished` is emitted in the main loop.
+    """
+    def __init__(self):
+        GObject.__init__(self)
+        self.__pending = set()
+        self.__pending_mutex = Lock()
+        self.__executor = None
+
+    @Property(type=bool,default=False)
+    def is_running(self)->bool:
+        return self.__executor is not None
+
+    def start(self):
+        if self.__executor is None:
+            self.__executor = ThreadPoolExecutor(max_workers=1)
+
+    def stop(self,wait:bool=True):
+        """
+        stop Stop the queue and discard the queued backups.
+
+        :param wait: Wait for a running backup to finish.
+        :type wait: bool
+        """
+        if self.__executor is None:
+            return
+        executor = self.__executor
+        self.__executor = None
+        executor.shutdown(wait=wait,cancel_futures=True)
+        with self.__pending_mutex:
+            self.__pending = set()
+
+    def queue(self,game:Game)->bool:
+        """
+        queue Queue the backup of a game.
+
+        :param game: The game to back up.
+        :type game: Game
+        :return: `False` if the game is already queued or the queue is not running.
+        :rtype: bool
+        """
+        if self.__executor is None:
+            return False
+        with self.__pending_mutex:
+            if game.key in self.__pending:
+                return False
+            self.__pending.add(game.key)
+        self.__executor.submit(self.__backup_thread,game)
+        return True
+
+    def __backup_thread(self,game:Game):
+        # A change during the backup queues the game again.
+        with self.__pending_mutex:
+            self.__pending.discard(game.key)
+
+        try:
+            with Throttle.get_global().background():
+                result = ArchiverManager.get_global().backup(game)
+        except RuntimeError as ex:
+            # Another backup is in progress.
+            logger.info("Postponing backup of {game}! ({error})".format(
+                game=game.key,
+                error=str(ex)))
+            GLib.timeout_add(int(RETRY_INTERVAL * 1000),self.__retry_backup,game)
+            return
+        GLib.idle_add(self.__emit_backup_finished,game,bool(result))
+
+    def __retry_backup(self,game:Game):
+        self.queue(game)
+        return False
+
+    def __emit_backup_finished(self,game:Game,result:bool):
+        self.emit('backup-finished',game,result)
+        return False
+
+    @Signal(name="backup-finished",return_type=None,arg_types=(Game,bool),flags=SignalFlags.RUN_FIRST)
+    def do_backup_finished(self,game:Game,result:bool):
+        pass
+
+class SavegameWatcher(GObject):
+    """
+    SavegameWatcher Backs up games when their savegames change.
+
+    The savegame directories of the games are watched with `Gio.FileMonitor`.
+    Each event restarts the quiet period of its game, so a burst of writes
+    results in a single backup when the game stopped writing. The backups run
+    one after another in a worker thread.
+
+    If the savegame directory of a game does not exist yet, its nearest
+    existing parent is watched until the directory is created.
+
+    If no games are passed, all active live games are watched and the watches
+    follow the games added to or removed from the `GameManager`.
+
+    The watcher needs a running GLib main loop.
+    """
+    def __init__(self,games:list[Game]|None=None,quiet_period:float|None=None):
+        GObject.__init__(self)
+        self.__follow_gamemanager = games is None
+        self.__games = {}
+        if games is not None:
+            for game in games:
+                self.__games[game.key] = game
+        self.__quiet_period = settings.watch_quiet_period if quiet_period is None else quiet_period
+        self.__monitors = {}
+        self.__parent_monitors = {}
+        self.__timeouts = {}
+        self.__queue = BackupQueue()
+        self.__queue.connect('backup-finished',lambda q,game,result: self.emit('backup-finished',game,result))
+        self.__gm_signals = []
+
+    @Property(type=float)
+    def quiet_period(self)->float:
+        """
+        quiet_period The seconds a savegame directory has to be unchanged
+        before it is backed up.
+
+        :type: float
+        """
+        return self.__quiet_period
+
+    @Property(type=bool,default=False)
+    def is_running(self)->bool:
+        return self.__queue.is_running
+
+    @property
+    def games(self)->list[Game]:
+        """
+        games The watched games.
+
+        :type: list[Game]
+        """
+        return [self.__games[key] for key in self.__monitors.keys() if key in self.__games]
+
+    @property
+    def pending_games(self)->list[Game]:
+        """
+        pending_games The games waiting for their savegame directory to be
+        created.
+
+        :type: list[Game]
+        """
+        return [self.__games[key] for key in self.__parent_monitors.keys() if key in self.__games]
+
+    def start(self):
+        """
+        start Start watching the savegame directories.
+        """
+        if self.__queue.is_running:
+            return
+        self.__queue.start()
+
+        if self.__follow_gamemanager:
+            gm = GameManager.get_global()
+            self.__games = {}
+            for game in gm.games.values():
+                if game.is_active and game.is_live:
+                    self.__games[game.key] = game
+            self.__gm_signals = [
+                gm.connect('game-added',self._on_gamemanager_game_added),
+                gm.connect('game-removed',self._on_gamemanager_game_removed),
+            ]
+
+        for game in list(self.__games.values()):
+            self.watch_game(game)
+
+    def stop(self,wait:bool=True):
+        """
+        stop Stop watching.
+
+        Pending quiet periods are discarded.
+
+        :param wait: Wait for a running backup to finish.
+        :type wait: bool
+        """
+        if not self.__queue.is_running:
+            return
+
+        gm = GameManager.get_global()
+        for signal_id in self.__gm_signals:
+            gm.disconnect(signal_id)
+        self.__gm_signals = []
+
+        for key in list(self.__monitors.keys()) + list(self.__parent_monitors.keys()):
+            self.unwatch_game(key)
+
+        self.__queue.stop(wait)
+
+    def watch_game(self,game:Game)->bool:
+        """
+        watch_game Start watching the savegame directory of a game.
+
+        If the savegame directory does not exist, the game is watched as soon
+        as the directory is created.
+
+        :param game: The game to watch.
+        :type game: Game
+        :return: `False` if the savegame directory does not exist.
+        :rtype: bool
+        """
+        self.unwatch_game(game.key)
+        self.__games[game.key] = game
+
+        if not game.savegame_root or not game.savegame_dir:
+            return False
+        directory = os.path.join(game.savegame_root,game.savegame_dir)
+        if not os.path.isdir(directory):
+            self.__watch_parent(game,directory)
+            return False
+
+        self.__monitors[game.key] = {}
+        self.__add_monitors(game,directory)
+        logger.debug("Watching {game} ({n} directories)".format(
+            game=game.key,
+            n=len(self.__monitors[game.key])))
+        return True
+
+    def unwatch_game(self,key:str):
+        """
+        unwatch_game Stop watching a game.
+
+        :param key: The key of the game.
+        :type key: str
+        """
+        monitors = self.__monitors.pop(key,None)
+        if monitors:
+            for monitor in monitors.values():
+                monitor.cancel()
+        parent_monitor = self.__parent_monitors.pop(key,None)
+        if parent_monitor is not None:
+            parent_monitor.cancel()
+        source = self.__timeouts.pop(key,None)
+        if source:
+            GLib.source_remove(source)
+
+    def __watch_parent(self,game:Game,directory:str):
+        parent = _find_existing_parent(directory)
+        if parent is None:
+            logger.warning("Not watching {game}! Savegame directory \"{directory}\" not found!".format(
+                game=game.key,
+                directory=directory))
+            return
+        try:
+            monitor = Gio.File.new_for_path(parent).monitor_directory(Gio.FileMonitorFlags.WATCH_MOVES,None)
+        except GLib.Error as ex:
+            logger.warning("Not watching {game}! Unable to watch \"{parent}\"! ({error})".format(
+                game=game.key,
+                parent=parent,
+                error=str(ex)))
+            return
+        monitor.connect('changed',self._on_parent_monitor_changed,game.key,directory)
+        self.__parent_monitors[game.key] = monitor
+        logger.info("Savegame directory \"{directory}\" of {game} not found, waiting for it in \"{parent}\".".format(
+            directory=directory,
+            game=game.key,
+            parent=parent))
+
+    def _on_parent_monitor_changed(self,monitor,file,other_file,event_type,key,directory):
+        if event_type in (Gio.FileMonitorEvent.CREATED,Gio.FileMonitorEvent.MOVED_IN):
+            path = file.get_path()
+        elif event_type == Gio.FileMonitorEvent.RENAMED and other_file is not None:
+            path = other_file.get_path()
+        else:
+            return
+        if not path or not _is_same_or_parent(path,directory) or key not in self.__parent_monitors:
+            return
+
+        # Either the savegame directory or one of its parents was created.
+        if self.watch_game(self.__games[key]):
+            self.__restart_quiet_period(key)
+
+    def __remove_monitors(self,key:str,directory:str):
+        monitors = self.__monitors.get(key,None)
+        if not monitors:
+            return
+        for dirpath in [i for i in monitors.keys() if _is_same_or_parent(directory,i)]:
+            monitors.pop(dirpath).cancel()
+
+    def __add_monitors(self,game:Game,directory:str):
+        # Gio.FileMonitor does not watch subdirectories, so every directory
+        # of the savegame tree gets its own monitor.
+        monitors = self.__monitors[game.key]
+        for dirpath,dirnames,filenames in os.walk(directory):
+            if dirpath in monitors:
+                continue
+            try:
+                monitor = Gio.File.new_for_path(dirpath).monitor_directory(Gio.FileMonitorFlags.WATCH_MOVES,None)
+            except GLib.Error as ex:
+                logger.warning("Unable to watch \"{directory}\"! ({error})".format(
+                    directory=dirpath,
+                    error=str(ex)))
+                continue
+            monitor.connect('changed',self._on_monitor_changed,game.key)
+            monitors[dirpath] = monitor
+
+    def _on_monitor_changed(self,monitor,file,other_file,event_type,key):
+        if event_type in _IGNORED_EVENTS or key not in self.__monitors:
+            return
+
+        if event_type in (Gio.FileMonitorEvent.DELETED,
+                          Gio.FileMonitorEvent.MOVED_OUT,
+                          Gio.FileMonitorEvent.RENAMED):
+            path = file.get_path()
+            if path and path in self.__monitors[key]:
+                self.__remove_monitors(key,path)
+                if not self.__monitors[key]:
+                    # The savegame directory is gone, wait for it again.
+                    self.watch_game(self.__games[key])
+                    return
+
+        if event_type in (Gio.FileMonitorEvent.CREATED,Gio.FileMonitorEvent.MOVED_IN):
+            path = file.get_path()
+            if path and os.path.isdir(path):
+                self.__add_monitors(self.__games[key],path)
+        elif event_type == Gio.FileMonitorEvent.RENAMED and other_file is not None:
+            path = other_file.get_path()
+            if path and os.path.isdir(path):
+                self.__add_monitors(self.__games[key],path)
+
+        self.__restart_quiet_period(key)
+
+    def __restart_quiet_period(self,key:str,seconds:float|None=None):
+        source = self.__timeouts.pop(key,None)
+        if source:
+            GLib.source_remove(source)
+        if seconds is None:
+            seconds = self.quiet_period
+        self.__timeouts[key] = GLib.timeout_add(int(seconds * 1000),self._on_quiet_period_timeout,key)
+
+    def _on_quiet_period_timeout(self,key:str):
+        self.__timeouts.pop(key,None)
+        game = self.__games.get(key,None)
+        if game is None:
+            return False
+
+        if self.__queue.queue(game):
+            self.emit('game-changed',game)
+        return False
+
+    def _on_gamemanager_game_added(self,gm,game):
+        if game.is_active and game.is_live:
+            self.watch_game(game)
+        elif game.key in self.__games:
+            self.unwatch_game(game.key)
+            del self.__games[game.key]
+
+    def _on_gamemanager_game_removed(self,gm,game,key):
+        self.unwatch_game(key)
+        if key in self.__games:
+            del self.__games[key]
+
+    @Signal(name="game-changed",return_type=None,arg_types=(Game,),flags=SignalFlags.RUN_FIRST)
+    def do_game_changed(self,game:Game):
+        logger.info("Savegames of {game} changed.".format(game=game.key))
+
+    @Signal(name="backup-finished",return_type=None,arg_types=(Game,bool),flags=SignalFlags.RUN_FIRST)
+    def do_backup_finished(self,game:Game,result:bool):
+        pass